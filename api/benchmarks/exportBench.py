@@ -0,0 +1,162 @@
+"""Memory and throughput benchmark for the export renderers.
+
+Feeds generated vendor rows (shaped like ``map_vendor_response`` output) through
+the CSV, PDF and Parquet renderers at each requested size and reports rows per second and
+the peak Python heap traced while rendering. With the rows produced lazily, the
+peak should stay flat as the row count grows. PDF output is also read back to check
+that every row is drawn inside its page. Run from the ``api`` directory:
+
+    python -m benchmarks.exportBench --rows 10000 100000
+    python -m benchmarks.exportBench --format pdf --rows 100000 --output export.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+from services.exportService.parquetExport import VENDOR_PARQUET_COLUMNS, parquet_available, render_parquet
+from services.exportService.renderers import (
+    VENDOR_EXPORT_COLUMNS,
+    VENDOR_EXPORT_FORMATTERS,
+    VENDOR_PDF_COLUMNS,
+    render_csv,
+    render_pdf,
+)
+
+FORMATS = ('csv', 'pdf', 'parquet')
+
+PDF_MEDIABOX = re.compile(rb'/MediaBox \[0 0 ([\d.]+) ([\d.]+)\]')
+PDF_STREAM = re.compile(rb'stream\n(.*?)\nendstream', re.S)
+PDF_TEXT = re.compile(rb'1 0 0 1 (-?[\d.]+) (-?[\d.]+) Tm \(((?:\\.|[^\\)])*)\) Tj')
+
+
+def vendor_rows(count: int) -> Iterator[Dict]:
+    start = datetime(2025, 7, 26, 10, 30)
+    for index in range(count):
+        created_at = start + timedelta(seconds=index)
+        yield {
+            'id': f'00000000-0000-0000-0000-{index:012d}',
+            'vendor_title': f'Vendor {index}',
+            'vendor_location': 'Lagos',
+            'vendor_address': f'{index % 300} Market Road, Yaba',
+            'vendor_contact': '08012345678',
+            'vendor_email': f'vendor{index}@example.com',
+            'vendor_merchandise': 'Groceries',
+            'vendor_scale': 'Retail',
+            'vendor_rating': index % 5 + 1,
+            'created_at': created_at.isoformat(),
+            'updated_at': None,
+            'vendor_metadata': {'total_purchases': index % 40},
+            'is_active': index % 7 != 0,
+            'deleted': False,
+            'userId': f'10000000-0000-0000-0000-{index:012d}',
+        }
+
+
+def vendor_tuples(count: int) -> Iterator[tuple]:
+    """The same rows as the column tuples the Parquet export reads from the cursor."""
+    names = [name for name, _, _ in VENDOR_PARQUET_COLUMNS]
+    for row in vendor_rows(count):
+        row['user_id'] = row.pop('userId')
+        row['created_at'] = datetime.fromisoformat(row['created_at'])
+        yield tuple(row[name] for name in names)
+
+
+def render(format: str, count: int, path: str) -> int:
+    if format == 'csv':
+        with open(path, 'wb') as handle:
+            for chunk in render_csv(vendor_rows(count), VENDOR_EXPORT_COLUMNS, VENDOR_EXPORT_FORMATTERS):
+                handle.write(chunk)
+        return count
+    if format == 'parquet':
+        return render_parquet(vendor_tuples(count), VENDOR_PARQUET_COLUMNS, path)
+    return render_pdf(vendor_rows(count), VENDOR_PDF_COLUMNS, path, VENDOR_EXPORT_FORMATTERS)
+
+
+def check_pdf(path: str, rows: int):
+    """Raise unless every text of the PDF at ``path`` lies inside the page and the
+    leftmost column holds ``rows`` distinct ids below the page headers."""
+    with open(path, 'rb') as handle:
+        document = handle.read()
+    width, height = (float(value) for value in PDF_MEDIABOX.search(document).groups())
+    ids = set()
+    for stream in PDF_STREAM.findall(document):
+        texts = [(float(x), float(y), text) for x, y, text in PDF_TEXT.findall(zlib.decompress(stream))]
+        outside = [(x, y) for x, y, _ in texts if not (0 <= x <= width and 0 <= y <= height)]
+        if outside:
+            raise AssertionError(f'{len(outside)} texts drawn outside the {width}x{height} page, e.g. {outside[0]}')
+        left = min(x for x, _, _ in texts)
+        ids.update(text for x, _, text in texts[1:] if x == left)
+    if len(ids) != rows:
+        raise AssertionError(f'{len(ids)} distinct rows in the PDF, expected {rows}')
+
+
+def measure(format: str, count: int) -> dict:
+    fd, path = tempfile.mkstemp(suffix=f'.{format}')
+    os.close(fd)
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        rows = render(format, count, path)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = os.path.getsize(path)
+        if format == 'pdf':
+            check_pdf(path, rows)
+    finally:
+        os.unlink(path)
+    return {
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed) if elapsed else None,
+        'peak_heap_bytes': peak,
+        'output_bytes': size,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--format', choices=FORMATS, action='append', help='default: every format')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--output', help='also write the results JSON here')
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, dict]] = {}
+    for format in args.format or FORMATS:
+        if format == 'parquet' and not parquet_available():
+            print('parquet skipped: pyarrow is not installed', file=sys.stderr)
+            continue
+        results[format] = {}
+        for count in args.rows:
+            result = measure(format, count)
+            results[format][str(count)] = result
+            print(f'{format:<4} {count:>9,} rows  {result["rows_per_second"] or 0:>9,} rows/s  '
+                  f'peak heap {result["peak_heap_bytes"] / 1e6:>8.1f} MB  output {result["output_bytes"] / 1e6:.1f} MB',
+                  file=sys.stderr)
+
+    document = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(document, handle, indent=2, sort_keys=True)
+    print(json.dumps(document, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
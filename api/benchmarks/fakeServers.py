@@ -0,0 +1,119 @@
+"""Local stand-ins for the external services the app talks to during load tests.
+
+``FakeMailboxLayer`` answers the MailboxLayer ``/api/check`` call with a valid,
+deliverable result, and ``FakeSMTPServer`` accepts (and counts) outgoing mail
+without TLS. Both bind to 127.0.0.1 on a free port and run in daemon threads.
+"""
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _MailboxLayerHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests_served += 1
+        body = json.dumps({
+            'format_valid': True,
+            'mx_found': True,
+            'smtp_check': True,
+            'disposable': False,
+            'score': 0.96,
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeMailboxLayer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.server = ThreadingHTTPServer((host, port), _MailboxLayerHandler)
+        self.server.daemon_threads = True
+        self.server.requests_served = 0
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/api/check'
+
+    @property
+    def requests_served(self) -> int:
+        return self.server.requests_served
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.reply('220 fake-smtp ESMTP ready')
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            command = raw.decode(errors='replace').strip().upper()
+
+            if command.startswith('EHLO'):
+                self.wfile.write(b'250-fake-smtp\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n')
+            elif command.startswith('HELO'):
+                self.reply('250 fake-smtp')
+            elif command.startswith('AUTH'):
+                self.reply('235 2.7.0 Authentication successful')
+            elif command.startswith('DATA'):
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while True:
+                    line = self.rfile.readline()
+                    if not line or line in (b'.\r\n', b'.\n'):
+                        break
+                self.server.messages_received += 1
+                self.reply('250 2.0.0 Ok: queued')
+            elif command.startswith('QUIT'):
+                self.reply('221 2.0.0 Bye')
+                return
+            elif command.startswith('STARTTLS'):
+                self.reply('454 4.7.0 TLS not available')
+            else:
+                # MAIL FROM, RCPT TO, RSET, NOOP
+                self.reply('250 2.0.0 Ok')
+
+
+class FakeSMTPServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.server = socketserver.ThreadingTCPServer((host, port), _SMTPHandler)
+        self.server.daemon_threads = True
+        self.server.messages_received = 0
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def host(self) -> str:
+        return self.server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    @property
+    def messages_received(self) -> int:
+        return self.server.messages_received
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,384 @@
+"""Microbenchmarks for the per-request serialization and mapping hot paths.
+
+Covers the vendor/buyer response mappers, Pydantic validation of the vendor request
+and response models (per row and as one bulk-import batch), the validated and fast
+(``FastJSONResponse``) serialization paths, JWT encode/decode and the multi-format
+``created_at`` parsing used by the listing filters. ``*_rows`` benchmarks time a
+whole page; divide by the row count for the per-row cost. Run from the ``api``
+directory:
+
+    python -m benchmarks.microBench run                 # print timings
+    python -m benchmarks.microBench record              # store them as the baseline
+    python -m benchmarks.microBench compare --tolerance 0.10
+
+``compare`` exits non-zero when any benchmark is slower than its baseline by more
+than the tolerance. Baselines are machine specific: record them on the machine (or
+CI runner class) that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault('AUTH_SECRET_KEY', 'microbenchmark-secret-key-0000')
+os.environ.setdefault('AUTH_ALGORITHM', 'HS256')
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from jose import jwt
+from pydantic import TypeAdapter
+
+from services.authService.model.authModel import User  # noqa: F401  (resolves Vendor/Buyer relationships)
+from services.users.model.buyerModel import Buyer
+from services.users.model.vendorModel import Vendor
+from services.users.services.buyerService import BuyerService
+from services.users.services.vendorService import VENDOR_IMPORT_ADAPTER, VendorService
+from services.users.bulkImport import validate_batch
+from services.users.utils import (
+    CreateVendorRequest,
+    FetchVendorResponse,
+    VendorResponse,
+    VendorScale,
+    parse_created_at_range,
+)
+from services.serializationService.fastJson import dumps
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'microbench.json')
+SECRET_KEY = 'microbenchmark-secret-key-0000'
+ALGORITHM = 'HS256'
+
+Benchmark = Callable[[], Callable[[], object]]
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    """Register a setup function returning the zero-argument callable to time."""
+    def register(setup: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def make_vendor(index: int = 0) -> Vendor:
+    created_at = datetime(2025, 7, 26, 10, 30) + timedelta(minutes=index)
+    return Vendor(
+        id=str(uuid.UUID(int=index + 1)),
+        vendor_title=f'Vendor {index}',
+        vendor_location='Lagos',
+        vendor_address='12 Market Road, Yaba',
+        vendor_contact='08012345678',
+        vendor_email=f'vendor{index}@example.com',
+        vendor_merchandise='Groceries',
+        created_at=created_at,
+        updated_at=created_at + timedelta(days=1),
+        vendor_rating=4,
+        vendor_scale=VendorScale.Retail,
+        is_active=True,
+        deleted=False,
+        vendor_metadata={'total_purchases': 12, 'tags': ['fresh', 'local']},
+        user_id=str(uuid.UUID(int=10_000 + index)),
+    )
+
+
+def make_buyer(index: int = 0) -> Buyer:
+    created_at = datetime(2025, 7, 26, 10, 30) + timedelta(minutes=index)
+    return Buyer(
+        id=str(uuid.UUID(int=index + 1)),
+        buyer_name=f'Buyer {index}',
+        buyer_email=f'buyer{index}@example.com',
+        buyer_location='Abuja',
+        buyer_address='4 Estate Close, Wuse',
+        buyer_contact='08112345678',
+        created_at=created_at,
+        updated_at=created_at,
+        is_active=True,
+        is_deleted=False,
+        buyer_metadata={'total_purchased': 3},
+        user_id=str(uuid.UUID(int=20_000 + index)),
+    )
+
+
+@benchmark('map_vendor_response')
+def bench_map_vendor_response():
+    service = VendorService(None)
+    vendor = make_vendor()
+    return lambda: service.map_vendor_response(vendor)
+
+
+@benchmark('map_to_buyer_response')
+def bench_map_to_buyer_response():
+    service = BuyerService(None)
+    buyer = make_buyer()
+    return lambda: service.map_to_buyer_response(buyer)
+
+
+@benchmark('validate_create_vendor_request')
+def bench_validate_create_vendor_request():
+    payload = {
+        'vendor_title': '  mama put kitchen ',
+        'vendor_location': 'lagos',
+        'vendor_address': '12 market road, yaba',
+        'vendor_contact': '08012345678',
+        'vendor_email': 'vendor@example.com',
+        'vendor_merchandise': 'groceries',
+        'vendor_scale': 'Retail',
+    }
+    return lambda: CreateVendorRequest.model_validate(payload)
+
+
+def import_records(count: int) -> List[dict]:
+    return [{
+        'vendor_title': f' vendor {index} ',
+        'vendor_location': 'lagos',
+        'vendor_address': f'{index} market road, yaba',
+        'vendor_contact': '08012345678',
+        'vendor_email': f'vendor{index}@example.com',
+        'vendor_merchandise': 'groceries',
+        'vendor_scale': 'Retail',
+        'user_id': str(uuid.UUID(int=index + 1)),
+    } for index in range(count)]
+
+
+@benchmark('validate_import_per_row_2000_rows')
+def bench_validate_import_per_row():
+    records = import_records(2000)
+    return lambda: [CreateVendorRequest.model_validate(record) for record in records]
+
+
+@benchmark('validate_import_batch_2000_rows')
+def bench_validate_import_batch():
+    batch = list(enumerate(import_records(2000), start=1))
+    return lambda: validate_batch(VENDOR_IMPORT_ADAPTER, batch)
+
+
+@benchmark('validate_vendor_response')
+def bench_validate_vendor_response():
+    mapped = VendorService(None).map_vendor_response(make_vendor())
+    return lambda: VendorResponse.model_validate(mapped)
+
+
+@benchmark('fetch_vendors_response_50_rows')
+def bench_fetch_vendors_response():
+    service = VendorService(None)
+    vendors = [make_vendor(index) for index in range(50)]
+
+    def run():
+        return FetchVendorResponse(
+            data=[service.map_vendor_response(vendor) for vendor in vendors],
+            total=1000,
+            page=1,
+            per_page=50,
+            has_more=True,
+        ).model_dump_json()
+    return run
+
+
+def validated_json(adapter: TypeAdapter, content) -> bytes:
+    """What FastAPI does with a route's return value when it has a response_model."""
+    validated = adapter.validate_python(content)
+    return json.dumps(
+        adapter.dump_python(validated, mode='json'),
+        ensure_ascii=False, allow_nan=False, indent=None, separators=(',', ':'),
+    ).encode()
+
+
+@benchmark('vendor_response_validated')
+def bench_vendor_response_validated():
+    service = VendorService(None)
+    vendor = make_vendor()
+    adapter = TypeAdapter(VendorResponse)
+    return lambda: validated_json(adapter, service.map_vendor_response(vendor))
+
+
+@benchmark('vendor_response_fast_path')
+def bench_vendor_response_fast_path():
+    service = VendorService(None)
+    vendor = make_vendor()
+    return lambda: dumps(service.map_vendor_response(vendor))
+
+
+@benchmark('fetch_vendors_validated_500_rows')
+def bench_fetch_vendors_validated():
+    service = VendorService(None)
+    vendors = [make_vendor(index) for index in range(500)]
+    adapter = TypeAdapter(FetchVendorResponse)
+
+    def run():
+        return validated_json(adapter, FetchVendorResponse(
+            data=[service.map_vendor_response(vendor) for vendor in vendors],
+            total=1000,
+            page=1,
+            per_page=500,
+            has_more=True,
+        ))
+    return run
+
+
+@benchmark('fetch_vendors_fast_path_500_rows')
+def bench_fetch_vendors_fast_path():
+    service = VendorService(None)
+    vendors = [make_vendor(index) for index in range(500)]
+
+    def run():
+        return dumps(FetchVendorResponse.model_construct(
+            data=[service.map_vendor_response(vendor) for vendor in vendors],
+            total=1000,
+            page=1,
+            per_page=500,
+            has_more=True,
+        ))
+    return run
+
+
+@benchmark('jwt_encode_access_token')
+def bench_jwt_encode():
+    def run():
+        now = datetime.now(timezone.utc)
+        return jwt.encode({
+            'sub': 'vendor@example.com',
+            'id': '00000000-0000-0000-0000-000000000001',
+            'role': 'user',
+            'jti': 'c0ffee',
+            'token_type': 'access',
+            'iat': now,
+            'exp': now + timedelta(minutes=40),
+        }, SECRET_KEY, algorithm=ALGORITHM)
+    return run
+
+
+@benchmark('jwt_decode_access_token')
+def bench_jwt_decode():
+    token = jwt.encode({
+        'sub': 'vendor@example.com',
+        'id': '00000000-0000-0000-0000-000000000001',
+        'role': 'user',
+        'token_type': 'access',
+        'exp': datetime.now(timezone.utc) + timedelta(days=365),
+    }, SECRET_KEY, algorithm=ALGORITHM)
+    return lambda: jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+@benchmark('parse_created_at_first_format')
+def bench_parse_created_at_first():
+    return lambda: parse_created_at_range('26-07-25')
+
+
+@benchmark('parse_created_at_iso_format')
+def bench_parse_created_at_iso():
+    return lambda: parse_created_at_range('2025-07-26')
+
+
+@benchmark('parse_created_at_last_format')
+def bench_parse_created_at_last():
+    return lambda: parse_created_at_range('26.07.2025')
+
+
+def time_benchmark(func: Callable[[], object], repeat: int, min_time: float) -> dict:
+    """Time ``func`` in ``repeat`` rounds of a calibrated loop count; report ns per call."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - start >= min_time:
+            break
+        loops *= 2
+
+    rounds: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        rounds.append((time.perf_counter() - start) / loops * 1e9)
+
+    return {
+        'loops': loops,
+        'min_ns': round(min(rounds), 1),
+        'median_ns': round(statistics.median(rounds), 1),
+    }
+
+
+def run_benchmarks(selected: Optional[str], repeat: int, min_time: float) -> Dict[str, dict]:
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if selected and selected not in name:
+            continue
+        results[name] = time_benchmark(setup(), repeat, min_time)
+        print(f'{name:<36} {results[name]["min_ns"]:>12.1f} ns  (median {results[name]["median_ns"]:.1f})',
+              file=sys.stderr)
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    regressions = []
+    print(f'{"benchmark":<36} {"baseline ns":>12} {"current ns":>12} {"change":>8}')
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f'{name:<36} {"-":>12} {current["min_ns"]:>12.1f} {"new":>8}')
+            continue
+        change = current['min_ns'] / previous['min_ns'] - 1
+        flag = '  REGRESSION' if change > tolerance else ''
+        print(f'{name:<36} {previous["min_ns"]:>12.1f} {current["min_ns"]:>12.1f} {change:>+8.1%}{flag}')
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['run', 'record', 'compare'])
+    parser.add_argument('--filter', help='only run benchmarks whose name contains this')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed slowdown, 0.10 = 10%%')
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--min-time', type=float, default=0.1, help='seconds per timing round')
+    parser.add_argument('--output', help='also write the results JSON here')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.filter, args.repeat, args.min_time)
+    document = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+        },
+        'benchmarks': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(document, handle, indent=2, sort_keys=True)
+
+    if args.command == 'run':
+        print(json.dumps(document, indent=2, sort_keys=True))
+        return 0
+
+    if args.command == 'record':
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as handle:
+            json.dump(document, handle, indent=2, sort_keys=True)
+            handle.write('\n')
+        print(f'baseline written to {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'no baseline at {args.baseline}; run "record" first', file=sys.stderr)
+        return 2
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)['benchmarks']
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f'{len(regressions)} benchmark(s) regressed beyond {args.tolerance:.0%}: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
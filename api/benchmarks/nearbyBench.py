@@ -0,0 +1,122 @@
+"""Latency benchmark for nearby-vendor discovery.
+
+Seeds a throwaway database with the bulk seeder (or reuses ``--database-url`` with
+``--skip-seed``), then times ``NearbyService.nearby_vendors`` for origins that hit
+the hard cases: a city centre where every vendor geocoded to the same point, a
+district with a radius, and an empty area where the k-nearest search widens to its
+maximum radius. Reports p50/p95/max per case. Run from the ``api`` directory:
+
+    python -m benchmarks.nearbyBench --vendors 60000
+    python -m benchmarks.nearbyBench --database-url sqlite:///bench.db --skip-seed --repeat 50
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from benchmarks.loadTest import percentile
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> nearby_vendors keyword arguments
+CASES = {
+    'lagos_k20': {'location': 'Lagos', 'k': 20},
+    'lagos_radius_5km': {'location': 'Lagos', 'radius_km': 5, 'k': 100},
+    'yaba_radius_2km': {'location': 'Yaba, Lagos', 'radius_km': 2, 'k': 20},
+    'abuja_radius_50km': {'location': 'Abuja', 'radius_km': 50, 'k': 100},
+    'open_sea_k20': {'latitude': 0.0, 'longitude': 0.0, 'k': 20},
+}
+
+
+def measure(service, admin: dict, arguments: dict, repeat: int) -> dict:
+    timings = []
+    hits = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = service.nearby_vendors(admin, **arguments)
+        timings.append((time.perf_counter() - start) * 1000)
+        hits = len(response.data)
+    timings.sort()
+    return {
+        'hits': hits,
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'max_ms': round(timings[-1], 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='defaults to a temporary SQLite file')
+    parser.add_argument('--skip-seed', action='store_true', help='benchmark the data already in --database-url')
+    parser.add_argument('--users', type=int, default=None, help='default: the vendor count')
+    parser.add_argument('--vendors', type=int, default=60_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='also write the results JSON here')
+    parser.add_argument('--keep', action='store_true', help='keep the temporary database directory for debugging')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='locale-nearbybench-')
+    os.environ['DATABASE_URL'] = args.database_url or f'sqlite:///{os.path.join(workdir, "nearby.db")}'
+    os.environ.setdefault('AUTH_SECRET_KEY', 'nearby-bench-secret-key-00000')
+    os.environ.setdefault('AUTH_ALGORITHM', 'HS256')
+    os.chdir(API_DIR)
+
+    try:
+        from sqlalchemy import func
+
+        from benchmarks.seedData import seed_database
+        from config.database import SessionLocal, engine, ensure_indexes
+        from services.geoService.model.locationModel import VendorLocation
+        from services.geoService.nearbyService import NearbyService
+
+        if not args.skip_seed:
+            seed_database(engine, users=args.users or args.vendors, vendors=args.vendors, buyers=0, blacklisted=0)
+        ensure_indexes(engine)
+        with engine.begin() as conn:
+            conn.exec_driver_sql('ANALYZE')
+
+        db = SessionLocal()
+        try:
+            located = db.query(func.count(VendorLocation.vendor_id)).scalar()
+            service = NearbyService(db)
+            admin = {'id': None, 'username': 'bench', 'role': 'admin'}
+            results: Dict[str, dict] = {}
+            for name, arguments in CASES.items():
+                results[name] = measure(service, admin, arguments, args.repeat)
+                print(f'{name:<20} {results[name]["hits"]:>4} hits  p50 {results[name]["p50_ms"]:>8.2f} ms  '
+                      f'p95 {results[name]["p95_ms"]:>8.2f} ms', file=sys.stderr)
+        finally:
+            db.close()
+            engine.dispose()
+    finally:
+        if args.keep:
+            print(f'kept {workdir}', file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    document = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'database': os.environ['DATABASE_URL'].split(':', 1)[0],
+            'located_vendors': located,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(document, handle, indent=2, sort_keys=True)
+    print(json.dumps(document, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
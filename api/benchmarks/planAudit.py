@@ -0,0 +1,401 @@
+"""Query-plan audit for the queries the services issue.
+
+Seeds a throwaway database, drives every service query path against it while
+capturing the SQL each one sends, then runs ``EXPLAIN`` on every captured
+statement. Exits non-zero when a statement scans a whole table that its scenario
+does not explicitly allow, or when a scenario raises before its queries could be
+audited, so a dropped index or a rewritten filter that stops using one fails CI. Run from the ``api`` directory:
+
+    python -m benchmarks.planAudit                     # SQLite temp file
+    python -m benchmarks.planAudit --database-url postgresql://... --verbose
+
+SQLite plans are read from ``EXPLAIN QUERY PLAN`` (``SCAN <table>`` is a full scan,
+including full scans of a covering index); Postgres plans from
+``EXPLAIN (FORMAT JSON)`` (``Seq Scan`` nodes). ``ANALYZE`` runs after seeding so
+both planners see realistic statistics.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import shutil
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_EXPLAINABLE = re.compile(r'^\s*(SELECT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+_SQLITE_SCAN = re.compile(r'^SCAN (\w+)')
+
+
+@dataclass
+class Scenario:
+    name: str
+    run: Callable[[SimpleNamespace, SimpleNamespace], None]
+    # table -> why a full scan is expected for this scenario
+    allowed_scans: Dict[str, str] = field(default_factory=dict)
+
+
+SCENARIOS: List[Scenario] = []
+
+
+def scenario(name: str, allowed_scans: Optional[Dict[str, str]] = None):
+    def register(run):
+        SCENARIOS.append(Scenario(name, run, allowed_scans or {}))
+        return run
+    return register
+
+
+def _ignore_http_errors(call: Callable[[], object]):
+    # services signal "not found"/"conflict" with HTTPException; the queries ran anyway
+    try:
+        call()
+    except Exception as exc:  # noqa: BLE001
+        if type(exc).__name__ != 'HTTPException':
+            raise
+
+
+@scenario('vendor.fetch_vendors.unfiltered', {
+    'vendors': 'an unfiltered page reads rows until LIMIT and the total counts every row',
+})
+def fetch_vendors_unfiltered(app, ctx):
+    app.VendorService(ctx.db).fetch_vendors(ctx.admin, app.VendorFilter(take=50))
+
+
+@scenario('vendor.fetch_vendors.status_and_date')
+def fetch_vendors_filtered(app, ctx):
+    app.VendorService(ctx.db).fetch_vendors(ctx.admin, app.VendorFilter(
+        is_active=True, is_deleted=False, created_at=ctx.recent_date, take=50
+    ))
+
+
+@scenario('vendor.fetch_vendors.search')
+def fetch_vendors_search(app, ctx):
+    app.VendorService(ctx.db).fetch_vendors(ctx.admin, app.VendorFilter(search='groceries lagos', take=50))
+
+
+@scenario('vendor.fetch_vendors.cursor.first_page', {
+    'vendors': 'the first page walks the (created_at, id) index in order and stops at LIMIT',
+})
+def fetch_vendors_cursor_first_page(app, ctx):
+    app.VendorService(ctx.db).fetch_vendors(ctx.admin, app.VendorFilter(cursor='', take=50, total_mode='none'))
+
+
+@scenario('vendor.fetch_vendors.cursor')
+def fetch_vendors_cursor(app, ctx):
+    app.VendorService(ctx.db).fetch_vendors(
+        ctx.admin, app.VendorFilter(cursor=ctx.vendor_cursor, take=50, total_mode='none'))
+
+
+@scenario('vendor.fetch_vendor')
+def fetch_vendor(app, ctx):
+    app.VendorService(ctx.db).fetch_vendor(ctx.vendor_owner, ctx.vendor_id)
+
+
+@scenario('vendor.create_vendor.existing_profile')
+def create_vendor_conflict(app, ctx):
+    # CreateVendorRequest is a pydantic dataclass over BaseModel and takes no keyword arguments
+    request = app.CreateVendorRequest.model_validate({
+        'vendor_title': 'audit vendor', 'vendor_location': 'lagos', 'vendor_address': '1 market road, yaba',
+        'vendor_contact': '08000000000', 'vendor_email': 'audit@example.com', 'vendor_merchandise': 'groceries',
+        'vendor_scale': 'Retail',
+    })
+    _ignore_http_errors(lambda: app.VendorService(ctx.db).create_vendor(ctx.vendor_owner, request))
+
+
+@scenario('vendor.update_vendor')
+def update_vendor(app, ctx):
+    _ignore_http_errors(lambda: app.VendorService(ctx.db).update_vendor(
+        ctx.vendor_owner, ctx.vendor_id, app.UpdateVendorInput(vendor_address='2 Allen Avenue, Ikeja')
+    ))
+
+
+@scenario('vendor.set_vendor_deletion_status')
+def delete_vendor(app, ctx):
+    _ignore_http_errors(lambda: app.VendorService(ctx.db).set_vendor_deletion_status(
+        ctx.vendor_owner, ctx.vendor_id, False, 'plan audit'
+    ))
+
+
+@scenario('vendor.toggle_vendor_active_status')
+def toggle_vendor(app, ctx):
+    _ignore_http_errors(lambda: app.VendorService(ctx.db).toggle_vendor_active_status(
+        ctx.admin, True, ctx.vendor_id, 'plan audit'
+    ))
+
+
+@scenario('vendor.nearby')
+def nearby_vendors(app, ctx):
+    service = app.NearbyService(ctx.db)
+    service.nearby_vendors(ctx.buyer_owner, radius_km=5, k=20)
+    service.nearby_vendors(ctx.buyer_owner, location='Abuja', k=20)
+
+
+@scenario('buyer.fetch_buyers.unfiltered', {
+    'buyers': 'an unfiltered page reads rows until LIMIT and the total counts every row',
+})
+def fetch_buyers_unfiltered(app, ctx):
+    app.BuyerService(ctx.db).fetch_buyers(ctx.admin, app.BuyerFilter(skip=0, take=50))
+
+
+@scenario('buyer.fetch_buyers.status_and_date')
+def fetch_buyers_filtered(app, ctx):
+    app.BuyerService(ctx.db).fetch_buyers(ctx.admin, app.BuyerFilter(
+        is_active=True, is_deleted=False, created_at=ctx.recent_date, skip=0, take=50
+    ))
+
+
+@scenario('buyer.fetch_buyer')
+def fetch_buyer(app, ctx):
+    _ignore_http_errors(lambda: app.BuyerService(ctx.db).fetch_buyer(ctx.buyer_owner))
+
+
+@scenario('buyer.update_buyer_by_admin')
+def update_buyer(app, ctx):
+    _ignore_http_errors(lambda: app.BuyerService(ctx.db).update_buyer_by_admin(
+        ctx.admin, app.UpdateFilter(buyer_address='4 Estate Close, Wuse'), ctx.buyer_id
+    ))
+
+
+@scenario('buyer.toggle_buyer_admin')
+def toggle_buyer(app, ctx):
+    _ignore_http_errors(lambda: app.BuyerService(ctx.db).toggle_buyer_admin(
+        ctx.admin, app.ToggleFilter(is_active=True), ctx.buyer_id
+    ))
+
+
+@scenario('auth.authenticate_user')
+def authenticate_user(app, ctx):
+    app.AuthService(ctx.db).authenticate_user(app.ADMIN_EMAIL, app.BENCH_PASSWORD)
+
+
+@scenario('auth.is_token_revoked')
+def is_token_revoked(app, ctx):
+    service = app.AuthService(ctx.db)
+    token = service.create_access_token(app.ADMIN_EMAIL, ctx.admin['id'], 'admin', app.timedelta(minutes=5))
+    service.is_token_revoked(token)
+
+
+@scenario('auth.verify_user_token', {
+    'users': 'verification tokens live inside the user_metadata JSON, which has no portable index',
+})
+def verify_user_token(app, ctx):
+    _ignore_http_errors(lambda: app.AuthService(ctx.db).verify_user_token('not-a-real-token'))
+
+
+@scenario('auth.clean_expired_tokens')
+def clean_expired_tokens(app, ctx):
+    app.TokenCleanUpScheduler(ctx.db).clean_expired_tokens()
+
+
+@scenario('admin.search')
+def admin_search(app, ctx):
+    service = app.GlobalSearchService(ctx.db)
+    service.search(ctx.admin, 'okafor')
+    service.search(ctx.admin, 'okafro')  # typo falls back to trigram matching
+
+
+def _load_app() -> SimpleNamespace:
+    """Import the application once DATABASE_URL points at the audit database."""
+    from datetime import timedelta
+
+    from benchmarks.seedData import ADMIN_EMAIL, BENCH_PASSWORD, seed_database
+    from config.database import Base, SessionLocal, engine, ensure_indexes
+    from deps import TokenCleanUpScheduler
+    from services.authService.authService import AuthService
+    from services.cacheService.tableVersions import track_table_writes
+    from services.geoService.locationIndex import track_locations
+    from services.geoService.nearbyService import NearbyService
+    from services.searchService.globalSearch import ensure_global_search_index, track_search_documents
+    from services.searchService.globalSearchService import GlobalSearchService
+    from services.searchService.vendorSearch import ensure_vendor_search_index
+    from services.users.services.buyerService import BuyerService
+    from services.users.services.vendorService import VendorService
+    from services.users.utils import (
+        BuyerFilter,
+        CreateVendorRequest,
+        ToggleFilter,
+        UpdateFilter,
+        UpdateVendorInput,
+        VendorFilter,
+    )
+
+    track_table_writes(SessionLocal)
+    track_search_documents(SessionLocal)
+    track_locations(SessionLocal)
+    return SimpleNamespace(**locals())
+
+
+@contextmanager
+def capture_statements(engine) -> Iterator[List[Tuple[str, object]]]:
+    from sqlalchemy import event
+
+    captured: List[Tuple[str, object]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and _EXPLAINABLE.match(statement):
+            captured.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def explain(conn, statement: str, parameters) -> Tuple[List[str], List[str]]:
+    """(plan lines, fully scanned tables) for one statement."""
+    if conn.dialect.name == 'postgresql':
+        plan = conn.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + statement, parameters).scalar()
+        lines, scans = [], []
+
+        def walk(node, depth):
+            relation = node.get('Relation Name')
+            lines.append('  ' * depth + node['Node Type'] + (f' on {relation}' if relation else ''))
+            if node['Node Type'] == 'Seq Scan' and relation:
+                scans.append(relation)
+            for child in node.get('Plans', []):
+                walk(child, depth + 1)
+
+        walk(plan[0]['Plan'], 0)
+        return lines, scans
+
+    rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+    lines = [row[-1] for row in rows]
+    scans = [match.group(1) for match in map(_SQLITE_SCAN.match, lines) if match]
+    return lines, scans
+
+
+def run_audit(app, ctx, selected: Optional[str], verbose: bool) -> List[dict]:
+    from services.metricsService.queryInstrumentation import normalize_sql
+
+    tables = set(app.Base.metadata.tables)
+    findings = []
+    for case in SCENARIOS:
+        if selected and selected not in case.name:
+            continue
+        with capture_statements(app.engine) as captured:
+            try:
+                case.run(app, ctx)
+            except Exception as exc:  # noqa: BLE001
+                # a scenario that cannot run audits nothing, which must not read as a pass
+                error = f'{type(exc).__name__}: {exc}'
+                print(f'\n[{case.name}] scenario failed before its queries were audited: {error}', file=sys.stderr)
+                findings.append({'scenario': case.name, 'error': error})
+        ctx.db.rollback()
+
+        seen = set()
+        with app.engine.connect() as conn:
+            for statement, parameters in captured:
+                shape = normalize_sql(statement)
+                if shape in seen:
+                    continue
+                seen.add(shape)
+                lines, scans = explain(conn, statement, parameters)
+                unexpected = sorted({table for table in scans if table in tables} - set(case.allowed_scans))
+                if verbose or unexpected:
+                    print(f'\n[{case.name}] {shape[:160]}', file=sys.stderr)
+                    for line in lines:
+                        print(f'    {line}', file=sys.stderr)
+                if unexpected:
+                    findings.append({'scenario': case.name, 'statement': shape, 'full_scans': unexpected,
+                                     'plan': lines})
+        print(f'{case.name:<44} {len(seen):>3} statements', file=sys.stderr)
+    return findings
+
+
+def build_context(app) -> SimpleNamespace:
+    from sqlalchemy import func
+
+    from benchmarks.seedData import user_id_for
+    from services.authService.model.authModel import User
+    from services.users.pagination import encode_cursor
+    from services.users.model.buyerModel import Buyer
+    from services.users.model.vendorModel import Vendor
+
+    db = app.SessionLocal()
+    admin = db.query(User).filter(User.email == app.ADMIN_EMAIL).one()
+    vendor = db.query(Vendor).filter(Vendor.user_id == user_id_for(1)).one()
+    buyer = db.query(Buyer).order_by(Buyer.created_at.desc()).first()
+    newest = db.query(func.max(Vendor.created_at)).scalar()
+    return SimpleNamespace(
+        db=db,
+        admin={'id': admin.id, 'username': admin.email, 'role': 'admin'},
+        vendor_owner={'id': vendor.user_id, 'username': 'vendor', 'role': 'user'},
+        vendor_id=vendor.id,
+        buyer_owner={'id': buyer.user_id, 'username': buyer.buyer_email, 'role': 'user'},
+        buyer_id=buyer.id,
+        recent_date=newest.strftime('%Y-%m-%d'),
+        # built up front so the next-page scenario captures only the seek, not the first page
+        vendor_cursor=encode_cursor(vendor.created_at, vendor.id),
+    )
+
+
+def audit(args: argparse.Namespace) -> List[dict]:
+    app = _load_app()
+    try:
+        app.seed_database(app.engine, users=args.users, vendors=args.vendors, buyers=args.buyers,
+                          blacklisted=args.blacklisted)
+        app.ensure_indexes(app.engine)
+        app.ensure_vendor_search_index(app.engine)
+        app.ensure_global_search_index(app.engine)
+        with app.engine.begin() as conn:
+            conn.exec_driver_sql('ANALYZE')
+
+        ctx = build_context(app)
+        try:
+            return run_audit(app, ctx, args.filter, args.verbose)
+        finally:
+            ctx.db.close()
+    finally:
+        app.engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='defaults to a temporary SQLite file')
+    parser.add_argument('--users', type=int, default=20_000)
+    parser.add_argument('--vendors', type=int, default=10_000)
+    parser.add_argument('--buyers', type=int, default=8_000)
+    parser.add_argument('--blacklisted', type=int, default=10_000)
+    parser.add_argument('--filter', help='only run scenarios whose name contains this')
+    parser.add_argument('--verbose', action='store_true', help='print every plan, not only failures')
+    parser.add_argument('--output', help='write findings JSON here')
+    parser.add_argument('--keep', action='store_true', help='keep the temporary database directory for debugging')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='locale-planaudit-')
+    os.environ['DATABASE_URL'] = args.database_url or f'sqlite:///{os.path.join(workdir, "audit.db")}'
+    os.environ.setdefault('AUTH_SECRET_KEY', 'plan-audit-secret-key-0000000')
+    os.environ.setdefault('AUTH_ALGORITHM', 'HS256')
+    os.chdir(API_DIR)
+
+    try:
+        findings = audit(args)
+    finally:
+        if args.keep:
+            print(f'kept {workdir}', file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(findings, handle, indent=2, sort_keys=True)
+
+    errors = sum(1 for finding in findings if 'error' in finding)
+    if errors:
+        print(f'\n{errors} scenario(s) failed to run', file=sys.stderr)
+    if len(findings) > errors:
+        print(f'\n{len(findings) - errors} statement(s) fall back to a full table scan', file=sys.stderr)
+    if findings:
+        return 1
+    print('\nno unexpected full table scans', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
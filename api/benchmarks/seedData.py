@@ -0,0 +1,375 @@
+"""Bulk synthetic data generator for users, vendors, buyers and blacklisted tokens.
+
+Rows are produced lazily from per-table random streams derived from ``--seed`` (so
+the same seed and ``--now`` always yield the same data, and changing one table's
+count does not reshuffle the others) and written with Core ``insert()`` executemany batches inside
+periodic commits, never ORM ``add``/``commit`` per row. Distributions aim to look
+like production: city-weighted locations (with a gazetteer district in most
+addresses, so geocoded points spread across a city), a Retail-heavy ``VendorScale`` mix,
+``created_at`` growing towards ``--now`` (a fixed date unless given), soft-deleted/inactive fractions and
+long-tailed metadata sizes.
+
+Every seeded user shares ``BENCH_PASSWORD`` (stored as a precomputed hash) and ``ADMIN_EMAIL`` is an
+admin account the load test signs in with. Run from the ``api`` directory:
+
+    python -m benchmarks.seedData --database-url sqlite:///bench.db \\
+        --users 4000000 --vendors 2500000 --buyers 2500000 --blacklisted 1000000
+"""
+import argparse
+import math
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection, Engine
+
+from config.database import Base
+from services.authService.model.authModel import User
+from services.authService.model.blacklistModel import TokenBlacklist
+from services.authService.utils import UserRole, UserStatus
+from services.geoService.gazetteer import default_gazetteer
+from services.geoService.locationIndex import backfill_locations
+from services.searchService.globalSearch import rebuild_search_documents
+from services.users.model.buyerModel import Buyer
+from services.users.model.vendorModel import Vendor
+from services.users.utils import VendorScale
+
+BENCH_PASSWORD = 'Bench-password-1'
+# bcrypt (12 rounds) of BENCH_PASSWORD with a fixed salt; a fresh salt per run would make reseeds differ
+BENCH_PASSWORD_HASH = '$2b$12$p0wzLx4x9PFax4tQMubifO1ZpbqgaMGCpBMM6tShssoDs98OGZPWi'
+# default --now: timestamps are generated relative to this, not the wall clock
+SEED_EPOCH = datetime(2026, 1, 1)
+ADMIN_EMAIL = 'admin@bench.locale'
+
+# (value, weight) pairs
+LOCATIONS = [
+    ('Lagos', 30), ('Abuja', 14), ('Kano', 9), ('Ibadan', 8), ('Port Harcourt', 8),
+    ('Benin City', 5), ('Enugu', 5), ('Kaduna', 4), ('Onitsha', 4), ('Aba', 3),
+    ('Jos', 3), ('Ilorin', 2), ('Abeokuta', 2), ('Warri', 2), ('Owerri', 1),
+]
+MERCHANDISE = [
+    ('Groceries', 25), ('Phones', 12), ('Fabrics', 12), ('Cosmetics', 10), ('Electronics', 9),
+    ('Furniture', 6), ('Books', 4), ('Auto Parts', 6), ('Building Materials', 5),
+    ('Livestock', 4), ('Pharmacy', 4), ('Baby Products', 3),
+]
+VENDOR_SCALES = [(VendorScale.Retail, 80), (VendorScale.Wholesale, 20)]
+VENDOR_RATINGS = [(1, 4), (2, 8), (3, 22), (4, 41), (5, 25)]
+USER_STATUSES = [
+    (UserStatus.Active_User, 62), (UserStatus.New_User, 18),
+    (UserStatus.Inactive_user, 14), (UserStatus.Loyal_customer, 6),
+]
+STREETS = ['Market Road', 'Broad Street', 'Allen Avenue', 'Ring Road', 'Station Road',
+           'Airport Road', 'Estate Close', 'Church Street', 'Hospital Road', 'Old Road']
+FIRST_NAMES = ['Ada', 'Chidi', 'Emeka', 'Funke', 'Ibrahim', 'Kemi', 'Musa', 'Ngozi', 'Olu',
+               'Segun', 'Tunde', 'Yemi', 'Zainab', 'Bola', 'Femi', 'Hauwa', 'Ifeoma', 'Sani']
+LAST_NAMES = ['Adeyemi', 'Okafor', 'Bello', 'Eze', 'Abubakar', 'Ogunleye', 'Nwosu', 'Lawal',
+              'Okonkwo', 'Danjuma', 'Balogun', 'Obi', 'Usman', 'Ajayi', 'Chukwu', 'Garba']
+
+# share of addresses naming a district of their city, where the gazetteer has any
+ADDRESS_DISTRICT = 0.7
+
+# soft-delete / deactivation fractions
+VENDOR_DELETED = 0.05
+VENDOR_INACTIVE = 0.10
+BUYER_DELETED = 0.03
+BUYER_INACTIVE = 0.08
+BLACKLIST_EXPIRED = 0.6
+
+
+class WeightedChoice:
+    """Fast repeated weighted sampling from a fixed (value, weight) table."""
+
+    def __init__(self, pairs: Sequence[Tuple[object, float]]):
+        self.values = [value for value, _ in pairs]
+        self.cumulative = list(accumulate(weight for _, weight in pairs))
+
+    def __call__(self, rng: random.Random):
+        return rng.choices(self.values, cum_weights=self.cumulative)[0]
+
+
+pick_location = WeightedChoice(LOCATIONS)
+pick_merchandise = WeightedChoice(MERCHANDISE)
+pick_scale = WeightedChoice(VENDOR_SCALES)
+pick_rating = WeightedChoice(VENDOR_RATINGS)
+pick_user_status = WeightedChoice(USER_STATUSES)
+
+
+def sequential_id(namespace: int, index: int) -> str:
+    """Deterministic UUID-formatted id; monotonic per table so primary-key inserts append."""
+    return str(uuid.UUID(int=(namespace << 96) | index))
+
+
+def user_id_for(index: int) -> str:
+    return sequential_id(1, index)
+
+
+def created_at_for(rng: random.Random, now: datetime, days: int) -> datetime:
+    """Timestamps with linearly growing density towards ``now`` (a growing marketplace)."""
+    age_fraction = 1 - math.sqrt(rng.random())
+    return now - timedelta(seconds=age_fraction * days * 86400)
+
+
+def metadata_for(rng: random.Random, base: Dict[str, object]) -> Dict[str, object]:
+    """Mostly small metadata with a long (log-normal) tail of notes/history."""
+    metadata = dict(base)
+    extra_entries = int(rng.lognormvariate(0.0, 1.2))
+    if extra_entries:
+        metadata['history'] = [
+            {'event': rng.choice(['restock', 'promo', 'review', 'price_change']), 'seq': n}
+            for n in range(min(extra_entries, 200))
+        ]
+    if rng.random() < 0.15:
+        metadata['notes'] = 'x' * min(int(rng.lognormvariate(4.0, 1.0)), 8000)
+    return metadata
+
+
+def districts_by_city() -> Dict[str, List[str]]:
+    districts: Dict[str, List[str]] = {}
+    for place in default_gazetteer().places.values():
+        if not place.is_city:
+            districts.setdefault(place.city, []).append(place.name)
+    return {city: sorted(names) for city, names in districts.items()}
+
+
+def address_for(rng: random.Random, location: str, districts: Dict[str, List[str]]) -> str:
+    street = f'{rng.randint(1, 400)} {rng.choice(STREETS)}'
+    if location in districts and rng.random() < ADDRESS_DISTRICT:
+        return f'{street}, {rng.choice(districts[location])}'
+    return street
+
+
+def phone_for(prefix: str, index: int) -> str:
+    return f'{prefix}{index % 10**8:08d}'
+
+
+def generate_users(seed: int, count: int, now: datetime, days: int, hashed_password: str) -> Iterator[dict]:
+    rng = random.Random(f'{seed}:users')
+    yield {
+        'id': sequential_id(0, 0),
+        'email': ADMIN_EMAIL,
+        'first_name': 'Bench',
+        'last_name': 'Admin',
+        'phone_number': '08000000000',
+        'hashed_password': hashed_password,
+        'created_at': now,
+        'role': UserRole.Admin,
+        'user_active': True,
+        'user_status': UserStatus.Active_User,
+        'email_validated': True,
+        'user_metadata': {'verified': True},
+    }
+    for index in range(count):
+        user_status = pick_user_status(rng)
+        verified = rng.random() < 0.9
+        yield {
+            'id': user_id_for(index),
+            'email': f'user{index}@bench.locale',
+            'first_name': rng.choice(FIRST_NAMES),
+            'last_name': rng.choice(LAST_NAMES),
+            'phone_number': phone_for(rng.choice(['080', '081', '070', '090']), index),
+            'hashed_password': hashed_password,
+            'created_at': created_at_for(rng, now, days),
+            'role': UserRole.Admin if rng.random() < 0.001 else UserRole.User,
+            'user_active': user_status != UserStatus.Inactive_user,
+            'user_status': user_status,
+            'email_validated': verified,
+            'user_metadata': {'verified': verified}
+            if verified else {'verified': False, 'verification_token': str(uuid.UUID(int=rng.getrandbits(128)))},
+        }
+
+
+def generate_vendors(seed: int, count: int, now: datetime, days: int) -> Iterator[dict]:
+    rng = random.Random(f'{seed}:vendors')
+    districts = districts_by_city()
+    for index in range(count):
+        created_at = created_at_for(rng, now, days)
+        merchandise = pick_merchandise(rng)
+        location = pick_location(rng)
+        yield {
+            'id': sequential_id(2, index),
+            'vendor_title': f'{rng.choice(LAST_NAMES)} {merchandise} {index}',
+            'vendor_location': location,
+            'vendor_address': address_for(rng, location, districts),
+            'vendor_contact': phone_for(rng.choice(['080', '081', '070', '090']), index),
+            'vendor_email': f'vendor{index}@bench.locale' if rng.random() < 0.93 else None,
+            'vendor_merchandise': merchandise,
+            'created_at': created_at,
+            'updated_at': created_at + timedelta(days=rng.randint(0, 60)) if rng.random() < 0.4 else None,
+            'vendor_rating': pick_rating(rng),
+            'vendor_scale': pick_scale(rng),
+            'is_active': rng.random() >= VENDOR_INACTIVE,
+            'deleted': rng.random() < VENDOR_DELETED,
+            'vendor_metadata': metadata_for(rng, {'total_purchases': int(rng.paretovariate(1.5)) - 1}),
+            # vendors own the first ``count`` users (one vendor profile per user)
+            'user_id': user_id_for(index),
+        }
+
+
+def generate_buyers(seed: int, count: int, users: int, now: datetime, days: int) -> Iterator[dict]:
+    rng = random.Random(f'{seed}:buyers')
+    # buyers own the last ``count`` users, overlapping vendors only when users are scarce
+    offset = users - count
+    districts = districts_by_city()
+    for index in range(count):
+        created_at = created_at_for(rng, now, days)
+        location = pick_location(rng)
+        yield {
+            'id': sequential_id(3, index),
+            'buyer_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            'buyer_email': f'buyer{index}@bench.locale',
+            'buyer_location': location,
+            'buyer_address': address_for(rng, location, districts),
+            'buyer_contact': phone_for(rng.choice(['080', '081', '070', '090']), index),
+            'created_at': created_at,
+            'updated_at': created_at + timedelta(days=rng.randint(0, 30)),
+            'is_active': rng.random() >= BUYER_INACTIVE,
+            'is_deleted': rng.random() < BUYER_DELETED,
+            'buyer_metadata': metadata_for(rng, {'total_purchased': int(rng.paretovariate(1.2)) - 1}),
+            'user_id': user_id_for(offset + index),
+        }
+
+
+def generate_blacklist(seed: int, count: int, users: int, now: datetime) -> Iterator[dict]:
+    rng = random.Random(f'{seed}:token_blacklist')
+    for index in range(count):
+        expired = rng.random() < BLACKLIST_EXPIRED
+        expires = now - timedelta(hours=rng.uniform(0, 72)) if expired else now + timedelta(hours=rng.uniform(0, 72))
+        yield {
+            'id': sequential_id(4, index),
+            'token': uuid.UUID(int=rng.getrandbits(128)).hex + uuid.UUID(int=rng.getrandbits(128)).hex,
+            'user_id': user_id_for(rng.randrange(users)) if users else '',
+            'expires': expires,
+            'revoked_at': expires - timedelta(days=3),
+        }
+
+
+def _batches(rows: Iterator[dict], batch_size: int) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _prepare_connection(conn: Connection):
+    """Relax durability for the loading session only; the data is disposable."""
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        conn.exec_driver_sql('PRAGMA synchronous = OFF')
+        conn.exec_driver_sql('PRAGMA cache_size = -262144')
+        conn.exec_driver_sql('PRAGMA temp_store = MEMORY')
+    elif dialect == 'postgresql':
+        conn.exec_driver_sql('SET synchronous_commit = off')
+
+
+def load_table(
+        conn: Connection,
+        table: Table,
+        rows: Iterator[dict],
+        batch_size: int,
+        progress: Optional[Callable[[str, int], None]] = None
+) -> int:
+    inserted = 0
+    for batch in _batches(rows, batch_size):
+        conn.execute(table.insert(), batch)
+        conn.commit()
+        inserted += len(batch)
+        if progress:
+            progress(table.name, inserted)
+    return inserted
+
+
+def seed_database(
+        engine: Engine,
+        users: int = 1000,
+        vendors: int = 500,
+        buyers: int = 300,
+        blacklisted: int = 1000,
+        seed: int = 7,
+        batch_size: int = 20_000,
+        days: int = 3 * 365,
+        now: datetime = SEED_EPOCH,
+        progress: Optional[Callable[[str, int], None]] = None
+) -> Dict[str, int]:
+    """Create the schema if needed and bulk-load synthetic rows; returns rows per table."""
+    vendors = min(vendors, users)
+    buyers = min(buyers, users)
+
+    Base.metadata.create_all(bind=engine)
+
+    counts = {}
+    with engine.connect() as conn:
+        _prepare_connection(conn)
+        counts['users'] = load_table(
+            conn, User.__table__, generate_users(seed, users, now, days, BENCH_PASSWORD_HASH), batch_size, progress)
+        counts['vendors'] = load_table(
+            conn, Vendor.__table__, generate_vendors(seed, vendors, now, days), batch_size, progress)
+        counts['buyers'] = load_table(
+            conn, Buyer.__table__, generate_buyers(seed, buyers, users, now, days), batch_size, progress)
+        counts['token_blacklist'] = load_table(
+            conn, TokenBlacklist.__table__, generate_blacklist(seed, blacklisted, users, now), batch_size, progress)
+
+    # Core inserts skip the session hooks that maintain search documents and locations
+    rebuild_search_documents(engine)
+    backfill_locations(engine, batch_size=batch_size, geocoded_at=now)
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--vendors', type=int, default=600_000)
+    parser.add_argument('--buyers', type=int, default=400_000)
+    parser.add_argument('--blacklisted', type=int, default=500_000)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--days', type=int, default=3 * 365, help='spread of created_at into the past')
+    parser.add_argument('--now', type=datetime.fromisoformat, default=SEED_EPOCH,
+                        help=f'timestamps are generated relative to this (default {SEED_EPOCH.isoformat()})')
+    parser.add_argument('--batch-size', type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    from sqlalchemy import create_engine
+
+    started = time.perf_counter()
+    last_report = [started]
+
+    def progress(table: str, inserted: int):
+        now = time.perf_counter()
+        if now - last_report[0] >= 5:
+            last_report[0] = now
+            print(f'{table}: {inserted:,} rows ({now - started:.0f}s elapsed)', file=sys.stderr)
+
+    engine = create_engine(args.database_url)
+    counts = seed_database(
+        engine,
+        users=args.users,
+        vendors=args.vendors,
+        buyers=args.buyers,
+        blacklisted=args.blacklisted,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        days=args.days,
+        now=args.now,
+        progress=progress,
+    )
+    engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    for table, count in counts.items():
+        print(f'{table:<16} {count:>12,}')
+    print(f'{"total":<16} {total:>12,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
@@ -12,11 +14,63 @@ class Settings(BaseSettings):
     auth_secret_key: str = Field(..., min_length=20)  # Required field
     auth_algorithm: str = Field(default=os.getenv('AUTH_ALGORITHM'))
     mailbox_api_key: str = Field(default=os.getenv('MAILBOX_API_KEY'))
+    mailbox_api_url: str = Field(default='https://apilayer.net/api/check')
     locale_email_address: str = os.getenv('LOCALE_EMAIL_ADDRESS')
     locale_email_password: str = os.getenv('LOCALE_EMAIL_PASSWORD')
     locale_smtp_host: str = os.getenv('LOCALE_SMTP_HOST')
     locale_smtp_port: str = os.getenv('LOCALE_SMTP_PORT')
+    locale_smtp_starttls: bool = Field(default=True)
     locale_frontend_url: str = os.getenv('LOCALE_FRONTEND_URL')
+    db_slow_query_ms: float = Field(default=200.0)
+    db_n_plus_one_threshold: int = Field(default=5)
+    db_debug_headers: bool = Field(default=False)
+    # /metrics answers clients in these networks, or any client sending this bearer token
+    metrics_allowed_networks: str = Field(default='127.0.0.1/32,::1/128')
+    metrics_token: Optional[str] = Field(default=None)
+    profiler_interval_ms: float = Field(default=5.0)
+    profiler_continuous: bool = Field(default=False)
+    profiler_continuous_interval_ms: float = Field(default=100.0)
+    profiler_max_profiles: int = Field(default=50)
+    profiler_max_concurrent: int = Field(default=8)
+    count_cache_size: int = Field(default=1024)
+    count_cache_ttl_seconds: int = Field(default=60)
+    count_estimate_threshold: int = Field(default=100_000)
+    gazetteer_path: str = Field(default='data/gazetteer.csv')
+    nearby_initial_radius_km: float = Field(default=2.0)
+    nearby_max_radius_km: float = Field(default=200.0)
+    response_cache_enabled: bool = Field(default=True)
+    response_cache_max_entries: int = Field(default=512)
+    response_cache_max_bytes: int = Field(default=64 * 1024 * 1024)
+    response_cache_ttl_seconds: int = Field(default=300)
+    cache_redis_url: Optional[str] = Field(default=None)
+    compression_enabled: bool = Field(default=True)
+    compression_min_size: int = Field(default=1024)
+    compression_gzip_level: int = Field(default=6)
+    compression_zstd_level: int = Field(default=3)
+    compression_offload_size: int = Field(default=256 * 1024)
+    stream_batch_size: int = Field(default=500)
+    export_chunk_bytes: int = Field(default=64 * 1024)
+    export_tmp_dir: Optional[str] = Field(default=None)
+    pdf_rows_per_page: int = Field(default=40)
+    parquet_row_group_rows: int = Field(default=65536)
+    parquet_compression: str = Field(default='zstd')
+    export_job_workers: int = Field(default=2)
+    export_job_max_pending: int = Field(default=8)
+    export_job_ttl_seconds: int = Field(default=3600)
+    export_job_cleanup_minutes: int = Field(default=10)
+    export_job_dir: Optional[str] = Field(default=None)
+    export_cache_enabled: bool = Field(default=True)
+    export_cache_dir: Optional[str] = Field(default=None)
+    export_cache_max_bytes: int = Field(default=1024 * 1024 * 1024)
+    export_cache_ttl_seconds: int = Field(default=24 * 3600)
+    # cap while table versions are per-process (no cache_redis_url): another worker's
+    # write cannot reach this worker's artifacts, so they must expire on their own.
+    # Single-worker deployments can raise it to export_cache_ttl_seconds.
+    export_cache_local_ttl_seconds: int = Field(default=60)
+    render_pool_workers: int = Field(default=2)
+    render_pool_max_queued: int = Field(default=4)
+    import_batch_size: int = Field(default=2000)
+    import_max_reported_errors: int = Field(default=1000)
 
     class Config:
         env_file = '.env'
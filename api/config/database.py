@@ -7,8 +7,18 @@ from sqlalchemy.ext.declarative import declarative_base
 
 SQL_ALCHEMY_DATABASE_URL = settings.database_url
 
-engine = create_engine(SQL_ALCHEMY_DATABASE_URL, connect_args={
-                       'check_same_thread': False})
+# check_same_thread is a sqlite-only driver argument
+connect_args = {'check_same_thread': False} if SQL_ALCHEMY_DATABASE_URL.startswith('sqlite') else {}
+
+engine = create_engine(SQL_ALCHEMY_DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
+
+
+def ensure_indexes(bind=engine):
+    """Create indexes declared on models that ``create_all`` skipped because their
+    table already existed."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
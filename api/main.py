@@ -1,11 +1,25 @@
 from contextlib import asynccontextmanager
-from config.database import Base, engine, SessionLocal
+from config.database import Base, engine, SessionLocal, ensure_indexes
 from config.config import settings
 from services.authService.model.authModel import User
 from services.authService.model.blacklistModel import TokenBlacklist
 from services.users.model.vendorModel import Vendor
 from deps import TokenCleanUpScheduler
 from routes.routers import router as api_router
+from services.metricsService.queryInstrumentation import (
+    QueryInstrumentationMiddleware,
+    install_query_instrumentation,
+)
+from services.metricsService.metrics import MetricsMiddleware, install_runtime_collectors
+from services.metricsService.profiler import ProfilerMiddleware, profiler
+from services.cacheService.tableVersions import track_table_writes
+from services.cacheService.responseCache import configure_shared_cache
+from services.searchService.vendorSearch import ensure_vendor_search_index
+from services.searchService.globalSearch import ensure_global_search_index, track_search_documents
+from services.geoService.locationIndex import track_locations
+from services.exportService.jobs import export_jobs
+from services.exportService.renderPool import render_pool
+from services.compressionService.compression import CompressionMiddleware, CompressionPolicy, set_route_policy
 from fastapi.middleware.cors import CORSMiddleware
 
 from fastapi import FastAPI
@@ -16,21 +30,43 @@ async def lifespan(app: FastAPI):
     """Manage start up and shutdown events"""
     #startup    
     Base.metadata.create_all(bind=engine)
+    ensure_indexes(engine)
+    ensure_vendor_search_index(engine)
+    ensure_global_search_index(engine)
     scheduler_db = SessionLocal()
     scheduler = TokenCleanUpScheduler(scheduler_db)
     scheduler.start()
+    export_jobs.schedule_cleanup(scheduler.scheduler, settings.export_job_cleanup_minutes)
 
     app.state.scheduler = scheduler
     app.state.scheduler_db = scheduler_db
+    profiler.set_continuous(settings.profiler_continuous)
     yield
 
     #shutdown
+    export_jobs.shutdown()
+    render_pool.shutdown()
     scheduler.shutdown()
     scheduler_db.close()
 
 
 app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
+install_query_instrumentation(engine)
+configure_shared_cache()
+track_table_writes(SessionLocal)
+track_search_documents(SessionLocal)
+track_locations(SessionLocal)
+install_runtime_collectors(app, engine)
+app.add_middleware(QueryInstrumentationMiddleware)
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(MetricsMiddleware)
+# exports stream large bodies; a low level keeps compression from becoming the bottleneck
+set_route_policy('/vendor/vendors/export/{format}', CompressionPolicy(level=1))
+set_route_policy('/buyer/buyers/export/{format}', CompressionPolicy(level=1))
+# ranged resumes count identity bytes, so the full download must not be encoded either
+set_route_policy('/vendor/export_jobs/{job_id}/download', CompressionPolicy(enabled=False))
+app.add_middleware(CompressionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,113 @@
+from typing import List, Optional
+
+from services.metricsService.profilerService import ProfilerService
+from services.searchService.globalSearchService import GlobalSearchService
+from services.searchService.utils import GlobalSearchResponse, SearchEntityType
+from services.users.utils import TotalMode
+from deps import auth_dependency
+
+from fastapi import APIRouter, Depends, Query
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.post(
+    '/profiler',
+    responses={
+        403: {"description": "user not admin"},
+    },
+    summary="profile all requests (or one route) for a limited time"
+)
+def enable_profiler(
+    auth: auth_dependency,
+    seconds: int = Query(60, ge=1, le=3600, description="How long to profile for"),
+    route: Optional[str] = Query(None, description="Route template, e.g. /auth/sign_in"),
+    profiler_service: ProfilerService = Depends(ProfilerService)
+):
+    return profiler_service.enable(auth, seconds, route)
+
+
+@router.post(
+    '/profiler/continuous',
+    responses={
+        403: {"description": "user not admin"},
+    },
+    summary="toggle continuous low-rate sampling"
+)
+def set_continuous_profiling(
+    auth: auth_dependency,
+    enabled: bool,
+    profiler_service: ProfilerService = Depends(ProfilerService)
+):
+    return profiler_service.set_continuous(auth, enabled)
+
+
+@router.get(
+    '/profiler',
+    responses={
+        403: {"description": "user not admin"},
+    },
+    summary="profiler status and recent profiles"
+)
+def profiler_status(
+    auth: auth_dependency,
+    profiler_service: ProfilerService = Depends(ProfilerService)
+):
+    return profiler_service.status(auth)
+
+
+@router.get(
+    '/profiler/profiles/{profile_id}',
+    responses={
+        403: {"description": "user not admin"},
+        404: {"description": "profile not found"},
+    },
+    summary="folded stacks for a profiled request"
+)
+def fetch_profile(
+    auth: auth_dependency,
+    profile_id: str,
+    profiler_service: ProfilerService = Depends(ProfilerService)
+):
+    return profiler_service.fetch_profile(auth, profile_id)
+
+
+@router.get(
+    '/profiler/hot_stacks',
+    responses={
+        403: {"description": "user not admin"},
+    },
+    summary="aggregated hot stacks from continuous sampling"
+)
+def hot_stacks(
+    auth: auth_dependency,
+    route: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=10000),
+    profiler_service: ProfilerService = Depends(ProfilerService)
+):
+    return profiler_service.hot_stacks(auth, route, limit)
+
+
+@router.get(
+    '/search',
+    response_model=GlobalSearchResponse,
+    responses={
+        400: {"description": "empty search query"},
+        403: {"description": "user not admin"},
+    },
+    summary="ranked search across users, vendors and buyers"
+)
+def global_search(
+    auth: auth_dependency,
+    q: str = Query(..., min_length=1, max_length=100, description="Names, emails or phone numbers; typos tolerated"),
+    types: Optional[List[SearchEntityType]] = Query(None, description="Restrict to these entity types"),
+    skip: int = Query(0, ge=0),
+    take: int = Query(20, ge=1, le=100),
+    total_mode: TotalMode = Query(
+        'exact',
+        description="exact: cached count; estimate: planner estimate on large results; none: omit total"
+    ),
+    search_service: GlobalSearchService = Depends(GlobalSearchService)
+):
+    return search_service.search(auth, q, types, skip, take, total_mode)
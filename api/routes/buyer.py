@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Dict, Literal, Optional, Union
 
 from services.users.utils import (
     BuyerResponse,
@@ -7,8 +7,12 @@ from services.users.utils import (
     BuyerFilter,
     UpdateFilter,
     ToggleFilter,
+    TotalMode,
     )
 from services.users.services.buyerService import BuyerService
+from services.cacheService.responseCache import listing_params, response_cache
+from services.serializationService.fastJson import FastJSONResponse
+from services.users.etags import etag_matches, not_modified, response_tag
 from deps import auth_dependency
 
 from fastapi import (
@@ -16,7 +20,8 @@ from fastapi import (
     Depends,
     Query,
     Path,
-    Body
+    Body,
+    Header,
     )
 
 
@@ -42,9 +47,10 @@ def create_buyer(
 
 @router.get(
     '/fetch_buyer',
-    response_model=BuyerResponse,
+    response_model=Union[BuyerResponse, Dict[str, Any]],
     responses={
         200: {"description": "Buyer fetched successfully"},
+        304: {"description": "Buyer unchanged since the ETag in If-None-Match"},
         400: {"description": "Invalid parameters"},
         401: {"description": "Not authenticated"},
         403: {"description": "Not authorized"},
@@ -57,12 +63,24 @@ def fetch_buyer(
     auth: auth_dependency,
     buyer_id: Optional[str] = None,
     user_id: Optional[str] = None,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated response keys to return, e.g. id,buyer_name,is_active; id is always included"
+    ),
+    if_none_match: Optional[str] = Header(None),
     buyer_service: BuyerService = Depends(BuyerService)
 ):
-    return buyer_service.fetch_buyer(
-        auth,
-        buyer_id,
-        user_id
+    etag = buyer_service.buyer_etag(auth, buyer_id, user_id, fields)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return FastJSONResponse(
+        buyer_service.fetch_buyer(
+            auth,
+            buyer_id,
+            user_id,
+            fields
+        ),
+        headers={'ETag': etag}
     )
 
 
@@ -86,6 +104,18 @@ def fetch_buyers(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     take: int = Query(50, ge=1, le=500,
                       description="Number of records to return"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from next_cursor; pass an empty value for the first page. Ignores skip."
+    ),
+    total_mode: TotalMode = Query(
+        'exact',
+        description="exact: cached count; estimate: planner estimate on large results; none: omit total"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated response keys to return, e.g. id,buyer_name,is_active; id is always included"
+    ),
     buyer_service: BuyerService = Depends(BuyerService)
 ):
     buyer_filter = BuyerFilter(
@@ -94,13 +124,77 @@ def fetch_buyers(
         is_deleted=is_deleted,
         created_at=created_at,
         skip=skip,
-        take=take
+        take=take,
+        cursor=cursor,
+        total_mode=total_mode,
+        fields=fields
     )
-    return buyer_service.fetch_buyers(
-        auth,
-        buyer_filter
+    return response_cache.respond(
+        'buyer.fetch_buyers',
+        auth.get('role'),
+        ('buyers',),
+        listing_params(buyer_filter),
+        lambda: buyer_service.fetch_buyers(auth, buyer_filter)
     )
 
+@router.get(
+    '/fetch_buyers/stream',
+    responses={
+        200: {"content": {"application/x-ndjson": {}}, "description": "one buyer per line"},
+        400: {"description": "Bad Request"},
+        401: {"description": "user not authorized"},
+    },
+    summary="Stream every matching buyer as NDJSON"
+)
+def stream_buyers(
+    auth: auth_dependency,
+    search: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    is_deleted: Optional[bool] = None,
+    created_at: Optional[str] = None,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated response keys to return, e.g. id,buyer_name,is_active; id is always included"
+    ),
+    limit: Optional[int] = Query(None, ge=1, description="Stop after this many rows; all rows when omitted"),
+    buyer_service: BuyerService = Depends(BuyerService)
+):
+    buyer_filter = BuyerFilter(
+        search=search,
+        is_active=is_active,
+        is_deleted=is_deleted,
+        created_at=created_at,
+        fields=fields
+    )
+    return buyer_service.stream_buyers(auth, buyer_filter, limit)
+
+@router.get(
+    '/buyers/export/{format}',
+    responses={
+        400: {"description": "invalid format"},
+        401: {"description": "user not authorized"},
+        429: {"description": "rendering capacity exhausted"},
+        501: {"description": "parquet export unavailable (pyarrow not installed)"}
+    }
+)
+def export_buyers(
+    format: Literal['csv', 'pdf', 'parquet'],
+    auth: auth_dependency,
+    search: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    is_deleted: Optional[bool] = None,
+    created_at: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, description="Stop after this many rows; every matching buyer when omitted"),
+    buyer_service: BuyerService = Depends(BuyerService)
+):
+    buyer_filter = BuyerFilter(
+        search=search,
+        is_active=is_active,
+        is_deleted=is_deleted,
+        created_at=created_at
+    )
+    return buyer_service.export_buyers(format, auth, buyer_filter, limit)
+
 @router.patch(
     "/update_buyer_admin/:buyer_id",
     response_model=BuyerResponse,
@@ -110,6 +204,7 @@ def fetch_buyers(
         401: {"description": "Not authenticated"},
         403: {"description": "Not authorized"}, 
         404: {"description": "Buyer not found"},
+        412: {"description": "Buyer changed since the ETag in If-Match"},
         500: {"description": "Internal server error"},
     },
     summary= "update buyer by admin"
@@ -118,13 +213,19 @@ def update_buyer_admin(
     auth: auth_dependency,
     buyer_id: str = Path(..., description='id of the buyer'),
     update_filter: UpdateFilter = Body(..., description="update data"),
+    if_match: Optional[str] = Header(
+        None,
+        description="ETag from a previous read; the update is refused with 412 if the buyer changed since"
+    ),
     buyer_service: BuyerService = Depends(BuyerService)
 ):
-    return buyer_service.update_buyer_by_admin(
+    buyer = buyer_service.update_buyer_by_admin(
         auth,
         buyer_id=buyer_id,
-        update_filter=update_filter
+        update_filter=update_filter,
+        if_match=if_match
     )
+    return FastJSONResponse(buyer, headers={'ETag': response_tag(buyer)})
 
 @router.patch(
     "/update_buyer",
@@ -135,6 +236,7 @@ def update_buyer_admin(
         401: {"description": "Not authenticated"},
         403: {"description": "Not authorized"}, 
         404: {"description": "Buyer not found"},
+        412: {"description": "Buyer changed since the ETag in If-Match"},
         500: {"description": "Internal server error"},
     },
     summary= "update buyer"
@@ -142,12 +244,18 @@ def update_buyer_admin(
 def update_buyer(
     auth: auth_dependency,
     update_filter: UpdateFilter = Body(..., description = "update data"),
+    if_match: Optional[str] = Header(
+        None,
+        description="ETag from a previous read; the update is refused with 412 if the buyer changed since"
+    ),
     buyer_service: BuyerService = Depends(BuyerService)
 ):
-    return buyer_service.update_buyer(
+    buyer = buyer_service.update_buyer(
         auth,
-        update_filter=update_filter
+        update_filter=update_filter,
+        if_match=if_match
     )
+    return FastJSONResponse(buyer, headers={'ETag': response_tag(buyer)})
 
 @router.patch(
     '/toggle_buyer_admin/:buyer_id',
@@ -158,6 +266,7 @@ def update_buyer(
         401: {"description": "Not authenticated"},
         403: {"description": "Not authorized"}, 
         404: {"description": "Buyer not found"},
+        412: {"description": "Buyer changed since the ETag in If-Match"},
         500: {"description": "Internal server error"},
     },
     summary="toggle buyer status by admin"
@@ -166,13 +275,19 @@ def toggle_buyer_admin(
     auth: auth_dependency,
     buyer_id: str = Path(..., description="update buyer"),
     toggle_filter: ToggleFilter = Body(..., description="update data"),
+    if_match: Optional[str] = Header(
+        None,
+        description="ETag from a previous read; the update is refused with 412 if the buyer changed since"
+    ),
     buyer_service: BuyerService = Depends(BuyerService)
 ):
-    return buyer_service.toggle_buyer_admin(
+    buyer = buyer_service.toggle_buyer_admin(
         auth,
         toggle_filter=toggle_filter,
-        buyer_id=buyer_id
+        buyer_id=buyer_id,
+        if_match=if_match
     )
+    return FastJSONResponse(buyer, headers={'ETag': response_tag(buyer)})
 
 @router.patch(
     "toggle_buyer",
@@ -183,6 +298,7 @@ def toggle_buyer_admin(
         401: {"description": "Not authenticated"},
         403: {"description": "Not authorized"}, 
         404: {"description": "Buyer not found"},
+        412: {"description": "Buyer changed since the ETag in If-Match"},
         500: {"description": "Internal server error"},
     },
     summary="toggle buyer status"
@@ -190,9 +306,15 @@ def toggle_buyer_admin(
 def toggle_buyer(
     auth: auth_dependency,
     toggle_filter: ToggleFilter = Body(..., description='filter data'),
+    if_match: Optional[str] = Header(
+        None,
+        description="ETag from a previous read; the update is refused with 412 if the buyer changed since"
+    ),
     buyer_service: BuyerService = Depends(BuyerService)
 ):
-    return buyer_service.toggle_buyer(
+    buyer = buyer_service.toggle_buyer(
         auth,
         toggle_filter,
+        if_match
     )
+    return FastJSONResponse(buyer, headers={'ETag': response_tag(buyer)})
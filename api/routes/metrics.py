@@ -0,0 +1,23 @@
+from typing import Optional
+
+from services.metricsService.metricsService import MetricsService
+
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import PlainTextResponse
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get(
+    '/metrics',
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+    summary="Prometheus metrics"
+)
+async def metrics(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    metrics_service: MetricsService = Depends(MetricsService)
+):
+    return metrics_service.render(request, authorization)
@@ -1,6 +1,8 @@
 from .auth import router as auth_router
 from .vendor import router as vendor_router
 from .buyer import router as buyer_roter
+from .metrics import router as metrics_router
+from .admin import router as admin_router
 
 from fastapi import APIRouter
 
@@ -10,3 +12,5 @@ router = APIRouter()
 router.include_router(auth_router)
 router.include_router(vendor_router)
 router.include_router(buyer_roter)
+router.include_router(metrics_router)
+router.include_router(admin_router)
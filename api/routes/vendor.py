@@ -1,17 +1,27 @@
-from typing import Literal, Dict, Any, Optional
+from typing import Literal, Dict, Any, Optional, Union
 
 from services.users.utils import (
     CreateVendorResponse, 
     CreateVendorRequest, 
+    ImportVendorsResponse,
     FetchVendorResponse,
     VendorFilter,
     UpdateVendorInput,
     VendorResponse,
+    TotalMode,
     )
 from services.users.services.vendorService import VendorService
+from services.geoService.nearbyService import NearbyService
+from services.geoService.utils import NearbyVendorsResponse
+from services.cacheService.responseCache import listing_params, response_cache
+from services.serializationService.fastJson import FastJSONResponse
+from services.exportService.jobs import job_response
+from services.exportService.spool import range_file_response
+from services.exportService.utils import ExportJobResponse
+from services.users.etags import etag_matches, not_modified, response_tag
 from deps import auth_dependency
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, File, Header, Query, Request, Response, UploadFile, status
 
 
 router = APIRouter(prefix="/vendor", tags=["Vendor"])
@@ -32,6 +42,24 @@ def create_vendor(
     ):
     return vendor_service.create_vendor(auth, create_vendor_request)
 
+@router.post(
+    '/import',
+    response_model=ImportVendorsResponse,
+    responses={
+        400: {"description": "unknown file format, or the file is not valid UTF-8"},
+        403: {"description": "user not admin"}
+    },
+    summary="Create vendors in bulk from a CSV or NDJSON upload"
+)
+def import_vendors(
+    auth: auth_dependency,
+    file: UploadFile = File(..., description="One vendor per row/line: the create_vendor fields plus user_id"),
+    format: Optional[Literal['csv', 'ndjson']] = Query(None, description="Taken from the file name or type when omitted"),
+    vendor_service: VendorService = Depends(VendorService)
+):
+    return vendor_service.import_vendors(auth, file, format)
+
+
 @router.get(
     '/fetch_vendors',
     response_model=FetchVendorResponse,
@@ -49,6 +77,18 @@ def fetch_vendors(
     created_at: Optional[str] = None,
     skip: int = 0,
     take: int = 50,
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from next_cursor; pass an empty value for the first page. Ignores skip."
+    ),
+    total_mode: TotalMode = Query(
+        'exact',
+        description="exact: cached count; estimate: planner estimate on large results; none: omit total"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated response keys to return, e.g. id,vendor_title,is_active; id is always included"
+    ),
     vendor_service: VendorService = Depends(VendorService)
     ):
     vendor_filter = VendorFilter(
@@ -57,37 +97,167 @@ def fetch_vendors(
         is_deleted=is_deleted,
         created_at=created_at,
         skip=skip,
-        take=take
+        take=take,
+        cursor=cursor,
+        total_mode=total_mode,
+        fields=fields
     )
-    return vendor_service.fetch_vendors(
-        auth,
-        vendor_filter
+    return response_cache.respond(
+        'vendor.fetch_vendors',
+        auth.get('role'),
+        ('vendors',),
+        listing_params(vendor_filter),
+        lambda: vendor_service.fetch_vendors(auth, vendor_filter)
     )
 
+@router.get(
+    '/fetch_vendors/stream',
+    responses={
+        200: {"content": {"application/x-ndjson": {}}, "description": "one vendor per line"},
+        400: {"description": "Bad Request"},
+        403: {"description": "user not admin"},
+    },
+    summary="Stream every matching vendor as NDJSON"
+)
+def stream_vendors(
+    auth: auth_dependency,
+    search: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    is_deleted: Optional[bool] = None,
+    created_at: Optional[str] = None,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated response keys to return, e.g. id,vendor_title,is_active; id is always included"
+    ),
+    limit: Optional[int] = Query(None, ge=1, description="Stop after this many rows; all rows when omitted"),
+    vendor_service: VendorService = Depends(VendorService)
+):
+    vendor_filter = VendorFilter(
+        search=search,
+        is_active=is_active,
+        is_deleted=is_deleted,
+        created_at=created_at,
+        fields=fields
+    )
+    return vendor_service.stream_vendors(auth, vendor_filter, limit)
+
+@router.get(
+    '/nearby',
+    response_model=NearbyVendorsResponse,
+    responses={
+        400: {"description": "invalid or unknown origin"},
+        404: {"description": "buyer location unknown"}
+    },
+    summary="vendors near a point, a place or the caller's buyer location"
+)
+def nearby_vendors(
+    auth: auth_dependency,
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    location: Optional[str] = Query(None, max_length=200, description="Place name, e.g. Yaba, Lagos"),
+    radius_km: Optional[float] = Query(
+        None,
+        gt=0,
+        le=200,
+        description="Only vendors within this distance; omit for the k nearest"
+    ),
+    k: int = Query(20, ge=1, le=100),
+    nearby_service: NearbyService = Depends(NearbyService)
+):
+    return nearby_service.nearby_vendors(auth, latitude, longitude, location, radius_km, k)
+
 @router.get(
     '/vendors/export/{format}',
-    responses={400: {"description": "invalid format"}}
+    responses={
+        400: {"description": "invalid format"},
+        429: {"description": "rendering capacity exhausted"},
+        501: {"description": "parquet export unavailable (pyarrow not installed)"}
+    }
 )
 def export_vendors(
-    format: Literal['csv', 'pdf'],
+    format: Literal['csv', 'pdf', 'parquet'],
     auth: auth_dependency,
     search: Optional[str] = None,
     is_active: Optional[bool] = None,
     is_deleted: Optional[bool] = None,
     created_at: Optional[str] = None,
-    skip: int = 0,
-    take: int = 50,
+    limit: Optional[int] = Query(None, ge=1, description="Stop after this many rows; every matching vendor when omitted"),
     vendor_service: VendorService = Depends(VendorService)
     ):
     filter = VendorFilter(
         search=search,
         is_active=is_active,
         is_deleted=is_deleted,
-        created_at=created_at,
-        skip=skip,
-        take=take
+        created_at=created_at
+    )
+    return vendor_service.export_vendors(format, auth, filter, limit)
+
+
+@router.post(
+    '/vendors/export/{format}/jobs',
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=ExportJobResponse,
+    responses={
+        400: {"description": "invalid format"},
+        429: {"description": "too many export jobs in progress"},
+        501: {"description": "parquet export unavailable (pyarrow not installed)"}
+    },
+    summary="Render a vendor export in the background"
+)
+def enqueue_vendor_export(
+    format: Literal['csv', 'pdf', 'parquet'],
+    auth: auth_dependency,
+    request: Request,
+    response: Response,
+    search: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    is_deleted: Optional[bool] = None,
+    created_at: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, description="Stop after this many rows; every matching vendor when omitted"),
+    vendor_service: VendorService = Depends(VendorService)
+):
+    filter = VendorFilter(
+        search=search,
+        is_active=is_active,
+        is_deleted=is_deleted,
+        created_at=created_at
     )
-    return vendor_service.export_vendors(format, auth, filter)
+    job = vendor_service.enqueue_export(format, auth, filter, limit)
+    response.headers['Location'] = str(request.url_for('fetch_vendor_export_job', job_id=job.id))
+    return job_response(job)
+
+
+@router.get('/export_jobs/{job_id}', response_model=ExportJobResponse)
+def fetch_vendor_export_job(
+    job_id: str,
+    auth: auth_dependency,
+    request: Request,
+    vendor_service: VendorService = Depends(VendorService)
+):
+    job = vendor_service.fetch_export_job(auth, job_id)
+    return job_response(job, str(request.url_for('download_vendor_export', job_id=job.id)))
+
+
+@router.get(
+    '/export_jobs/{job_id}/download',
+    responses={
+        206: {"description": "the requested byte range"},
+        409: {"description": "export job not finished"},
+        416: {"description": "requested range not satisfiable"}
+    }
+)
+def download_vendor_export(
+    job_id: str,
+    auth: auth_dependency,
+    range: Optional[str] = Header(None),
+    if_range: Optional[str] = Header(
+        None,
+        description="ETag from an earlier download; the Range is honoured only if the artifact is unchanged"
+    ),
+    vendor_service: VendorService = Depends(VendorService)
+):
+    job = vendor_service.fetch_export_job(auth, job_id, finished=True)
+    return range_file_response(job.path, range, job.media_type, job.filename, job.etag, if_range)
 
 @router.patch(
     '/update_vendor',
@@ -95,6 +265,7 @@ def export_vendors(
     responses = {
         403: {"description": "user not authorized to change detail"},
         404: {'description': "vendor not found"},
+        412: {'description': "vendor changed since the ETag in If-Match"},
         400: {'description': "invalid data"},
         500: {'description': 'failed to update vendor'}
     },
@@ -112,6 +283,10 @@ def update_vendor(
     vendor_rating: Optional[str] = None,
     vendor_scale: Optional[str] = None,
     vendor_metadata: Optional[str] = None, 
+    if_match: Optional[str] = Header(
+        None,
+        description="ETag from a previous read; the update is refused with 412 if the vendor changed since"
+    ),
     vendor_service: VendorService = Depends(VendorService)
     ):
     update_vendor_input = UpdateVendorInput(
@@ -125,16 +300,19 @@ def update_vendor(
         vendor_scale = vendor_scale,
         vendor_metadata = vendor_metadata
     )
-    return vendor_service.update_vendor(
+    vendor = vendor_service.update_vendor(
         auth,
         vendor_id,
         update_vendor_input,
+        if_match,
     )
+    return FastJSONResponse(vendor, headers={'ETag': response_tag(vendor)})
 
 @router.get(
     'fetch_vendor',
-    response_model= VendorResponse,
+    response_model= Union[VendorResponse, Dict[str, Any]],
     responses= {
+        304: {"description": "vendor unchanged since the ETag in If-None-Match"},
         404: {"description": "vendor not found"},
         500: {"description": "failed to fetch vendor"}
     },
@@ -143,15 +321,27 @@ def update_vendor(
 def fetch_vendor(
     auth: auth_dependency, 
     vendor_id: str, 
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated response keys to return, e.g. id,vendor_title,is_active; id is always included"
+    ),
+    if_none_match: Optional[str] = Header(None),
     vendor_service: VendorService = Depends(VendorService)
     ):
-    return vendor_service.fetch_vendor(auth, vendor_id)
+    etag = vendor_service.vendor_etag(auth, vendor_id, fields)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return FastJSONResponse(
+        vendor_service.fetch_vendor(auth, vendor_id, fields),
+        headers={'ETag': etag}
+    )
 
 @router.patch(
     '/delete_vendor',
     response_model= VendorResponse,
     responses= {
         404: {"description": "vendor not found"},
+        412: {"description": "vendor changed since the ETag in If-Match"},
         500: {"description": "failed to delete vendor"}
     },
     summary= 'delete vendor'
@@ -161,14 +351,20 @@ def delete_vendor(
     vendor_id: str,
     delete_status: bool,
     reason: str,
+    if_match: Optional[str] = Header(
+        None,
+        description="ETag from a previous read; the update is refused with 412 if the vendor changed since"
+    ),
     vendor_service: VendorService = Depends(VendorService)
     ) -> Dict[str, Any]:
-    return vendor_service.set_vendor_deletion_status(
+    vendor = vendor_service.set_vendor_deletion_status(
         auth,
         vendor_id,
         delete_status,
-        reason
+        reason,
+        if_match
     )
+    return FastJSONResponse(vendor, headers={'ETag': response_tag(vendor)})
 
 @router.patch(
     'toggle_vendor_status',
@@ -176,6 +372,7 @@ def delete_vendor(
     responses = {
         403: {"description": "user is not admin"},
         404: {"description": "vendor not found"},
+        412: {"description": "vendor changed since the ETag in If-Match"},
         500: {"description": "failed to deactivate vendor"}
     },
     summary= "toggle status of vendor by admin"
@@ -185,11 +382,17 @@ def toggle_vendor_active_status(
     active_status: bool,
     vendor_id: str,
     reason: str,
+    if_match: Optional[str] = Header(
+        None,
+        description="ETag from a previous read; the update is refused with 412 if the vendor changed since"
+    ),
     vendor_service: VendorService = Depends(VendorService)
 ):
-    return vendor_service.toggle_vendor_active_status(
+    vendor = vendor_service.toggle_vendor_active_status(
         auth,
         active_status,
         vendor_id,
-        reason
-    )
\ No newline at end of file
+        reason,
+        if_match
+    )
+    return FastJSONResponse(vendor, headers={'ETag': response_tag(vendor)})
\ No newline at end of file
@@ -85,7 +85,7 @@ class AuthService:
                 phone_number=phone_number,
                 hashed_password=bcrypt_context.hash(password),
                 created_at=datetime.now(),
-                role=UserRole.User.value,
+                role=UserRole.User,
                 user_active=False,
                 user_status=UserStatus.New_User,
                 email_validated=True,
@@ -251,7 +251,7 @@ class AuthService:
                 )
 
             access_token = self.create_access_token(
-                user.email, user.id, user.role, timedelta(minutes=40))
+                user.email, user.id, user.role.value, timedelta(minutes=40))
             new_refresh_token = self.create_refresh_token(
                 user_id, timedelta(days=3))
             
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Boolean, JSON, Enum, func
+from sqlalchemy import Column, String, DateTime, Boolean, JSON, Enum, Index, func
 
 from config.database import Base
 
@@ -13,3 +13,9 @@ class TokenBlacklist(Base):
     user_id = Column(String, nullable=False)
     expires = Column(DateTime, nullable=False)
     revoked_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # is_token_revoked looks up (user_id, token); the cleanup job deletes by expires
+        Index('idx_blacklist_user_token', 'user_id', 'token'),
+        Index('idx_blacklist_expires', 'expires'),
+    )
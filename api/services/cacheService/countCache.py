@@ -0,0 +1,50 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Hashable, Optional, Tuple
+
+from config.config import settings
+from services.cacheService.tableVersions import table_versions
+
+
+class CountCache:
+    """Bounded LRU of exact ``COUNT(*)`` results per table version and normalized filter.
+
+    Entries also expire after ``ttl`` seconds. Without a shared version store another
+    worker's writes never bump this process's versions, so the TTL bounds how long
+    such a write can go unnoticed.
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = Lock()
+        self._entries: 'OrderedDict[Hashable, Tuple[int, float]]' = OrderedDict()
+
+    def lookup(self, table: str, filter_key: Hashable) -> Tuple[Hashable, Optional[int]]:
+        """Return (cache key, cached count or None).
+
+        The key pins the table version seen before counting; storing under it keeps a
+        count that raced with a write from being served as current.
+        """
+        key = (table, table_versions.current(table), filter_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return key, None
+            count, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return key, None
+            self._entries.move_to_end(key)
+            return key, count
+
+    def store(self, key: Hashable, count: int):
+        with self._lock:
+            self._entries[key] = (count, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+count_cache = CountCache(settings.count_cache_size, settings.count_cache_ttl_seconds)
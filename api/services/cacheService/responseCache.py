@@ -0,0 +1,217 @@
+"""Versioned cache of serialized JSON responses.
+
+Entries are keyed by endpoint, caller role, the normalized request filter and the
+current version of every table the response reads, so a committed write to one of
+those tables makes the old entries unreachable instead of having to find them.
+Values are the exact response bytes, so a hit skips the database, the mapping and
+the serialization.
+
+Lookups go to a bounded in-process LRU first and then, when ``cache_redis_url`` is
+set, to Redis, which is also where table versions then live so that every worker
+sees every other worker's writes.
+"""
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict
+from threading import Lock
+from typing import Any, Callable, Optional, Sequence
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from config.config import settings
+from services.cacheService.tableVersions import table_versions
+from services.metricsService.metrics import registry
+from services.serializationService.fastJson import dumps
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = registry.counter(
+    'response_cache_requests_total', 'Response cache lookups by endpoint and result', ('endpoint', 'result'))
+
+
+def listing_params(listing_filter) -> dict:
+    """Normalize a listing filter dataclass so equivalent requests share a key."""
+    params = asdict(listing_filter)
+    if params.get('search'):
+        params['search'] = ' '.join(params['search'].lower().split())
+    if params.get('fields'):
+        params['fields'] = ','.join(name.strip() for name in params['fields'].split(',') if name.strip())
+    return {name: value for name, value in params.items() if value not in (None, '')}
+
+
+class CacheBackend:
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: int):
+        raise NotImplementedError
+
+
+class LocalLRUBackend(CacheBackend):
+    """Bounded by entry count and total bytes; expired entries are dropped on read."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+
+class RedisBackend(CacheBackend):
+    def __init__(self, client, prefix: str = 'locale:response:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: int):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+
+class RedisVersionStore:
+    """Table versions shared by every worker through Redis ``INCR``."""
+
+    def __init__(self, client, prefix: str = 'locale:version:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, table: str) -> str:
+        try:
+            value = self.client.get(self.prefix + table)
+        except Exception:  # noqa: BLE001
+            logger.warning('could not read version of %s; bypassing caches', table, exc_info=True)
+            # a version nothing else has, so this lookup misses and its entry is never reused
+            return f'unavailable:{uuid.uuid4().hex}'
+        return f'r:{int(value or 0)}'
+
+    def incr(self, table: str):
+        try:
+            self.client.incr(self.prefix + table)
+        except Exception:  # noqa: BLE001
+            logger.error('could not bump version of %s; cached reads may be stale until expiry',
+                         table, exc_info=True)
+
+
+class ResponseCache:
+    def __init__(self, local: CacheBackend, shared: Optional[CacheBackend] = None, ttl: int = 300):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+
+    def key(self, endpoint: str, role: Optional[str], tables: Sequence[str], params: Any) -> str:
+        material = json.dumps({
+            'endpoint': endpoint,
+            'role': role,
+            'versions': {table: table_versions.current(table) for table in tables},
+            'params': params,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.local.get(key)
+        if value is not None or self.shared is None:
+            return value
+        try:
+            value = self.shared.get(key)
+        except Exception:  # noqa: BLE001
+            logger.warning('shared response cache read failed', exc_info=True)
+            return None
+        if value is not None:
+            self.local.set(key, value, self.ttl)
+        return value
+
+    def set(self, key: str, value: bytes):
+        self.local.set(key, value, self.ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, self.ttl)
+            except Exception:  # noqa: BLE001
+                logger.warning('shared response cache write failed', exc_info=True)
+
+    def respond(
+            self,
+            endpoint: str,
+            role: Optional[str],
+            tables: Sequence[str],
+            params: Any,
+            produce: Callable[[], BaseModel]
+    ) -> Response:
+        """Serve ``produce()`` as JSON from the cache, calling it only on a miss.
+
+        The key is computed before ``produce`` runs, so a write that commits while
+        the response is being built leaves it under the old, already stale version.
+        Exceptions from ``produce`` propagate and nothing is cached.
+        """
+        if not settings.response_cache_enabled:
+            return Response(content=dumps(produce()), media_type='application/json')
+
+        key = self.key(endpoint, role, tables, params)
+        body = self.get(key)
+        if body is not None:
+            CACHE_REQUESTS.inc(endpoint, 'hit')
+            return Response(content=body, media_type='application/json', headers={'X-Cache': 'HIT'})
+
+        CACHE_REQUESTS.inc(endpoint, 'miss')
+        body = dumps(produce())
+        self.set(key, body)
+        return Response(content=body, media_type='application/json', headers={'X-Cache': 'MISS'})
+
+
+response_cache = ResponseCache(
+    LocalLRUBackend(settings.response_cache_max_entries, settings.response_cache_max_bytes),
+    ttl=settings.response_cache_ttl_seconds,
+)
+
+
+def configure_shared_cache(redis_url: Optional[str] = None):
+    """Use Redis for response entries and table versions when ``redis_url`` is set.
+
+    ``redis`` is an optional dependency; without it (or without a URL) everything
+    stays in-process.
+    """
+    redis_url = redis_url or settings.cache_redis_url
+    if not redis_url:
+        return
+    try:
+        import redis
+    except ImportError:
+        logger.warning('cache_redis_url is set but the redis package is not installed; caching in-process only')
+        return
+    client = redis.Redis.from_url(redis_url)
+    response_cache.shared = RedisBackend(client)
+    table_versions.store = RedisVersionStore(client)
+    logger.info('response cache and table versions shared through %s', redis_url)
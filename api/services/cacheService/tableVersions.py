@@ -0,0 +1,105 @@
+import logging
+import uuid
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+logger = logging.getLogger(__name__)
+
+_WRITTEN_TABLES_KEY = 'written_tables'
+
+
+class LocalVersionStore:
+    """Version counters for this process only. The epoch makes versions from a
+    previous process never collide with this one's."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._versions: Dict[str, int] = defaultdict(int)
+        self.epoch = uuid.uuid4().hex[:8]
+
+    def get(self, table: str) -> str:
+        return f'{self.epoch}:{self._versions[table]}'
+
+    def incr(self, table: str):
+        with self._lock:
+            self._versions[table] += 1
+
+
+class TableVersions:
+    """Per-table version counters bumped after every committed write.
+
+    Caches key their entries on ``current(table)`` so a write makes every entry built
+    from the old data unreachable without having to find and delete it. Counters
+    live in this process unless a shared store (see ``responseCache``) is installed,
+    which lets every worker see every other worker's writes.
+    """
+
+    def __init__(self):
+        self.store = LocalVersionStore()
+
+    @property
+    def shared(self) -> bool:
+        """Whether every worker sees this process's bumps (and this process theirs)."""
+        return not isinstance(self.store, LocalVersionStore)
+
+    def current(self, table: str) -> str:
+        return self.store.get(table)
+
+    def bump(self, *tables: str):
+        for table in tables:
+            self.store.incr(table)
+        logger.debug('bumped table versions for %s', ', '.join(tables))
+
+
+table_versions = TableVersions()
+
+
+def record_table_writes(session: Session, tables: Iterable[str]):
+    """Mark tables written by ``session`` outside the ORM unit of work (e.g. Core
+    statements on ``session.connection()``) so they are bumped on commit."""
+    session.info.setdefault(_WRITTEN_TABLES_KEY, set()).update(tables)
+
+
+def _after_flush(session: Session, flush_context):
+    record_table_writes(session, {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(obj, '__table__')
+    })
+
+
+def _do_orm_execute(orm_execute_state: ORMExecuteState):
+    # query.update()/query.delete() and ORM-enabled insert/update/delete statements
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        record_table_writes(orm_execute_state.session, {mapper.local_table.name})
+
+
+def _after_commit(session: Session):
+    tables = session.info.pop(_WRITTEN_TABLES_KEY, None)
+    if tables:
+        table_versions.bump(*tables)
+
+
+def _after_rollback(session: Session):
+    session.info.pop(_WRITTEN_TABLES_KEY, None)
+
+
+def track_table_writes(session_factory):
+    """Bump table versions when sessions from ``session_factory`` commit writes.
+
+    Writes issued through Core connections (bulk loads) bypass the session and must
+    call ``table_versions.bump`` themselves.
+    """
+    if event.contains(session_factory, 'after_commit', _after_commit):
+        return
+    event.listen(session_factory, 'after_flush', _after_flush)
+    event.listen(session_factory, 'do_orm_execute', _do_orm_execute)
+    event.listen(session_factory, 'after_commit', _after_commit)
+    event.listen(session_factory, 'after_rollback', _after_rollback)
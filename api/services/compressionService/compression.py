@@ -0,0 +1,255 @@
+"""Negotiated response compression.
+
+``CompressionMiddleware`` picks zstd (when the ``zstandard`` package is installed),
+gzip or deflate from the request's Accept-Encoding and encodes the response body:
+
+* complete bodies below the size threshold, already encoded bodies, bodies in
+  already compressed formats and ``Cache-Control: no-transform`` responses pass
+  through untouched;
+* streaming bodies (CSV/PDF exports, NDJSON) are encoded chunk by chunk, each chunk
+  flushed so clients receive data as it is produced rather than at the end;
+* the threshold, level or an opt-out can be set per route template with
+  ``set_route_policy``.
+
+Bytes in/out, per-response ratio and CPU time spent encoding are recorded per
+route and encoding.
+"""
+import logging
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.config import settings
+from services.metricsService.metrics import registry
+from services.metricsService.utils import route_template
+from services.users.etags import encoded_tag
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_INPUT = registry.counter(
+    'http_compression_input_bytes_total', 'Response bytes before compression', ('route', 'encoding'))
+COMPRESSION_OUTPUT = registry.counter(
+    'http_compression_output_bytes_total', 'Response bytes after compression', ('route', 'encoding'))
+COMPRESSION_RATIO = registry.histogram(
+    'http_compression_ratio', 'Uncompressed to compressed size per response', ('route', 'encoding'),
+    (1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 20.0))
+COMPRESSION_CPU = registry.histogram(
+    'http_compression_cpu_seconds', 'CPU time spent compressing a response', ('route', 'encoding'),
+    (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0))
+COMPRESSION_SKIPPED = registry.counter(
+    'http_compression_skipped_total', 'Responses sent uncompressed by reason', ('route', 'reason'))
+
+# already compressed formats; encoding them again costs CPU for nothing
+INCOMPRESSIBLE_TYPES = (
+    'image/', 'video/', 'audio/', 'application/zip', 'application/gzip', 'application/zstd',
+    'application/x-7z-compressed', 'application/vnd.apache.parquet', 'application/x-parquet',
+    # PDF exports are written with compressed page streams
+    'application/pdf',
+)
+
+
+@dataclass(frozen=True)
+class CompressionPolicy:
+    enabled: bool = True
+    min_size: Optional[int] = None
+    level: Optional[int] = None
+
+
+_route_policies: Dict[str, CompressionPolicy] = {}
+
+
+def set_route_policy(route: str, policy: CompressionPolicy):
+    """Override compression for one route template, e.g. ``/vendor/vendors/export/{format}``."""
+    _route_policies[route] = policy
+
+
+class _Encoder:
+    def __init__(self, encoding: str, level: Optional[int]):
+        self.encoding = encoding
+        if encoding == 'zstd':
+            self._compressor = zstandard.ZstdCompressor(
+                level=level if level is not None else settings.compression_zstd_level).compressobj()
+        else:
+            # gzip wraps deflate in a gzip header (wbits 16+), HTTP "deflate" means the zlib format
+            wbits = zlib.MAX_WBITS | 16 if encoding == 'gzip' else zlib.MAX_WBITS
+            self._compressor = zlib.compressobj(
+                level if level is not None else settings.compression_gzip_level, zlib.DEFLATED, wbits)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._compressor.compress(data)
+        if flush:
+            mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK if self.encoding == 'zstd' else zlib.Z_SYNC_FLUSH
+            out += self._compressor.flush(mode)
+        return out
+
+    def finish(self, data: bytes = b'') -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Encodings in server preference order."""
+    return ('zstd', 'gzip', 'deflate') if zstandard is not None else ('gzip', 'deflate')
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick the encoding with the highest q-value, preferring the server order on ties."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or not settings.compression_enabled or scope['method'] == 'HEAD':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope)
+        policy = _route_policies.get(route, CompressionPolicy())
+        if not policy.enabled:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self.app, send, route, encoding, policy)
+        await responder(scope, receive)
+
+
+class _CompressingResponder:
+    def __init__(self, app: ASGIApp, send: Send, route: str, encoding: str, policy: CompressionPolicy):
+        self.app = app
+        self.send = send
+        self.route = route
+        self.encoding = encoding
+        self.level = policy.level
+        self.min_size = policy.min_size if policy.min_size is not None else settings.compression_min_size
+        self.start_message: Optional[Message] = None
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    async def __call__(self, scope: Scope, receive: Receive):
+        await self.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message):
+        if message['type'] == 'http.response.start':
+            self.start_message = message
+            headers = Headers(raw=message['headers'])
+            reason = self.skip_reason(message['status'], headers)
+            if reason is not None:
+                self.passthrough = True
+                COMPRESSION_SKIPPED.inc(self.route, reason)
+                await self.send(message)
+            return
+
+        if message['type'] != 'http.response.body' or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.encoder is None:
+            # first body message decides: a complete small body goes out as is
+            if not more_body and len(body) < self.min_size:
+                COMPRESSION_SKIPPED.inc(self.route, 'small')
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            self.encoder = _Encoder(self.encoding, self.level)
+            headers = MutableHeaders(scope=self.start_message)
+            headers['Content-Encoding'] = self.encoding
+            headers.add_vary_header('Accept-Encoding')
+            if 'etag' in headers:
+                headers['ETag'] = encoded_tag(headers['etag'], self.encoding)
+            if not more_body:
+                compressed = await self.encode(body, final=True)
+                headers['Content-Length'] = str(len(compressed))
+                await self.send(self.start_message)
+                await self.send({'type': 'http.response.body', 'body': compressed})
+                self.record()
+                return
+            del headers['Content-Length']
+            await self.send(self.start_message)
+
+        compressed = await self.encode(body, final=not more_body)
+        await self.send({'type': 'http.response.body', 'body': compressed, 'more_body': more_body})
+        if not more_body:
+            self.record()
+
+    def skip_reason(self, status_code: int, headers: Headers) -> Optional[str]:
+        if status_code < 200 or status_code in (204, 304):
+            return 'no_body'
+        if 'content-encoding' in headers:
+            return 'encoded'
+        if 'content-range' in headers:
+            # byte offsets refer to the identity body
+            return 'partial'
+        if 'no-transform' in headers.get('cache-control', '').lower():
+            return 'no_transform'
+        content_type = headers.get('content-type', '').lower()
+        if content_type.startswith(INCOMPRESSIBLE_TYPES):
+            return 'incompressible'
+        content_length = headers.get('content-length')
+        if content_length is not None and content_length.isdigit() and int(content_length) < self.min_size:
+            return 'small'
+        return None
+
+    async def encode(self, body: bytes, final: bool) -> bytes:
+        # large bodies are compressed on a worker thread so they do not stall the event loop
+        if len(body) >= settings.compression_offload_size:
+            return await anyio.to_thread.run_sync(self._encode, body, final)
+        return self._encode(body, final)
+
+    def _encode(self, body: bytes, final: bool) -> bytes:
+        start = time.thread_time()
+        compressed = self.encoder.finish(body) if final else self.encoder.compress(body, flush=True)
+        self.cpu_seconds += time.thread_time() - start
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+        return compressed
+
+    def record(self):
+        COMPRESSION_INPUT.inc(self.route, self.encoding, amount=self.bytes_in)
+        COMPRESSION_OUTPUT.inc(self.route, self.encoding, amount=self.bytes_out)
+        COMPRESSION_CPU.observe(self.cpu_seconds, self.route, self.encoding)
+        if self.bytes_out:
+            COMPRESSION_RATIO.observe(self.bytes_in / self.bytes_out, self.route, self.encoding)
+
@@ -23,7 +23,7 @@ class EmailVerifier:
 
         try:
             url = (
-                f"https://apilayer.net/api/check?"
+                f"{settings.mailbox_api_url}?"
                 f"access_key={self.mailboxlayer_key}&"
                 f"email={email}&"
                 "smtp=1&format=1"
@@ -80,7 +80,8 @@ class EmailSender:
                message['To'] = email
 
                with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                    server.starttls()
+                    if settings.locale_smtp_starttls:
+                         server.starttls()
                     server.login(self.smtp_user, self.smtp_password)
                     server.send_message(message)
                logger.info(f'verification email sent to {email}')
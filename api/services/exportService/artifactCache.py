@@ -0,0 +1,200 @@
+"""On-disk cache of finished export files.
+
+Entries are keyed like the response cache: export kind, format, the normalized
+filter and the current version of every table the export reads. A committed write
+bumps the version, so artifacts built from the old data are never served again and
+age out of the LRU. A hit hard-links (or copies) the cached file to where the
+export would have been rendered, so callers that delete their file after sending
+never touch the cached copy.
+
+Versions only reach every worker when they are shared (``cache_redis_url``). With
+per-process versions a write in one worker never invalidates another's artifacts,
+so entries then expire after ``local_ttl`` seconds instead of ``ttl``.
+
+Each process keeps its files in its own subdirectory of the cache directory, since
+its entries are keyed on its own table versions. Subdirectories left behind by
+processes that have exited are removed on first use.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional, Sequence
+
+from config.config import settings
+from services.cacheService.tableVersions import table_versions
+from services.metricsService.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CACHE_REQUESTS = registry.counter(
+    'export_cache_requests_total', 'Export artifact cache lookups by format and result', ('format', 'result'))
+EXPORT_CACHE_BYTES = registry.gauge('export_cache_bytes', 'Bytes held by the export artifact cache')
+
+
+class Artifact(NamedTuple):
+    path: str
+    rows: int
+    size: int
+    expires_at: float
+
+
+def _link_or_copy(source: str, target: str):
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def _unlink(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ExportArtifactCache:
+    """Bounded by total bytes (least recently used first) and by age."""
+
+    def __init__(self, directory: Optional[str], max_bytes: int, ttl_seconds: int, enabled: bool = True,
+                 local_ttl_seconds: Optional[int] = None):
+        self.root = directory or os.path.join(tempfile.gettempdir(), 'locale-export-cache')
+        self.directory: Optional[str] = None
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self.local_ttl = ttl_seconds if local_ttl_seconds is None else min(local_ttl_seconds, ttl_seconds)
+        self.enabled = enabled
+        self._lock = Lock()
+        self._entries: 'OrderedDict[str, Artifact]' = OrderedDict()
+        self._bytes = 0
+        self._ready = False
+
+    def key(self, kind: str, format: str, params: Any, tables: Sequence[str]) -> str:
+        material = json.dumps({
+            'kind': kind,
+            'format': format,
+            'versions': {table: table_versions.current(table) for table in tables},
+            'params': params,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def lookup(self, key: str) -> Optional[Artifact]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            artifact = self._entries.get(key)
+            if artifact is None:
+                return None
+            if artifact.expires_at < time.monotonic() or not os.path.exists(artifact.path):
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return artifact
+
+    def store(self, key: str, format: str, path: str, rows: int):
+        """Keep a link to the finished file at ``path`` under ``key``."""
+        if not self.enabled:
+            return
+        self._prepare()
+        target = os.path.join(self.directory, f'{key}.{format}')
+        try:
+            size = os.path.getsize(path)
+            if size > self.max_bytes:
+                return
+            _unlink(target)
+            _link_or_copy(path, target)
+        except FileNotFoundError:
+            # the response was already sent; a file removed underneath us only costs the entry
+            logger.warning('export artifact %s disappeared before it could be cached', path)
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key, unlink=False)
+            ttl = self.ttl if table_versions.shared else self.local_ttl
+            self._entries[key] = Artifact(target, rows, size, time.monotonic() + ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+            EXPORT_CACHE_BYTES.set(self._bytes)
+
+    def cached(self, key: str, format: str, render: Callable[[str], int]) -> Callable[[str], int]:
+        """Wrap ``render(path)`` so a cached artifact is linked to ``path`` instead
+        of rendering, and a fresh render is cached once it completes."""
+        def run(path: str) -> int:
+            artifact = self.lookup(key)
+            if artifact is not None:
+                EXPORT_CACHE_REQUESTS.inc(format, 'hit')
+                _unlink(path)
+                _link_or_copy(artifact.path, path)
+                return artifact.rows
+            EXPORT_CACHE_REQUESTS.inc(format, 'miss')
+            rows = render(path)
+            self.store(key, format, path, rows)
+            return rows
+        return run
+
+    def tee(self, key: str, format: str, chunks: Iterable[bytes], rows: Callable[[], int]) -> Iterator[bytes]:
+        """Pass a streamed export through, writing it aside and caching it only if
+        the stream runs to the end; ``rows()`` is read once it has."""
+        if not self.enabled:
+            yield from chunks
+            return
+        EXPORT_CACHE_REQUESTS.inc(format, 'miss')
+        self._prepare()
+        fd, path = tempfile.mkstemp(prefix='partial-', suffix=f'.{format}', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                for chunk in chunks:
+                    handle.write(chunk)
+                    yield chunk
+            self.store(key, format, path, rows())
+        finally:
+            _unlink(path)
+
+    def _prepare(self):
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            os.makedirs(self.root, exist_ok=True)
+            # entries from an exited process are keyed on versions that no longer exist
+            for name in os.listdir(self.root):
+                pid = name.split('-', 1)[0]
+                if pid.isdigit() and not _process_alive(int(pid)):
+                    shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+            # resolved here rather than in __init__ so a worker forked after import gets its own
+            self.directory = os.path.join(self.root, f'{os.getpid()}-{uuid.uuid4().hex[:8]}')
+            os.makedirs(self.directory)
+            self._ready = True
+
+    def _drop(self, key: str, unlink: bool = True):
+        artifact = self._entries.pop(key)
+        self._bytes -= artifact.size
+        if unlink:
+            _unlink(artifact.path)
+
+
+export_cache = ExportArtifactCache(
+    settings.export_cache_dir,
+    settings.export_cache_max_bytes,
+    settings.export_cache_ttl_seconds,
+    settings.export_cache_enabled,
+    settings.export_cache_local_ttl_seconds
+)
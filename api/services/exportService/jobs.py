@@ -0,0 +1,234 @@
+"""Background export jobs.
+
+Large exports render on a small worker pool instead of the request worker. The
+request gets a job id back straight away, polls the job for progress and
+downloads the finished artifact (with Range support) until it expires.
+
+Jobs live in this process's memory and artifacts on its local disk, so with
+several app processes a client has to reach the process that holds its job.
+"""
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from apscheduler.triggers.interval import IntervalTrigger
+from fastapi import HTTPException, status
+
+from config.config import settings
+from services.exportService.spool import render_to_file
+from services.exportService.utils import ExportJobResponse
+from services.metricsService.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed')
+
+EXPORT_JOBS = registry.counter('export_jobs_total', 'Finished background export jobs', ('format', 'result'))
+EXPORT_JOBS_REJECTED = registry.counter('export_jobs_rejected_total', 'Export jobs refused because the queue was full')
+EXPORT_JOBS_ACTIVE = registry.gauge('export_jobs', 'Background export jobs by status', ('status',))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class ExportJob:
+    format: str
+    requested_by: Optional[str] = None
+    total_rows: Optional[int] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = 'queued'
+    rows_written: int = 0
+    created_at: datetime = field(default_factory=_now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    media_type: Optional[str] = None
+    filename: Optional[str] = None
+    path: Optional[str] = None
+    size_bytes: Optional[int] = None
+    error: Optional[str] = None
+
+    def track(self, rows: Iterable) -> Iterator:
+        """Pass ``rows`` through, counting them as written for progress reports."""
+        for row in rows:
+            self.rows_written += 1
+            yield row
+
+    def report(self, rows: int):
+        """Progress of a render running in another process."""
+        self.rows_written = rows
+
+    @property
+    def etag(self) -> str:
+        """Strong tag of the artifact; a job renders exactly once, so its id and size
+        identify the bytes."""
+        return f'"{self.id}-{self.size_bytes}"'
+
+    @property
+    def progress(self) -> Optional[float]:
+        if self.status == 'done':
+            return 1.0
+        if not self.total_rows:
+            return None
+        return min(self.rows_written / self.total_rows, 1.0)
+
+
+class ExportJobManager:
+    def __init__(
+            self,
+            workers: int,
+            max_pending: int,
+            ttl_seconds: int,
+            directory: Optional[str] = None
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 'locale-exports')
+        self._jobs: Dict[str, ExportJob] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(
+            self,
+            job: ExportJob,
+            render: Callable[[str], int],
+            media_type: str,
+            filename: str
+    ) -> ExportJob:
+        """Queue ``render(path)`` for ``job``; 429 when ``max_pending`` jobs are
+        already queued or running."""
+        job.media_type, job.filename = media_type, filename
+        with self._lock:
+            pending = sum(1 for queued in self._jobs.values() if queued.status in ('queued', 'running'))
+            if pending >= self.max_pending:
+                EXPORT_JOBS_REJECTED.inc()
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail='too many export jobs in progress, try again later',
+                    headers={'Retry-After': '30'}
+                )
+            if self._executor is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='export-job')
+            self._jobs[job.id] = job
+            self._executor.submit(self._run, job, render)
+        logger.info('queued %s export job %s for %s', job.format, job.id, job.requested_by)
+        return job
+
+    def _run(self, job: ExportJob, render: Callable[[str], int]):
+        job.status, job.started_at = 'running', _now()
+        try:
+            path, rows, _ = render_to_file(render, job.format, self.directory)
+        except Exception as e:
+            logger.error('export job %s failed: %s', job.id, str(e), exc_info=True)
+            job.error = e.detail if isinstance(e, HTTPException) else 'export failed'
+            job.status = 'failed'
+            EXPORT_JOBS.inc(job.format, 'failed')
+        else:
+            job.path, job.rows_written, job.size_bytes = path, rows, os.path.getsize(path)
+            job.status = 'done'
+            EXPORT_JOBS.inc(job.format, 'done')
+        job.finished_at = _now()
+        job.expires_at = job.finished_at + self.ttl
+
+    def get(self, job_id: str) -> ExportJob:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='export job not found or expired'
+            )
+        return job
+
+    def artifact(self, job_id: str) -> ExportJob:
+        """The finished job, or 409 while it is still rendering or if it failed."""
+        job = self.get(job_id)
+        if job.status != 'done':
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f'export job is {job.status}'
+            )
+        return job
+
+    def cleanup_expired(self) -> int:
+        """Forget jobs past their TTL and delete their artifacts; returns how many."""
+        now = _now()
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.expires_at and job.expires_at <= now]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            self._remove_artifact(job)
+        if expired:
+            logger.info('removed %d expired export jobs', len(expired))
+        return len(expired)
+
+    def schedule_cleanup(self, scheduler, minutes: int):
+        scheduler.add_job(
+            self.cleanup_expired,
+            trigger=IntervalTrigger(minutes=minutes),
+            id='export_job_cleanup',
+            replace_existing=True
+        )
+
+    def shutdown(self):
+        """Stop taking work, drop queued jobs and delete every artifact: job state
+        does not survive a restart, so the files would be unreachable."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+        for job in jobs:
+            self._remove_artifact(job)
+
+    def collect(self):
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        for job in list(self._jobs.values()):
+            counts[job.status] += 1
+        for job_status, count in counts.items():
+            EXPORT_JOBS_ACTIVE.set(count, job_status)
+
+    @staticmethod
+    def _remove_artifact(job: ExportJob):
+        if job.path:
+            try:
+                os.unlink(job.path)
+            except FileNotFoundError:
+                pass
+
+
+def job_response(job: ExportJob, download_url: Optional[str] = None) -> ExportJobResponse:
+    return ExportJobResponse(
+        id=job.id,
+        format=job.format,
+        status=job.status,
+        rows_written=job.rows_written,
+        total_rows=job.total_rows,
+        progress=job.progress,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        expires_at=job.expires_at,
+        size_bytes=job.size_bytes,
+        error=job.error,
+        download_url=download_url if job.status == 'done' else None
+    )
+
+
+export_jobs = ExportJobManager(
+    settings.export_job_workers,
+    settings.export_job_max_pending,
+    settings.export_job_ttl_seconds,
+    settings.export_job_dir
+)
+registry.add_collector(export_jobs.collect)
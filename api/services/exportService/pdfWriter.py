@@ -0,0 +1,67 @@
+"""Minimal PDF writer that streams pages to disk.
+
+ReportLab's canvas keeps every finished page in memory until ``save()``, so an
+export's heap grows with its row count. This writer sends each page's objects to
+the file as soon as the page is added and keeps only their byte offsets for the
+cross-reference table. Text uses the standard Helvetica font, which viewers supply,
+so nothing is embedded.
+"""
+import zlib
+from typing import BinaryIO, List, Tuple
+
+FONT_NAME = 'Helvetica'
+
+_CATALOG, _PAGES, _FONT = 1, 2, 3
+_FIRST_PAGE_OBJECT = 4
+
+
+def pdf_text(text: str) -> bytes:
+    """``text`` as a PDF string literal in the font's WinAnsi encoding."""
+    encoded = text.encode('cp1252', errors='replace')
+    return b'(' + encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+class StreamingPdfWriter:
+    def __init__(self, handle: BinaryIO, page_size: Tuple[float, float]):
+        self.handle = handle
+        self.page_size = page_size
+        self._offsets: List[int] = []
+        self._page_objects: List[int] = []
+        self._next_object = _FIRST_PAGE_OBJECT
+        handle.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _write_object(self, number: int, body: bytes):
+        while len(self._offsets) < number:
+            self._offsets.append(0)
+        self._offsets[number - 1] = self.handle.tell()
+        self.handle.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+
+    def add_page(self, content: bytes):
+        """Write one page whose drawing operators are ``content``."""
+        stream = zlib.compress(content)
+        contents, page = self._next_object, self._next_object + 1
+        self._next_object += 2
+        self._write_object(contents, b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(stream)
+                           + stream + b'\nendstream')
+        self._write_object(page, (
+            '<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] /Contents %d 0 R '
+            '/Resources << /Font << /F1 %d 0 R >> >> >>'
+            % (_PAGES, self.page_size[0], self.page_size[1], contents, _FONT)
+        ).encode())
+        self._page_objects.append(page)
+
+    def close(self):
+        """Write the shared objects, cross-reference table and trailer."""
+        self._write_object(_FONT, (
+            f'<< /Type /Font /Subtype /Type1 /BaseFont /{FONT_NAME} /Encoding /WinAnsiEncoding >>'
+        ).encode())
+        kids = ' '.join(f'{number} 0 R' for number in self._page_objects)
+        self._write_object(_PAGES, f'<< /Type /Pages /Kids [{kids}] /Count {len(self._page_objects)} >>'.encode())
+        self._write_object(_CATALOG, f'<< /Type /Catalog /Pages {_PAGES} 0 R >>'.encode())
+
+        xref = self.handle.tell()
+        self.handle.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(self._offsets) + 1))
+        for offset in self._offsets:
+            self.handle.write(b'%010d 00000 n \n' % offset)
+        self.handle.write(b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                          % (len(self._offsets) + 1, _CATALOG, xref))
@@ -0,0 +1,177 @@
+"""Bounded process pool for CPU-heavy rendering.
+
+CSV/PDF/Parquet rendering holds the GIL for seconds at a time. Run in the API
+process it stalls every other request on the same worker, so renders go to
+separate processes. The caller's thread only waits, without the GIL, until the
+file is written.
+
+Children are started with ``spawn``: they import the app's modules afresh and
+open their own database connections, instead of inheriting the parent's
+connection pool and locks. Tasks are module-level functions taking picklable
+arguments and a ``track`` wrapper for their rows. Progress goes back through
+one shared counter slot per running task.
+"""
+import concurrent.futures
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from fastapi import HTTPException, status
+
+from config.config import settings
+from services.metricsService.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+POOL_IN_FLIGHT = registry.gauge('render_pool_in_flight', 'Tasks queued or running in a render pool', ('pool',))
+POOL_TASKS = registry.counter('render_pool_tasks_total', 'Render pool tasks by result', ('pool', 'task', 'result'))
+POOL_REJECTED = registry.counter('render_pool_rejected_total', 'Tasks refused because the pool was full', ('pool',))
+POOL_QUEUE_WAIT = registry.histogram(
+    'render_pool_queue_wait_seconds', 'Time a task waited for a free worker process', ('pool',),
+    (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0))
+POOL_TASK_SECONDS = registry.histogram(
+    'render_pool_task_seconds', 'Time a task ran in its worker process', ('pool', 'task'),
+    (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0))
+
+PROGRESS_EVERY = 1000
+
+# set in worker processes only
+_progress = None
+_in_worker = False
+
+
+class RenderTaskError(Exception):
+    """A task failed in its worker; carries the original error as text so it always
+    survives pickling back to the parent."""
+
+
+def _init_worker(progress):
+    global _progress, _in_worker
+    _progress, _in_worker = progress, True
+    # mapper relationships resolve by class name, so every model must be imported
+    import services.authService.model.authModel  # noqa: F401
+    import services.users.model.buyerModel  # noqa: F401
+    import services.users.model.vendorModel  # noqa: F401
+
+
+def _slot_track(slot: int) -> Callable[[Iterable], Iterator]:
+    def track(rows: Iterable) -> Iterator:
+        count = 0
+        for row in rows:
+            yield row
+            count += 1
+            if count % PROGRESS_EVERY == 0:
+                _progress[slot] = count
+        _progress[slot] = count
+    return track
+
+
+def _call(fn: Callable, slot: int, args: tuple):
+    _progress[slot] = 0
+    started = time.time()
+    try:
+        result = fn(*args, track=_slot_track(slot))
+    except Exception as e:
+        logger.error('render task %s failed', fn.__name__, exc_info=True)
+        raise RenderTaskError(f'{type(e).__name__}: {e}') from None
+    return started, result
+
+
+class RenderPool:
+    def __init__(self, name: str, workers: int, max_queued: int):
+        self.name = name
+        self.workers = workers
+        self.capacity = workers + max_queued
+        self._lock = threading.Lock()
+        self._slots_free = threading.Condition(self._lock)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._free_slots: List[int] = list(range(self.capacity))
+        self._progress = None
+
+    @property
+    def enabled(self) -> bool:
+        # a worker process renders in place rather than submitting to a pool of its own
+        return self.workers > 0 and not _in_worker
+
+    def run(
+            self,
+            task: str,
+            fn: Callable,
+            *args: Any,
+            progress: Optional[Callable[[int], None]] = None,
+            wait: bool = False
+    ):
+        """Run ``fn(*args, track=...)`` in a worker process and return its result,
+        calling ``progress(rows)`` while waiting. When ``workers + max_queued`` tasks
+        are already in flight this raises 429, or with ``wait`` blocks until one ends."""
+        with self._slots_free:
+            if not self._free_slots and not wait:
+                POOL_REJECTED.inc(self.name)
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail='rendering capacity exhausted, try again later',
+                    headers={'Retry-After': '30'}
+                )
+            self._slots_free.wait_for(lambda: self._free_slots)
+            slot = self._free_slots.pop()
+            executor = self._ensure_executor()
+            POOL_IN_FLIGHT.set(self.capacity - len(self._free_slots), self.name)
+
+        submitted = time.time()
+        try:
+            future = executor.submit(_call, fn, slot, args)
+            while True:
+                try:
+                    started, result = future.result(timeout=0.5)
+                    break
+                except concurrent.futures.TimeoutError:
+                    if progress is not None:
+                        progress(self._progress[slot])
+        except BrokenProcessPool:
+            POOL_TASKS.inc(self.name, task, 'crashed')
+            logger.error('%s pool worker died running %s; restarting the pool', self.name, task)
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise
+        except RenderTaskError:
+            POOL_TASKS.inc(self.name, task, 'failed')
+            raise
+        finally:
+            with self._slots_free:
+                self._free_slots.append(slot)
+                POOL_IN_FLIGHT.set(self.capacity - len(self._free_slots), self.name)
+                self._slots_free.notify()
+
+        finished = time.time()
+        POOL_TASKS.inc(self.name, task, 'done')
+        POOL_QUEUE_WAIT.observe(max(started - submitted, 0.0), self.name)
+        POOL_TASK_SECONDS.observe(finished - started, self.name, task)
+        return result
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            context = multiprocessing.get_context('spawn')
+            if self._progress is None:
+                self._progress = context.Array('q', self.capacity, lock=False)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._progress,)
+            )
+            logger.info('started %s pool with %d processes', self.name, self.workers)
+        return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+render_pool = RenderPool('render', settings.render_pool_workers, settings.render_pool_max_queued)
@@ -0,0 +1,253 @@
+"""Incremental renderers for exports.
+
+Renderers consume an iterable of mapped rows (dicts) and either yield encoded
+chunks as they fill (CSV, or ``write_csv`` into a file) or write one fixed-size page at a time into a file
+(PDF), so an export never holds more than one chunk or page of rows.
+"""
+import csv
+import json
+from datetime import datetime
+from io import StringIO
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from reportlab.lib.pagesizes import landscape, letter
+from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from services.exportService.pdfWriter import FONT_NAME, StreamingPdfWriter, pdf_text
+
+Formatter = Callable[[Any], Any]
+
+VENDOR_EXPORT_COLUMNS = (
+    'id', 'vendor_title', 'vendor_location', 'vendor_address', 'vendor_contact', 'vendor_email',
+    'vendor_merchandise', 'vendor_scale', 'vendor_rating', 'created_at', 'updated_at',
+    'vendor_metadata', 'is_active', 'deleted', 'userId',
+)
+
+
+def export_timestamp(value: Any) -> Any:
+    """created_at as the exports have always shown it (DD-MM-YY HH:MM:SS)."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.strftime('%d-%m-%y %H:%M:%S')
+    return value
+
+
+VENDOR_EXPORT_FORMATTERS: Dict[str, Formatter] = {'created_at': export_timestamp}
+
+VENDOR_PDF_COLUMNS = (
+    'id', 'vendor_title', 'vendor_email', 'vendor_location', 'created_at', 'vendor_scale', 'is_active',
+)
+
+BUYER_EXPORT_COLUMNS = (
+    'id', 'buyer_name', 'buyer_email', 'buyer_location', 'buyer_address', 'buyer_contact',
+    'created_at', 'updated_at', 'is_active', 'is_deleted', 'buyer_metadata', 'user_id',
+)
+
+BUYER_EXPORT_FORMATTERS: Dict[str, Formatter] = {'created_at': export_timestamp}
+
+BUYER_PDF_COLUMNS = (
+    'id', 'buyer_name', 'buyer_email', 'buyer_location', 'created_at', 'is_active', 'is_deleted',
+)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(',', ':'), default=str)
+    return value
+
+
+def render_csv(
+        rows: Iterable[Dict[str, Any]],
+        columns: Sequence[str],
+        formatters: Optional[Dict[str, Formatter]] = None,
+        chunk_size: int = 64 * 1024
+) -> Iterator[bytes]:
+    """Write ``rows`` as CSV with a header, yielding roughly ``chunk_size`` bytes at a time."""
+    formatters = formatters or {}
+    getters = [
+        (column, formatters.get(column)) for column in columns
+    ]
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for row in rows:
+        writer.writerow([
+            _csv_value(formatter(row.get(column)) if formatter else row.get(column))
+            for column, formatter in getters
+        ])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class RowCounter:
+    """Counts the rows passed through ``counter(rows)``."""
+
+    def __init__(self):
+        self.rows = 0
+
+    def __call__(self, rows: Iterable[Any]) -> Iterator[Any]:
+        for row in rows:
+            self.rows += 1
+            yield row
+
+
+def write_csv(
+        rows: Iterable[Dict[str, Any]],
+        columns: Sequence[str],
+        path: str,
+        formatters: Optional[Dict[str, Formatter]] = None,
+        chunk_size: int = 64 * 1024
+) -> int:
+    """``render_csv`` into a file at ``path``; returns the row count."""
+    counter = RowCounter()
+    with open(path, 'wb') as handle:
+        for chunk in render_csv(counter(rows), columns, formatters, chunk_size):
+            handle.write(chunk)
+    return counter.rows
+
+
+# Table layout in points. Rows have a fixed height, so every page holds a known
+# number of rows and no row can be pushed past the bottom margin.
+PDF_MARGIN = 0.4 * inch
+PDF_HEADER_HEIGHT = 14.0
+PDF_HEADER_FONT_SIZE = 9
+PDF_ROW_HEIGHT = 10.0
+PDF_FONT_SIZE = 7
+PDF_CELL_PADDING = 3.0
+PDF_CELL_CHARS = 48
+PDF_HEADER_FILL = b'0.502 0.502 0.502 rg'
+PDF_HEADER_TEXT = b'0.961 0.961 0.961 rg'
+PDF_BODY_FILL = b'0.961 0.961 0.863 rg'
+
+
+def _pdf_value(value: Any) -> str:
+    text = '' if value is None else ' '.join(str(value).split())
+    return text if len(text) <= PDF_CELL_CHARS else text[:PDF_CELL_CHARS - 1] + '\u2026'
+
+
+def _fit(text: str, width: float, font_size: float) -> str:
+    """Trim ``text`` with an ellipsis until it is at most ``width`` points wide."""
+    if stringWidth(text, FONT_NAME, font_size) <= width:
+        return text
+    while text and stringWidth(text + '\u2026', FONT_NAME, font_size) > width:
+        text = text[:-1]
+    return text + '\u2026'
+
+
+def _column_widths(cells: List[List[str]], available: float) -> List[float]:
+    """Share ``available`` points between columns in proportion to the widest text
+    each holds in ``cells``, handing any spare width out evenly."""
+    needed = [
+        max(stringWidth(row[index], FONT_NAME, PDF_HEADER_FONT_SIZE if number == 0 else PDF_FONT_SIZE)
+            for number, row in enumerate(cells)) + 2 * PDF_CELL_PADDING
+        for index in range(len(cells[0]))
+    ]
+    if sum(needed) > available:
+        return [available * width / sum(needed) for width in needed]
+    spare = (available - sum(needed)) / len(needed)
+    return [width + spare for width in needed]
+
+
+def pdf_rows_that_fit(page_height: float) -> int:
+    return max(1, int((page_height - 2 * PDF_MARGIN - PDF_HEADER_HEIGHT) // PDF_ROW_HEIGHT))
+
+
+def _pdf_page(cells: List[List[str]], column_widths: List[float], top: float) -> bytes:
+    """Drawing operators for one table: a header row then ``cells[1:]``."""
+    left = PDF_MARGIN
+    width = sum(column_widths)
+    body_height = PDF_ROW_HEIGHT * (len(cells) - 1)
+    bottom = top - PDF_HEADER_HEIGHT - body_height
+    ops = [
+        PDF_HEADER_FILL, b'%.2f %.2f %.2f %.2f re f' % (left, top - PDF_HEADER_HEIGHT, width, PDF_HEADER_HEIGHT),
+        PDF_BODY_FILL, b'%.2f %.2f %.2f %.2f re f' % (left, bottom, width, body_height),
+        b'0 G 0.5 w',
+    ]
+    # horizontal rules under the header and every row, then the column rules
+    y = top
+    ops.append(b'%.2f %.2f m %.2f %.2f l' % (left, y, left + width, y))
+    for index in range(len(cells)):
+        y -= PDF_HEADER_HEIGHT if index == 0 else PDF_ROW_HEIGHT
+        ops.append(b'%.2f %.2f m %.2f %.2f l' % (left, y, left + width, y))
+    x = left
+    for column_width in [0.0] + column_widths:
+        x += column_width
+        ops.append(b'%.2f %.2f m %.2f %.2f l' % (x, top, x, bottom))
+    ops.append(b'S')
+
+    ops.append(b'BT')
+    baseline = top - PDF_HEADER_HEIGHT + (PDF_HEADER_HEIGHT - PDF_HEADER_FONT_SIZE) / 2 + 1
+    for index, row in enumerate(cells):
+        if index == 0:
+            ops += [PDF_HEADER_TEXT, b'/F1 %d Tf' % PDF_HEADER_FONT_SIZE]
+        elif index == 1:
+            baseline = top - PDF_HEADER_HEIGHT - PDF_ROW_HEIGHT + (PDF_ROW_HEIGHT - PDF_FONT_SIZE) / 2 + 1
+            ops += [b'0 g', b'/F1 %d Tf' % PDF_FONT_SIZE]
+        else:
+            baseline -= PDF_ROW_HEIGHT
+        x = left
+        for text, column_width in zip(row, column_widths):
+            if text:
+                ops.append(b'1 0 0 1 %.2f %.2f Tm ' % (x + PDF_CELL_PADDING, baseline) + pdf_text(text) + b' Tj')
+            x += column_width
+    ops.append(b'ET')
+    return b'\n'.join(ops)
+
+
+def render_pdf(
+        rows: Iterable[Dict[str, Any]],
+        columns: Sequence[str],
+        path: str,
+        formatters: Optional[Dict[str, Formatter]] = None,
+        rows_per_page: int = 40
+) -> int:
+    """Write ``rows`` to a PDF at ``path``, up to ``rows_per_page`` rows per page (fewer
+    if that many would not fit); returns the row count.
+
+    Each page is drawn and written to the file before the next page's rows are read,
+    so memory stays flat however many rows there are (see ``pdfWriter``).
+    """
+    formatters = formatters or {}
+    page_size = landscape(letter)
+    rows_per_page = max(1, min(rows_per_page, pdf_rows_that_fit(page_size[1])))
+    top = page_size[1] - PDF_MARGIN
+    column_widths: List[float] = []
+
+    iterator = iter(rows)
+    total = 0
+    with open(path, 'wb') as handle:
+        writer = StreamingPdfWriter(handle, page_size)
+        while True:
+            page = list(islice(iterator, rows_per_page))
+            if not page and total:
+                break
+            cells = [list(columns)] + [
+                [_pdf_value(formatters[column](row.get(column)) if column in formatters else row.get(column))
+                 for column in columns]
+                for row in page
+            ]
+            if not column_widths:
+                # sized from the first page and kept, so columns line up across pages
+                column_widths = _column_widths(cells, page_size[0] - 2 * PDF_MARGIN)
+            cells = [
+                [_fit(text, width - 2 * PDF_CELL_PADDING, PDF_HEADER_FONT_SIZE if number == 0 else PDF_FONT_SIZE)
+                 for text, width in zip(row, column_widths)]
+                for number, row in enumerate(cells)
+            ]
+            writer.add_page(_pdf_page(cells, column_widths, top))
+            total += len(page)
+            if len(page) < rows_per_page:
+                break
+        writer.close()
+    return total
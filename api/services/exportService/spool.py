@@ -0,0 +1,139 @@
+import logging
+import os
+import tempfile
+import time
+from typing import Callable, Iterator, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+from config.config import settings
+from services.metricsService.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+EXPORT_ROWS = registry.counter('export_rows_total', 'Rows written by exports', ('format',))
+EXPORT_RENDER_SECONDS = registry.histogram(
+    'export_render_seconds', 'Wall time spent rendering an export', ('format',),
+    (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0))
+
+
+def render_to_file(render: Callable[[str], int], format: str, directory: Optional[str] = None) -> tuple:
+    """Run ``render(path)`` into a new temp file (in ``directory``, default
+    ``export_tmp_dir``); returns (path, rows, seconds).
+
+    The file is removed if rendering fails.
+    """
+    fd, path = tempfile.mkstemp(prefix='export-', suffix=f'.{format}', dir=directory or settings.export_tmp_dir)
+    os.close(fd)
+    start = time.perf_counter()
+    try:
+        rows = render(path)
+    except BaseException:
+        os.unlink(path)
+        raise
+    elapsed = time.perf_counter() - start
+
+    EXPORT_ROWS.inc(format, amount=rows)
+    EXPORT_RENDER_SECONDS.observe(elapsed, format)
+    logger.info('%s export: %d rows in %.2fs (%.0f rows/s)', format, rows, elapsed, rows / elapsed if elapsed else 0)
+    return path, rows, elapsed
+
+
+def spooled_file_response(render: Callable[[str], int], format: str, media_type: str, filename: str) -> FileResponse:
+    """Render an export to a temp file and send it, deleting the file once sent.
+
+    FileResponse streams from disk in chunks (or hands the file to the server's
+    zero-copy sendfile extension when it offers one), so the rendered document is
+    never held in memory.
+    """
+    path, rows, elapsed = render_to_file(render, format)
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=filename,
+        headers={
+            'X-Export-Rows': str(rows),
+            'X-Export-Rows-Per-Second': f'{rows / elapsed if elapsed else 0:.0f}',
+        },
+        background=BackgroundTask(os.unlink, path)
+    )
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """The (start, end) byte offsets, inclusive, asked for by a single-range ``Range``
+    header, or None to send the whole file.
+
+    Multi-range and non-byte requests get the whole file, which RFC 9110 allows;
+    a range that starts past the end raises 416.
+    """
+    if not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+    first, _, last = range_header[len('bytes='):].strip().partition('-')
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            # suffix range: the last N bytes
+            start, end = max(size - int(last), 0), size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail='requested range not satisfiable',
+            headers={'Content-Range': f'bytes */{size}'}
+        )
+    return start, end
+
+
+def _read_range(path: str, start: int, end: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    remaining = end - start + 1
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while remaining > 0:
+            chunk = handle.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def range_file_response(
+        path: str,
+        range_header: Optional[str],
+        media_type: str,
+        filename: str,
+        etag: str,
+        if_range: Optional[str] = None
+):
+    """Send a stored file, or the single byte range asked for with 206, so large
+    downloads can be resumed.
+
+    Offsets only line up with what the client already has if the bytes are sent
+    untransformed, so responses carry ``no-transform`` (the route should also be
+    exempt from compression). A Range sent with an ``If-Range`` that is not the
+    current strong ``etag`` gets the whole file, as RFC 9110 requires.
+    """
+    size = os.path.getsize(path)
+    headers = {'Accept-Ranges': 'bytes', 'ETag': etag, 'Cache-Control': 'no-transform'}
+    if if_range is not None and if_range.strip() != etag:
+        range_header = None
+    byte_range = parse_range(range_header, size)
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
+
+    start, end = byte_range
+    return StreamingResponse(
+        _read_range(path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers={
+            **headers,
+            'Content-Range': f'bytes {start}-{end}/{size}',
+            'Content-Length': str(end - start + 1),
+            'Content-Disposition': f'attachment; filename="{filename}"',
+        }
+    )
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Literal, Optional
+from pydantic import BaseModel
+
+
+class ExportJobResponse(BaseModel):
+    id: str
+    format: str
+    status: Literal['queued', 'running', 'done', 'failed']
+    rows_written: int
+    total_rows: Optional[int] = None
+    progress: Optional[float] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    size_bytes: Optional[int] = None
+    error: Optional[str] = None
+    download_url: Optional[str] = None
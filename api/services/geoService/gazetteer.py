@@ -0,0 +1,88 @@
+import csv
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from config.config import settings
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    city: str
+    state: str
+    latitude: float
+    longitude: float
+
+    @property
+    def is_city(self) -> bool:
+        return self.name == self.city
+
+
+def normalize(text: Optional[str]) -> str:
+    return ' '.join(_NON_WORD.sub(' ', (text or '').lower()).split())
+
+
+class Gazetteer:
+    """Offline place-name lookup from a CSV of ``name,city,state,latitude,longitude``.
+
+    Cities have ``name == city``; other rows are districts within that city.
+    """
+
+    def __init__(self, places: List[Place]):
+        self.places: Dict[str, Place] = {normalize(place.name): place for place in places}
+        # longest names first so "benin city" wins over a shorter overlapping name
+        self._names = sorted(self.places, key=len, reverse=True)
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'Gazetteer':
+        with open(path, newline='', encoding='utf-8') as handle:
+            return cls([
+                Place(row['name'], row['city'], row['state'], float(row['latitude']), float(row['longitude']))
+                for row in csv.DictReader(handle)
+            ])
+
+    def _find(self, text: str) -> List[Place]:
+        padded = f' {text} '
+        return [self.places[name] for name in self._names if f' {name} ' in padded]
+
+    def geocode(self, location: Optional[str], address: Optional[str] = None) -> Optional[Place]:
+        """Most specific place named in ``address``/``location``.
+
+        A district in the address wins when it lies in the city named by the location
+        (or no city is named); otherwise the location's city, then any place at all.
+        """
+        location_matches = self._find(normalize(location))
+        address_matches = self._find(normalize(address))
+        cities = {place.city for place in location_matches}
+
+        for place in address_matches + location_matches:
+            if not place.is_city and (not cities or place.city in cities):
+                return place
+        for place in location_matches + address_matches:
+            if place.is_city:
+                return place
+        return (location_matches + address_matches or [None])[0]
+
+
+def gazetteer_path() -> str:
+    path = settings.gazetteer_path
+    return path if os.path.isabs(path) else os.path.join(API_DIR, path)
+
+
+@lru_cache(maxsize=1)
+def default_gazetteer() -> Gazetteer:
+    return Gazetteer.from_csv(gazetteer_path())
+
+
+def geocode(location: Optional[str], address: Optional[str] = None) -> Optional[Tuple[float, float, str]]:
+    place = default_gazetteer().geocode(location, address)
+    if place is None:
+        return None
+    return place.latitude, place.longitude, place.name
@@ -0,0 +1,143 @@
+"""Geohash encoding, cell geometry and great-circle distance.
+
+A geohash interleaves longitude and latitude bits into base32, so nearby points
+share prefixes and every prefix is a rectangular cell. That lets a plain B-tree
+index on the hash string answer "what is in this cell" as a range scan.
+"""
+import math
+from typing import List, Tuple
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+MAX_PRECISION = 12
+
+
+def encode(latitude: float, longitude: float, precision: int = 9) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bit = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        target, span = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (span[0] + span[1]) / 2
+        value <<= 1
+        if target >= mid:
+            value |= 1
+            span[0] = mid
+        else:
+            span[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(BASE32[value])
+            bit = 0
+            value = 0
+    return ''.join(chars)
+
+
+def cell_size_degrees(precision: int) -> Tuple[float, float]:
+    """(latitude, longitude) extent in degrees of a cell at ``precision``."""
+    bits = precision * 5
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def decode_cell(geohash: str) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) of the cell."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            span = lon_range if even else lat_range
+            mid = (span[0] + span[1]) / 2
+            if value >> shift & 1:
+                span[0] = mid
+            else:
+                span[1] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def precision_for_radius(radius_km: float, latitude: float) -> int:
+    """Finest precision whose cells are at least ``radius_km`` on each side."""
+    cos_lat = max(math.cos(math.radians(latitude)), 0.01)
+    for precision in range(MAX_PRECISION, 0, -1):
+        lat_deg, lon_deg = cell_size_degrees(precision)
+        if min(lat_deg * KM_PER_DEGREE, lon_deg * KM_PER_DEGREE * cos_lat) >= radius_km:
+            return precision
+    return 1
+
+
+def _closest_latitude(latitude: float, lon_offset: float) -> float:
+    """Latitude of the point nearest the origin on the meridian ``lon_offset``
+    degrees away; beyond a quarter turn that is the origin's pole."""
+    cos_offset = math.cos(math.radians(lon_offset))
+    if cos_offset <= 0:
+        return 90.0 if latitude >= 0 else -90.0
+    return math.degrees(math.atan(math.tan(math.radians(latitude)) / cos_offset))
+
+
+def distance_to_cell_km(latitude: float, longitude: float, min_lat: float, min_lon: float,
+                        max_lat: float, max_lon: float) -> float:
+    """Great-circle distance from a point to the nearest point of a cell."""
+    # longitude offset from the origin to the cell, taking the short way round
+    offset = (min_lon - longitude + 180) % 360 - 180
+    nearest_offset = min(max(0.0, offset), offset + (max_lon - min_lon))
+    nearest_lat = min(max(_closest_latitude(latitude, nearest_offset), min_lat), max_lat)
+    return haversine_km(latitude, longitude, nearest_lat, longitude + nearest_offset)
+
+
+def children(cell: str) -> List[str]:
+    return [cell + char for char in BASE32]
+
+
+def cells_within(latitude: float, longitude: float, radius_km: float, precision: int) -> List[str]:
+    """Every cell at ``precision`` with some point within ``radius_km`` of the origin,
+    nearest cells first."""
+    lat_step, lon_step = cell_size_degrees(precision)
+    lat_reach = radius_km / KM_PER_DEGREE
+    if abs(latitude) + lat_reach >= 90:
+        # the circle takes in a pole, and with it every longitude
+        lon_reach = 180.0
+    else:
+        # widest longitude offset on a spherical circle around the origin
+        ratio = math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(latitude))
+        lon_reach = math.degrees(math.asin(min(ratio, 1.0)))
+
+    cells = []
+    first_row = math.floor((max(latitude - lat_reach, -90.0) + 90) / lat_step)
+    last_row = math.floor((min(latitude + lat_reach, 90.0) + 90) / lat_step)
+    first_column = math.floor((longitude - lon_reach + 180) / lon_step)
+    last_column = math.floor((longitude + lon_reach + 180) / lon_step)
+    for row in range(first_row, min(last_row, round(180 / lat_step) - 1) + 1):
+        min_lat = row * lat_step - 90
+        for column in range(first_column, last_column + 1):
+            min_lon = (column * lon_step) % 360 - 180
+            distance = distance_to_cell_km(
+                latitude, longitude, min_lat, min_lon, min_lat + lat_step, min_lon + lon_step)
+            if distance <= radius_km:
+                cells.append((distance, encode(min_lat + lat_step / 2, min_lon + lon_step / 2, precision)))
+    cells.sort()
+    # a reach of more than half the globe visits some columns twice
+    return list(dict.fromkeys(cell for _, cell in cells))
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def prefix_bounds(cell: str) -> Tuple[str, str]:
+    """Inclusive [low, high] bounds of every hash starting with ``cell``. A range
+    instead of LIKE keeps B-tree indexes usable under any collation, since hashes
+    only use lowercase letters and digits, which every collation orders alike."""
+    return cell, cell.ljust(MAX_PRECISION, BASE32[-1])
@@ -0,0 +1,181 @@
+"""Geocoded vendor and buyer locations.
+
+Free-text ``*_location``/``*_address`` values are geocoded against the local gazetteer
+into ``vendor_locations``/``buyer_locations`` rows carrying lat/lon and a geohash.
+ORM writes are geocoded as they flush; existing rows and Core bulk loads are
+geocoded offline in batches:
+
+    python -m services.geoService.locationIndex --database-url sqlite:///locale_app.db
+"""
+import argparse
+import logging
+import sys
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, delete, event, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from services.cacheService.tableVersions import record_table_writes
+from services.geoService import geohash
+from services.geoService.gazetteer import geocode
+from services.geoService.model.locationModel import BuyerLocation, VendorLocation
+from services.users.model.buyerModel import Buyer
+from services.users.model.vendorModel import Vendor
+
+logger = logging.getLogger(__name__)
+
+GEOHASH_PRECISION = 9
+
+# source model -> (location table, key column, location column, address column)
+LOCATED_MODELS = {
+    Vendor: (VendorLocation.__table__, 'vendor_id', 'vendor_location', 'vendor_address'),
+    Buyer: (BuyerLocation.__table__, 'buyer_id', 'buyer_location', 'buyer_address'),
+}
+
+
+@lru_cache(maxsize=65536)
+def _geocode_cached(location: Optional[str], address: Optional[str]) -> Optional[Tuple[float, float, str]]:
+    # bulk data repeats the same few thousand location/address pairs
+    return geocode(location, address)
+
+
+def location_row(key_column: str, entity_id: str, location: Optional[str], address: Optional[str],
+                 geocoded_at: datetime) -> Optional[dict]:
+    result = _geocode_cached(location, address)
+    if result is None:
+        return None
+    latitude, longitude, place = result
+    return {
+        key_column: entity_id,
+        'latitude': latitude,
+        'longitude': longitude,
+        'geohash': geohash.encode(latitude, longitude, GEOHASH_PRECISION),
+        'place': place,
+        'geocoded_at': geocoded_at,
+    }
+
+
+def _after_flush(session: Session, flush_context):
+    now = datetime.now()
+    pending: Dict[type, Tuple[List[str], List[dict]]] = {}
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        spec = LOCATED_MODELS.get(type(obj))
+        if spec is None:
+            continue
+        _, key_column, location_column, address_column = spec
+        stale_ids, rows = pending.setdefault(type(obj), ([], []))
+
+        if obj in session.deleted:
+            stale_ids.append(obj.id)
+            continue
+        if obj not in session.new:
+            attrs = inspect(obj).attrs
+            if not (attrs[location_column].history.has_changes() or attrs[address_column].history.has_changes()):
+                continue
+        stale_ids.append(obj.id)
+        row = location_row(key_column, obj.id, getattr(obj, location_column), getattr(obj, address_column), now)
+        if row is not None:
+            rows.append(row)
+
+    if not pending:
+        return
+    conn = session.connection()
+    for model, (stale_ids, rows) in pending.items():
+        if not stale_ids:
+            continue
+        table, key_column, _, _ = LOCATED_MODELS[model]
+        conn.execute(delete(table).where(table.c[key_column].in_(stale_ids)))
+        if rows:
+            conn.execute(table.insert(), rows)
+        record_table_writes(session, {table.name})
+
+
+def track_locations(session_factory):
+    """Geocode vendors and buyers written through ``session_factory`` as they flush."""
+    if not event.contains(session_factory, 'after_flush', _after_flush):
+        event.listen(session_factory, 'after_flush', _after_flush)
+
+
+def locate_inserted_rows(conn: Connection, model, rows: List[dict]) -> int:
+    """Geocode ``model`` rows inserted through Core on ``conn``; returns how many were
+    located. The rows must be new: nothing is replaced."""
+    table, key_column, location_column, address_column = LOCATED_MODELS[model]
+    now = datetime.now()
+    located = [location for location in (
+        location_row(key_column, row['id'], row[location_column], row[address_column], now) for row in rows
+    ) if location is not None]
+    if located:
+        conn.execute(table.insert(), located)
+    return len(located)
+
+
+def geocode_table(conn: Connection, model, only_missing: bool = True, batch_size: int = 5000,
+                  geocoded_at: Optional[datetime] = None) -> Tuple[int, int]:
+    """Geocode every row of ``model`` in id order; returns (rows seen, rows located).
+    ``geocoded_at`` defaults to the time each batch is written."""
+    table, key_column, location_column, address_column = LOCATED_MODELS[model]
+    source = model.__table__
+    seen = located = 0
+    last_id = ''
+
+    while True:
+        query = select(source.c.id, source.c[location_column], source.c[address_column]).where(
+            source.c.id > last_id
+        ).order_by(source.c.id).limit(batch_size)
+        if only_missing:
+            query = query.where(~select(table.c[key_column]).where(table.c[key_column] == source.c.id).exists())
+        batch = conn.execute(query).all()
+        if not batch:
+            break
+
+        now = geocoded_at or datetime.now()
+        rows = [row for row in (
+            location_row(key_column, entity_id, location, address, now) for entity_id, location, address in batch
+        ) if row is not None]
+        if not only_missing:
+            conn.execute(delete(table).where(table.c[key_column].in_([entity_id for entity_id, _, _ in batch])))
+        if rows:
+            conn.execute(table.insert(), rows)
+        conn.commit()
+
+        seen += len(batch)
+        located += len(rows)
+        last_id = batch[-1][0]
+    return seen, located
+
+
+def backfill_locations(engine: Engine, only_missing: bool = True, batch_size: int = 5000,
+                       geocoded_at: Optional[datetime] = None) -> Dict[str, Tuple[int, int]]:
+    results = {}
+    with engine.connect() as conn:
+        for model in LOCATED_MODELS:
+            results[model.__tablename__] = geocode_table(conn, model, only_missing, batch_size, geocoded_at)
+            logger.info('%s: geocoded %d of %d rows', model.__tablename__, results[model.__tablename__][1],
+                        results[model.__tablename__][0])
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--all', action='store_true', help='re-geocode rows that already have a location')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    from config.database import Base
+    from services.authService.model.authModel import User  # noqa: F401  (resolves Vendor/Buyer relationships)
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine, tables=[VendorLocation.__table__, BuyerLocation.__table__])
+    results = backfill_locations(engine, only_missing=not args.all, batch_size=args.batch_size)
+    engine.dispose()
+    for table, (seen, located) in results.items():
+        print(f'{table}: {located:,} of {seen:,} rows geocoded', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+from sqlalchemy import (
+    Column,
+    String,
+    Float,
+    DateTime,
+    ForeignKey,
+    Index,
+)
+
+from config.database import Base
+
+
+class VendorLocation(Base):
+    __tablename__ = 'vendor_locations'
+    __table_args__ = (
+        # per-cell nearby lookups read (geohash, vendor_id) in index order up to a LIMIT
+        Index('idx_vendor_location_geohash_vendor', 'geohash', 'vendor_id'),
+    )
+    vendor_id = Column(
+        String(36),
+        ForeignKey('vendors.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    latitude = Column(
+        Float,
+        nullable=False
+    )
+    longitude = Column(
+        Float,
+        nullable=False
+    )
+    geohash = Column(
+        String(12),
+        nullable=False,
+        comment="geohash of (latitude, longitude); prefixes are grid cells"
+    )
+    place = Column(
+        String(100),
+        nullable=False,
+        comment="gazetteer place the vendor was geocoded to"
+    )
+    geocoded_at = Column(
+        DateTime,
+        nullable=False
+    )
+
+
+class BuyerLocation(Base):
+    __tablename__ = 'buyer_locations'
+    buyer_id = Column(
+        String(36),
+        ForeignKey('buyers.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    latitude = Column(
+        Float,
+        nullable=False
+    )
+    longitude = Column(
+        Float,
+        nullable=False
+    )
+    geohash = Column(
+        String(12),
+        index=True,
+        nullable=False,
+        comment="geohash of (latitude, longitude); prefixes are grid cells"
+    )
+    place = Column(
+        String(100),
+        nullable=False,
+        comment="gazetteer place the buyer was geocoded to"
+    )
+    geocoded_at = Column(
+        DateTime,
+        nullable=False
+    )
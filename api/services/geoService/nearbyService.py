@@ -0,0 +1,178 @@
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from deps import db_dependency, auth_dependency
+from config.config import settings
+from services.geoService import geohash
+from services.geoService.gazetteer import geocode
+from services.geoService.locationIndex import GEOHASH_PRECISION
+from services.geoService.model.locationModel import BuyerLocation, VendorLocation
+from services.geoService.utils import NearbyOrigin, NearbyVendor, NearbyVendorsResponse
+from services.users.model.buyerModel import Buyer
+from services.users.model.vendorModel import Vendor
+from services.users.services.vendorService import VendorService
+
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, select, union_all
+
+
+logger = logging.getLogger(__name__)
+
+
+# cells per candidate query; SQLite allows at most 500 members in a compound SELECT
+CELLS_PER_QUERY = 64
+
+
+@lru_cache(maxsize=CELLS_PER_QUERY)
+def _candidates_statement(cells: int):
+    """Up to ``:limit`` active vendors from each of ``cells`` geohash ranges bound as
+    ``:low_N``/``:high_N``. Built once per cell count so it is compiled once too."""
+    per_cell = [select(
+        VendorLocation.vendor_id, VendorLocation.geohash, VendorLocation.latitude, VendorLocation.longitude
+    ).join(
+        Vendor, Vendor.id == VendorLocation.vendor_id
+    ).where(
+        VendorLocation.geohash >= bindparam(f'low_{index}'),
+        VendorLocation.geohash <= bindparam(f'high_{index}'),
+        Vendor.is_active.is_(True),
+        Vendor.deleted.isnot(True)
+    ).order_by(
+        VendorLocation.geohash, VendorLocation.vendor_id
+    ).limit(bindparam('limit')).subquery() for index in range(cells)]
+    # LIMIT inside a compound SELECT needs each member wrapped as a subquery
+    return union_all(*(
+        select(cell.c.vendor_id, cell.c.geohash, cell.c.latitude, cell.c.longitude) for cell in per_cell
+    ))
+
+
+class NearbyService:
+    def __init__(self, db_session: db_dependency):
+        self.db = db_session
+        self.vendorService = VendorService(db_session)
+
+    def nearby_vendors(
+            self,
+            auth: auth_dependency,
+            latitude: Optional[float] = None,
+            longitude: Optional[float] = None,
+            location: Optional[str] = None,
+            radius_km: Optional[float] = None,
+            k: int = 20
+    ) -> NearbyVendorsResponse:
+        """Vendors within ``radius_km`` of the origin, nearest first, or the ``k``
+        nearest when no radius is given."""
+        origin = self.resolve_origin(auth, latitude, longitude, location)
+
+        if radius_km is not None:
+            hits = self.vendors_within(origin.latitude, origin.longitude, radius_km, k)
+        else:
+            # widen the search until k vendors are inside it; anything closer would
+            # have been inside a smaller radius, so the k found are the k nearest
+            radius_km = settings.nearby_initial_radius_km
+            while True:
+                hits = self.vendors_within(origin.latitude, origin.longitude, radius_km, k)
+                if len(hits) >= k or radius_km >= settings.nearby_max_radius_km:
+                    break
+                radius_km = min(radius_km * 4, settings.nearby_max_radius_km)
+
+        return NearbyVendorsResponse(
+            origin=origin,
+            radius_km=radius_km,
+            data=[
+                NearbyVendor(distance_km=round(distance, 3), vendor=self.vendorService.map_vendor_response(vendor))
+                for vendor, distance in hits
+            ]
+        )
+
+    def resolve_origin(
+            self,
+            auth: auth_dependency,
+            latitude: Optional[float],
+            longitude: Optional[float],
+            location: Optional[str]
+    ) -> NearbyOrigin:
+        if (latitude is None) != (longitude is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='latitude and longitude must be given together'
+            )
+        if latitude is not None:
+            return NearbyOrigin(latitude=latitude, longitude=longitude)
+
+        if location:
+            result = geocode(location)
+            if result is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail='location not found'
+                )
+            lat, lon, place = result
+            return NearbyOrigin(latitude=lat, longitude=lon, place=place)
+
+        buyer_location = self.db.query(BuyerLocation).join(
+            Buyer, Buyer.id == BuyerLocation.buyer_id
+        ).filter(Buyer.user_id == auth.get('id')).first()
+        if not buyer_location:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='buyer location unknown; pass latitude and longitude or a location'
+            )
+        return NearbyOrigin(
+            latitude=buyer_location.latitude,
+            longitude=buyer_location.longitude,
+            place=buyer_location.place
+        )
+
+    def vendors_within(self, latitude: float, longitude: float, radius_km: float, limit: int) -> List[Tuple[Vendor, float]]:
+        """Up to ``limit`` active vendors within ``radius_km``, nearest first.
+
+        Geohash cells one size finer than the radius cover it, and each cell yields
+        at most ``limit`` vendors in ``(geohash, vendor_id)`` index order, so a query
+        never reads more than ``limit`` rows per cell however many vendors share a
+        point (everyone geocoded to a city centre does). A cell that hit the limit
+        may hide nearer vendors, so its sub-cells that could still beat the current
+        ``limit``-th distance are searched next, down to the stored geohash
+        precision. Haversine distance gives the order and the exact cut-off.
+        """
+        precision = min(geohash.precision_for_radius(radius_km, latitude) + 1, GEOHASH_PRECISION)
+        cells = geohash.cells_within(latitude, longitude, radius_km, precision)
+        distances: Dict[str, float] = {}
+        bound, full = radius_km, False
+
+        def may_hold_nearer(cell: str) -> bool:
+            distance = geohash.distance_to_cell_km(latitude, longitude, *geohash.decode_cell(cell))
+            # once ``limit`` vendors are found, only a strictly nearer one changes the result
+            return distance < bound if full else distance <= bound
+
+        while cells:
+            saturated = []
+            for start in range(0, len(cells), CELLS_PER_QUERY):
+                chunk = cells[start:start + CELLS_PER_QUERY]
+                params = {'limit': limit}
+                for index, cell in enumerate(chunk):
+                    params[f'low_{index}'], params[f'high_{index}'] = geohash.prefix_bounds(cell)
+                found = dict.fromkeys(chunk, 0)
+                rows = self.db.execute(_candidates_statement(len(chunk)), params)
+                for vendor_id, vendor_hash, vendor_lat, vendor_lon in rows:
+                    # every cell searched in one round has the same precision
+                    found[vendor_hash[:len(chunk[0])]] += 1
+                    distance = geohash.haversine_km(latitude, longitude, vendor_lat, vendor_lon)
+                    if distance <= radius_km:
+                        distances[vendor_id] = distance
+                saturated.extend(
+                    cell for cell, count in found.items() if count >= limit and len(cell) < GEOHASH_PRECISION
+                )
+
+            ranked = sorted(distances.values())
+            full = len(ranked) >= limit
+            bound = ranked[limit - 1] if full else radius_km
+            cells = [child for cell in saturated for child in geohash.children(cell) if may_hold_nearer(child)]
+
+        nearest = sorted((distance, vendor_id) for vendor_id, distance in distances.items())[:limit]
+        if not nearest:
+            return []
+        vendors = {vendor.id: vendor for vendor in self.db.query(Vendor).filter(
+            Vendor.id.in_([vendor_id for _, vendor_id in nearest])
+        )}
+        return [(vendors[vendor_id], distance) for distance, vendor_id in nearest if vendor_id in vendors]
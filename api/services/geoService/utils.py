@@ -0,0 +1,19 @@
+from typing import Optional, Dict, List, Any
+from pydantic import BaseModel
+
+
+class NearbyOrigin(BaseModel):
+    latitude: float
+    longitude: float
+    place: Optional[str] = None
+
+
+class NearbyVendor(BaseModel):
+    distance_km: float
+    vendor: Dict[str, Any]
+
+
+class NearbyVendorsResponse(BaseModel):
+    origin: NearbyOrigin
+    radius_km: float
+    data: List[NearbyVendor]
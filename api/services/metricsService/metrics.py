@@ -0,0 +1,303 @@
+import bisect
+import logging
+import time
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from services.metricsService.utils import route_template
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def header(self) -> List[str]:
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.metric_type}',
+        ]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    metric_type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+            for labels, value in items
+        ]
+
+
+class Gauge(_Metric):
+    metric_type = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+            for labels, value in items
+        ]
+
+
+class Histogram(_Metric):
+    metric_type = 'histogram'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[labels] = entry
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(counts), total[0]) for labels, (counts, total) in self._values.items()]
+
+        lines = self.header()
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    self.labelnames + ('le',), labels + (_format_value(bound),))
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {_format_value(total)}')
+            lines.append(f'{self.name}_count{label_text} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Register a callback that refreshes gauges right before each scrape."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.error('metrics collector %s failed: %s', collector, str(e))
+
+        with self._lock:
+            metrics: Iterable[_Metric] = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+REQUESTS_TOTAL = registry.counter(
+    'http_requests_total', 'HTTP requests by route and status code', ('method', 'route', 'status'))
+REQUEST_LATENCY = registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ('method', 'route'))
+REQUEST_SIZE = registry.histogram(
+    'http_request_size_bytes', 'HTTP request body size', ('method', 'route'), SIZE_BUCKETS)
+RESPONSE_SIZE = registry.histogram(
+    'http_response_size_bytes', 'HTTP response body size', ('method', 'route'), SIZE_BUCKETS)
+REQUESTS_IN_FLIGHT = registry.gauge(
+    'http_requests_in_flight', 'HTTP requests currently being served', ('method', 'route'))
+
+
+class MetricsMiddleware:
+    """Records latency, status, payload sizes and in-flight requests per route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        route = route_template(scope)
+        start = time.perf_counter()
+        request_size = 0
+        response_size = 0
+        status_code = 500
+
+        async def receive_wrapper() -> Message:
+            nonlocal request_size
+            message = await receive()
+            if message['type'] == 'http.request':
+                request_size += len(message.get('body', b''))
+            return message
+
+        async def send_wrapper(message: Message):
+            nonlocal response_size, status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            elif message['type'] == 'http.response.body':
+                response_size += len(message.get('body', b''))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(method, route)
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec(method, route)
+            REQUEST_LATENCY.observe(time.perf_counter() - start, method, route)
+            REQUESTS_TOTAL.inc(method, route, str(status_code))
+            REQUEST_SIZE.observe(request_size, method, route)
+            RESPONSE_SIZE.observe(response_size, method, route)
+
+
+DB_POOL = registry.gauge(
+    'db_pool_connections', 'Database connection pool usage', ('state',))
+THREADPOOL_TOKENS = registry.gauge(
+    'threadpool_tokens', 'Worker threadpool capacity used by sync routes', ('state',))
+SCHEDULER_RUNNING = registry.gauge(
+    'scheduler_running', 'Whether the background scheduler is running')
+SCHEDULER_JOBS = registry.gauge(
+    'scheduler_jobs', 'Jobs registered with the background scheduler')
+SCHEDULER_NEXT_RUN = registry.gauge(
+    'scheduler_job_next_run_seconds', 'Seconds until the next run of a scheduled job', ('job',))
+
+
+def install_runtime_collectors(app, engine):
+    """Expose DB pool, threadpool and scheduler state as gauges, sampled at scrape time."""
+
+    def collect_db_pool():
+        pool = engine.pool
+        for state in ('size', 'checkedin', 'checkedout', 'overflow'):
+            reader = getattr(pool, state, None)
+            if callable(reader):
+                DB_POOL.set(reader(), state)
+
+    def collect_threadpool():
+        from anyio.to_thread import current_default_thread_limiter
+
+        limiter = current_default_thread_limiter()
+        THREADPOOL_TOKENS.set(limiter.total_tokens, 'total')
+        THREADPOOL_TOKENS.set(limiter.borrowed_tokens, 'borrowed')
+
+    def collect_scheduler():
+        token_scheduler = getattr(app.state, 'scheduler', None)
+        if token_scheduler is None:
+            SCHEDULER_RUNNING.set(0)
+            return
+
+        scheduler = token_scheduler.scheduler
+        jobs = scheduler.get_jobs()
+        SCHEDULER_RUNNING.set(1 if scheduler.running else 0)
+        SCHEDULER_JOBS.set(len(jobs))
+        SCHEDULER_NEXT_RUN.clear()
+        for job in jobs:
+            if job.next_run_time is not None:
+                SCHEDULER_NEXT_RUN.set(
+                    job.next_run_time.timestamp() - time.time(), job.id)
+
+    registry.add_collector(collect_db_pool)
+    registry.add_collector(collect_threadpool)
+    registry.add_collector(collect_scheduler)
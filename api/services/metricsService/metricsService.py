@@ -0,0 +1,55 @@
+import hmac
+import ipaddress
+import logging
+from typing import Optional
+
+from config.config import settings
+from services.metricsService.metrics import registry
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_NETWORKS = tuple(
+    ipaddress.ip_network(network.strip(), strict=False)
+    for network in settings.metrics_allowed_networks.split(',') if network.strip()
+)
+
+
+def _client_allowed(request: Request) -> bool:
+    if request.client is None:
+        return False
+    try:
+        address = ipaddress.ip_address(request.client.host)
+    except ValueError:
+        return False
+    return any(address in network for network in ALLOWED_NETWORKS)
+
+
+class MetricsService:
+    def _require_access(self, request: Request, authorization: Optional[str]):
+        """Scrapers either connect from ``metrics_allowed_networks`` or send
+        ``Authorization: Bearer <metrics_token>``."""
+        if settings.metrics_token and authorization:
+            scheme, _, token = authorization.partition(' ')
+            if scheme.lower() == 'bearer' and hmac.compare_digest(token.strip(), settings.metrics_token):
+                return
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='invalid metrics token',
+                headers={'WWW-Authenticate': 'Bearer'}
+            )
+        if not _client_allowed(request):
+            logger.warning('refused metrics scrape from %s', request.client.host if request.client else 'unknown')
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail='metrics are not available to this client'
+            )
+
+    def render(self, request: Request, authorization: Optional[str]) -> PlainTextResponse:
+        self._require_access(request, authorization)
+        return PlainTextResponse(
+            registry.render(),
+            media_type='text/plain; version=0.0.4; charset=utf-8'
+        )
@@ -0,0 +1,327 @@
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, defaultdict
+from threading import Lock
+from types import CodeType, FrameType
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.config import settings
+from services.metricsService.utils import matched_route
+
+from jose import jwt, JWTError
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+OTHER_STACKS = '<other>'
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def _collapse(frames: Iterable[FrameType]) -> str:
+    """Render frames (root first) in the folded format used by flamegraph.pl/speedscope."""
+    return ';'.join(_frame_label(frame) for frame in frames)
+
+
+def endpoint_code(route) -> Optional[CodeType]:
+    endpoint = getattr(route, 'endpoint', None)
+    if endpoint is None:
+        return None
+    return getattr(inspect.unwrap(endpoint), '__code__', None)
+
+
+class ProfileSession:
+    """Samples collected for one profiled request."""
+
+    def __init__(self, method: str, route: str, code: CodeType):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.route = route
+        self.code = code
+        self.samples: Counter = Counter()
+        self.started_at = time.time()
+        self.duration: Optional[float] = None
+
+    def collapsed(self) -> str:
+        return '\n'.join(f'{stack} {count}' for stack, count in self.samples.most_common())
+
+    def summary(self) -> dict:
+        return {
+            'id': self.id,
+            'method': self.method,
+            'route': self.route,
+            'started_at': self.started_at,
+            'duration_ms': round(self.duration * 1000, 2) if self.duration is not None else None,
+            'samples': sum(self.samples.values()),
+        }
+
+
+class SamplingProfiler:
+    """Low-overhead wall-clock sampler built on ``sys._current_frames``.
+
+    A single daemon thread wakes every ``interval`` seconds while requests are being
+    profiled and records the stack of any thread currently executing the profiled
+    endpoint, trimmed to start at the endpoint frame. With continuous mode on it also
+    samples every in-flight endpoint at a much lower rate and aggregates hot stacks per
+    route. Concurrent requests to the same endpoint share samples; that trade-off
+    keeps request attribution free of any per-call hooks.
+    """
+
+    def __init__(
+            self,
+            interval: float,
+            continuous_interval: float,
+            max_profiles: int = 50,
+            max_concurrent: int = 8,
+            max_stacks_per_route: int = 2000
+    ):
+        self.interval = interval
+        self.continuous_interval = continuous_interval
+        self.max_profiles = max_profiles
+        self.max_concurrent = max_concurrent
+        self.max_stacks_per_route = max_stacks_per_route
+        self.continuous = False
+
+        self._lock = Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._sessions: Dict[str, ProfileSession] = {}
+        self._in_flight: Dict[CodeType, List] = {}
+        self._profiles: 'OrderedDict[str, ProfileSession]' = OrderedDict()
+        self._hot_stacks: Dict[str, Counter] = defaultdict(Counter)
+        self._toggle_until = 0.0
+        self._toggle_route: Optional[str] = None
+
+    # request bookkeeping
+
+    def enable_for(self, seconds: float, route: Optional[str] = None):
+        """Profile every request (optionally only for one route) for a limited time."""
+        with self._lock:
+            self._toggle_until = time.monotonic() + seconds
+            self._toggle_route = route
+
+    def toggle_status(self) -> dict:
+        remaining = max(0.0, self._toggle_until - time.monotonic())
+        return {
+            'enabled': remaining > 0,
+            'remaining_seconds': round(remaining, 1),
+            'route': self._toggle_route if remaining > 0 else None,
+            'continuous': self.continuous,
+        }
+
+    def toggle_active(self, route: str) -> bool:
+        if time.monotonic() >= self._toggle_until:
+            return False
+        return self._toggle_route is None or self._toggle_route == route
+
+    def set_continuous(self, enabled: bool):
+        with self._lock:
+            self.continuous = enabled
+        if enabled:
+            self._ensure_thread()
+
+    def start_session(self, method: str, route: str, code: CodeType) -> Optional[ProfileSession]:
+        with self._lock:
+            if len(self._sessions) >= self.max_concurrent:
+                return None
+            session = ProfileSession(method, route, code)
+            self._sessions[session.id] = session
+        self._ensure_thread()
+        return session
+
+    def finish_session(self, session: ProfileSession):
+        session.duration = time.time() - session.started_at
+        with self._lock:
+            self._sessions.pop(session.id, None)
+            self._profiles[session.id] = session
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def enter(self, code: CodeType, route: str) -> bool:
+        """Register an in-flight request for continuous sampling; returns whether it was,
+        and only a registered request may call ``exit``. Otherwise switching continuous
+        mode on mid-request would let older requests release newer ones' entries."""
+        if not self.continuous:
+            return False
+        with self._lock:
+            entry = self._in_flight.setdefault(code, [route, 0])
+            entry[1] += 1
+        return True
+
+    def exit(self, code: CodeType):
+        with self._lock:
+            entry = self._in_flight.get(code)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._in_flight[code]
+
+    # results
+
+    def get_profile(self, profile_id: str) -> Optional[ProfileSession]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list_profiles(self) -> List[dict]:
+        with self._lock:
+            return [session.summary() for session in reversed(self._profiles.values())]
+
+    def hot_stacks(self, route: Optional[str] = None, limit: int = 100) -> str:
+        with self._lock:
+            if route is not None:
+                totals = Counter(self._hot_stacks.get(route, {}))
+            else:
+                totals = Counter()
+                for route_name, stacks in self._hot_stacks.items():
+                    for stack, count in stacks.items():
+                        totals[f'{route_name};{stack}'] += count
+        return '\n'.join(f'{stack} {count}' for stack, count in totals.most_common(limit))
+
+    def reset_hot_stacks(self):
+        with self._lock:
+            self._hot_stacks.clear()
+
+    # sampling
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        next_continuous = 0.0
+
+        while True:
+            with self._lock:
+                sessions = list(self._sessions.values())
+                continuous = self.continuous
+                in_flight = {code: entry[0] for code, entry in self._in_flight.items()}
+                if not sessions and not continuous:
+                    self._thread = None
+                    return
+
+            now = time.monotonic()
+            sample_continuous = continuous and now >= next_continuous
+            if sample_continuous:
+                next_continuous = now + self.continuous_interval
+
+            targets = {session.code for session in sessions}
+            if sample_continuous:
+                targets.update(in_flight)
+
+            if targets:
+                stacks = self._sample(targets, own_ident)
+                with self._lock:
+                    for session in sessions:
+                        for code, stack in stacks:
+                            if code is session.code:
+                                session.samples[stack] += 1
+                    if sample_continuous:
+                        for code, stack in stacks:
+                            route = in_flight.get(code)
+                            if route is not None:
+                                self._record_hot_stack(route, stack)
+
+            time.sleep(self.interval if sessions else self.continuous_interval)
+
+    def _sample(self, targets, own_ident: int) -> List[Tuple[CodeType, str]]:
+        stacks = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_ident:
+                continue
+            frames = []
+            owner = None
+            while frame is not None:
+                frames.append(frame)
+                if frame.f_code in targets:
+                    owner = frame.f_code
+                    break
+                frame = frame.f_back
+            if owner is not None:
+                stacks.append((owner, _collapse(reversed(frames))))
+        return stacks
+
+    def _record_hot_stack(self, route: str, stack: str):
+        stacks = self._hot_stacks[route]
+        if stack not in stacks and len(stacks) >= self.max_stacks_per_route:
+            stack = OTHER_STACKS
+        stacks[stack] += 1
+
+
+profiler = SamplingProfiler(
+    interval=settings.profiler_interval_ms / 1000,
+    continuous_interval=settings.profiler_continuous_interval_ms / 1000,
+    max_profiles=settings.profiler_max_profiles,
+    max_concurrent=settings.profiler_max_concurrent,
+)
+
+
+def _is_admin_request(headers: Headers) -> bool:
+    authorization = headers.get('authorization', '')
+    scheme, _, token = authorization.partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return False
+    try:
+        payload = jwt.decode(
+            token, settings.auth_secret_key, algorithms=[settings.auth_algorithm])
+    except JWTError:
+        return False
+    return payload.get('role') == 'admin'
+
+
+class ProfilerMiddleware:
+    """Profiles requests on demand.
+
+    A request is profiled when an admin sends ``X-Profile: 1`` or while a time-boxed
+    toggle set through ``/admin/profiler`` is active. The profile id is returned in
+    the ``X-Profile-Id`` header and the folded stacks can be fetched afterwards.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        route = matched_route(scope)
+        code = endpoint_code(route)
+        if code is None:
+            await self.app(scope, receive, send)
+            return
+
+        route_path = route.path
+        session = None
+        headers = Headers(scope=scope)
+        if (
+            headers.get('x-profile', '').lower() in ('1', 'true') and _is_admin_request(headers)
+        ) or profiler.toggle_active(route_path):
+            session = profiler.start_session(scope['method'], route_path, code)
+
+        async def send_wrapper(message: Message):
+            if message['type'] == 'http.response.start' and session is not None:
+                MutableHeaders(scope=message).append('X-Profile-Id', session.id)
+            await send(message)
+
+        registered = profiler.enter(code, route_path)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if registered:
+                profiler.exit(code)
+            if session is not None:
+                profiler.finish_session(session)
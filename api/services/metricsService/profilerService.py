@@ -0,0 +1,63 @@
+import logging
+from typing import Optional
+
+from deps import auth_dependency
+from services.metricsService.profiler import profiler
+
+from fastapi import HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilerService:
+    def __init__(self):
+        self.profiler = profiler
+
+    def _require_admin(self, auth: auth_dependency):
+        if auth.get('role') != 'admin':
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail='user not an admin'
+            )
+
+    def enable(self, auth: auth_dependency, seconds: int, route: Optional[str] = None) -> dict:
+        self._require_admin(auth)
+        self.profiler.enable_for(seconds, route)
+        logger.info(
+            'profiling enabled for %s seconds on %s by %s',
+            seconds,
+            route or 'all routes',
+            auth.get('id')
+        )
+        return self.profiler.toggle_status()
+
+    def set_continuous(self, auth: auth_dependency, enabled: bool) -> dict:
+        self._require_admin(auth)
+        self.profiler.set_continuous(enabled)
+        logger.info('continuous profiling set to %s by %s', enabled, auth.get('id'))
+        return self.profiler.toggle_status()
+
+    def status(self, auth: auth_dependency) -> dict:
+        self._require_admin(auth)
+        return {
+            **self.profiler.toggle_status(),
+            'profiles': self.profiler.list_profiles(),
+        }
+
+    def fetch_profile(self, auth: auth_dependency, profile_id: str) -> PlainTextResponse:
+        self._require_admin(auth)
+        session = self.profiler.get_profile(profile_id)
+        if not session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='profile not found'
+            )
+        return PlainTextResponse(
+            session.collapsed(),
+            headers={"Content-Disposition": f"attachment; filename=profile_{profile_id}.folded"}
+        )
+
+    def hot_stacks(self, auth: auth_dependency, route: Optional[str] = None, limit: int = 100) -> PlainTextResponse:
+        self._require_admin(auth)
+        return PlainTextResponse(self.profiler.hot_stacks(route, limit))
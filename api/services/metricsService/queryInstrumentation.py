@@ -0,0 +1,151 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from config.config import settings
+from services.metricsService.utils import route_template
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))+\s*\)')
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse a SQL statement to a stable shape for grouping.
+
+    Literals become ``?`` and expanded ``IN (?, ?, ...)`` lists become ``(?...)`` so
+    the same query issued with different values counts as one statement.
+    """
+    normalized = _WHITESPACE.sub(' ', statement).strip()
+    normalized = _STRING_LITERAL.sub('?', normalized)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    return _PLACEHOLDER_LIST.sub('(?...)', normalized)
+
+
+@dataclass
+class RequestQueryStats:
+    count: int = 0
+    duration: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    slow_queries: List[Tuple[str, float]] = field(default_factory=list)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    'request_query_stats', default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+    slow = elapsed * 1000 >= settings.db_slow_query_ms
+    stats = _current_stats.get()
+
+    if stats is None:
+        if slow:
+            logger.warning(
+                'slow query outside request (%.1f ms): %s',
+                elapsed * 1000,
+                normalize_sql(statement)
+            )
+        return
+
+    normalized = normalize_sql(statement)
+    stats.count += 1
+    stats.duration += elapsed
+    stats.statements[normalized] += 1
+    if slow:
+        stats.slow_queries.append((normalized, elapsed))
+
+
+def install_query_instrumentation(engine: Engine):
+    """Attach statement counting/timing hooks to an engine (idempotent)."""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+class QueryInstrumentationMiddleware:
+    """Collects per-request SQL statement counts and DB time.
+
+    At the end of each request slow statements are logged with their route, repeated
+    identical SELECTs are reported as possible N+1 patterns, and when
+    ``settings.db_debug_headers`` is on the totals are added as response headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message: Message):
+            if message['type'] == 'http.response.start' and settings.db_debug_headers:
+                headers = MutableHeaders(scope=message)
+                headers.append('X-DB-Query-Count', str(stats.count))
+                headers.append('X-DB-Query-Time-Ms', f'{stats.duration_ms:.2f}')
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            if stats.count:
+                self.report(scope, stats)
+
+    def report(self, scope: Scope, stats: RequestQueryStats):
+        route = route_template(scope)
+
+        for statement, elapsed in stats.slow_queries:
+            logger.warning(
+                'slow query on %s %s (%.1f ms): %s',
+                scope.get('method'),
+                route,
+                elapsed * 1000,
+                statement
+            )
+
+        for statement, repeats in stats.statements.items():
+            if repeats >= settings.db_n_plus_one_threshold and statement.upper().startswith('SELECT'):
+                logger.warning(
+                    'possible N+1 on %s %s: statement executed %s times: %s',
+                    scope.get('method'),
+                    route,
+                    repeats,
+                    statement
+                )
+
+        logger.debug(
+            '%s %s issued %s queries in %.2f ms',
+            scope.get('method'),
+            route,
+            stats.count,
+            stats.duration_ms
+        )
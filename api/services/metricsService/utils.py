@@ -0,0 +1,43 @@
+from typing import Optional
+
+from starlette.routing import BaseRoute, Match
+from starlette.types import Scope
+
+
+UNMATCHED_ROUTE = '<unmatched>'
+_MATCH_CACHE_KEY = 'metrics.matched_route'
+
+
+def matched_route(scope: Scope) -> Optional[BaseRoute]:
+    """Return the route object serving a request scope, if any.
+
+    The router stores the matched route on the scope once routing has run. Before
+    that (e.g. in a middleware, prior to calling the app) we match against the app
+    routes ourselves.
+    """
+    route = scope.get('route')
+    if route is not None:
+        return route
+    if _MATCH_CACHE_KEY in scope:
+        return scope[_MATCH_CACHE_KEY]
+
+    app = scope.get('app')
+    for candidate in getattr(app, 'routes', []):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            route = candidate
+            break
+
+    # several middlewares need the route before routing runs; match only once
+    scope[_MATCH_CACHE_KEY] = route
+    return route
+
+
+def route_template(scope: Scope) -> str:
+    """Return the route path template (e.g. /vendor/fetch_vendors) for a request scope.
+
+    Unmatched paths share a single bucket so arbitrary URLs cannot blow up metric
+    cardinality.
+    """
+    route = matched_route(scope)
+    return getattr(route, 'path', UNMATCHED_ROUTE)
@@ -0,0 +1,275 @@
+"""Admin global search over users, vendors and buyers.
+
+Each entity is mirrored into ``search_documents`` from a session ``after_flush`` hook,
+inside the same transaction as the write. The documents are indexed by trigram:
+
+- SQLite: an external-content FTS5 table using the ``trigram`` tokenizer, synced
+  from ``search_documents`` by triggers.
+- Postgres: a ``pg_trgm`` GIN index on ``body``.
+
+Searches first look for every term as a substring. When nothing matches, they
+fall back to trigram overlap (SQLite: any shared trigram, ranked by bm25;
+Postgres: ``word_similarity``) so that typos still find the record.
+"""
+import logging
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import column, delete, event, exists, func, inspect, literal, select, table
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Query, Session
+
+from services.authService.model.authModel import User
+from services.cacheService.tableVersions import record_table_writes, table_versions
+from services.searchService.model.searchDocumentModel import SearchDocument
+from services.searchService.utils import SearchEntityType
+from services.users.model.buyerModel import Buyer
+from services.users.model.vendorModel import Vendor
+
+logger = logging.getLogger(__name__)
+
+# entity type -> (model, title columns, subtitle column, body columns)
+INDEXED_ENTITIES: Dict[SearchEntityType, Tuple[type, Tuple[str, ...], str, Tuple[str, ...]]] = {
+    SearchEntityType.User: (
+        User, ('first_name', 'last_name'), 'email', ('first_name', 'last_name', 'email', 'phone_number')
+    ),
+    SearchEntityType.Vendor: (
+        Vendor, ('vendor_title',), 'vendor_email', ('vendor_title', 'vendor_email', 'vendor_contact')
+    ),
+    SearchEntityType.Buyer: (
+        Buyer, ('buyer_name',), 'buyer_email', ('buyer_name', 'buyer_email', 'buyer_contact')
+    ),
+}
+_ENTITY_BY_MODEL = {model: entity_type for entity_type, (model, *_) in INDEXED_ENTITIES.items()}
+
+SEARCH_DOCUMENTS = SearchDocument.__table__
+# a user's title joins two 100-character names, one more than the column holds
+TITLE_LENGTH = SEARCH_DOCUMENTS.c.title.type.length
+SEARCH_FTS = table('search_documents_fts', column('rowid'), column('rank'))
+
+_SQLITE_FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search_documents_fts USING fts5(
+    body,
+    content='search_documents',
+    content_rowid='id',
+    tokenize='trigram'
+)
+"""
+_SQLITE_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_fts_ai AFTER INSERT ON search_documents BEGIN
+        INSERT INTO search_documents_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_fts_ad AFTER DELETE ON search_documents BEGIN
+        INSERT INTO search_documents_fts(search_documents_fts, rowid, body) VALUES ('delete', old.id, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_fts_au AFTER UPDATE ON search_documents BEGIN
+        INSERT INTO search_documents_fts(search_documents_fts, rowid, body) VALUES ('delete', old.id, old.body);
+        INSERT INTO search_documents_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+)
+_PG_INDEX_DDL = (
+    'CREATE INDEX IF NOT EXISTS idx_search_documents_trgm ON search_documents USING GIN (body gin_trgm_ops)'
+)
+
+
+def _join_values(values: Iterable[Optional[str]]) -> str:
+    return ' '.join(value or '' for value in values)
+
+
+def build_document(entity_type: SearchEntityType, obj) -> dict:
+    _, title_columns, subtitle_column, body_columns = INDEXED_ENTITIES[entity_type]
+    return {
+        'entity_type': entity_type.value,
+        'entity_id': obj.id,
+        'title': _join_values(getattr(obj, name) for name in title_columns)[:TITLE_LENGTH],
+        'subtitle': getattr(obj, subtitle_column),
+        'body': _join_values(getattr(obj, name) for name in body_columns).lower(),
+    }
+
+
+def _sql_join(model, columns: Tuple[str, ...]):
+    """SQL twin of ``_join_values`` so rebuilt documents match incremental ones."""
+    expression = func.coalesce(getattr(model, columns[0]), '')
+    for name in columns[1:]:
+        expression = expression.concat(' ').concat(func.coalesce(getattr(model, name), ''))
+    return expression
+
+
+def _indexed_fields_changed(obj, body_columns: Tuple[str, ...], subtitle_column: str) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in (*body_columns, subtitle_column))
+
+
+def _after_flush(session: Session, flush_context):
+    upserts: Dict[SearchEntityType, List[dict]] = {}
+    removals: Dict[SearchEntityType, List[str]] = {}
+
+    for obj in session.new:
+        entity_type = _ENTITY_BY_MODEL.get(type(obj))
+        if entity_type is not None:
+            upserts.setdefault(entity_type, []).append(build_document(entity_type, obj))
+
+    for obj in session.dirty:
+        entity_type = _ENTITY_BY_MODEL.get(type(obj))
+        if entity_type is None:
+            continue
+        _, _, subtitle_column, body_columns = INDEXED_ENTITIES[entity_type]
+        if _indexed_fields_changed(obj, body_columns, subtitle_column):
+            upserts.setdefault(entity_type, []).append(build_document(entity_type, obj))
+
+    for obj in session.deleted:
+        entity_type = _ENTITY_BY_MODEL.get(type(obj))
+        if entity_type is not None:
+            removals.setdefault(entity_type, []).append(obj.id)
+
+    if not upserts and not removals:
+        return
+
+    conn = session.connection()
+    for entity_type in set(upserts) | set(removals):
+        documents = upserts.get(entity_type, [])
+        stale_ids = removals.get(entity_type, []) + [document['entity_id'] for document in documents]
+        conn.execute(delete(SEARCH_DOCUMENTS).where(
+            SEARCH_DOCUMENTS.c.entity_type == entity_type.value,
+            SEARCH_DOCUMENTS.c.entity_id.in_(stale_ids)
+        ))
+        if documents:
+            conn.execute(SEARCH_DOCUMENTS.insert(), documents)
+    record_table_writes(session, {SEARCH_DOCUMENTS.name})
+
+
+def track_search_documents(session_factory):
+    """Keep ``search_documents`` in step with ORM writes made through ``session_factory``.
+
+    Core bulk inserts into users, vendors or buyers bypass this and must call
+    ``index_inserted_rows`` (or ``rebuild_search_documents``) afterwards.
+    """
+    if not event.contains(session_factory, 'after_flush', _after_flush):
+        event.listen(session_factory, 'after_flush', _after_flush)
+
+
+def index_inserted_rows(conn: Connection, model, rows: List[dict]):
+    """Add search documents for ``model`` rows inserted through Core on ``conn``,
+    which bypass the flush hook. The rows must be new: nothing is replaced."""
+    entity_type = _ENTITY_BY_MODEL[model]
+    documents = [build_document(entity_type, SimpleNamespace(**row)) for row in rows]
+    if documents:
+        conn.execute(SEARCH_DOCUMENTS.insert(), documents)
+
+
+def _rebuild(conn: Connection):
+    conn.execute(delete(SEARCH_DOCUMENTS))
+    for entity_type, (model, title_columns, subtitle_column, body_columns) in INDEXED_ENTITIES.items():
+        conn.execute(SEARCH_DOCUMENTS.insert().from_select(
+            ['entity_type', 'entity_id', 'title', 'subtitle', 'body'],
+            select(
+                literal(entity_type.value),
+                model.id,
+                func.substr(_sql_join(model, title_columns), 1, TITLE_LENGTH),
+                getattr(model, subtitle_column),
+                func.lower(_sql_join(model, body_columns)),
+            )
+        ))
+
+
+def rebuild_search_documents(engine: Engine):
+    """Regenerate every search document from users, vendors and buyers."""
+    with engine.begin() as conn:
+        _rebuild(conn)
+    table_versions.bump(SEARCH_DOCUMENTS.name)
+    logger.info('rebuilt search documents')
+
+
+def ensure_global_search_index(engine: Engine):
+    """Create the trigram index if missing and backfill documents; call after ``create_all``."""
+    with engine.begin() as conn:
+        if engine.dialect.name == 'sqlite':
+            created = not inspect(conn).has_table('search_documents_fts')
+            conn.exec_driver_sql(_SQLITE_FTS_DDL)
+            for trigger in _SQLITE_TRIGGERS:
+                conn.exec_driver_sql(trigger)
+            if created:
+                conn.exec_driver_sql("INSERT INTO search_documents_fts(search_documents_fts) VALUES ('rebuild')")
+        elif engine.dialect.name == 'postgresql':
+            try:
+                with conn.begin_nested():
+                    conn.exec_driver_sql('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+                    conn.exec_driver_sql(_PG_INDEX_DDL)
+            except SQLAlchemyError:
+                logger.warning('pg_trgm unavailable, admin search will scan search_documents', exc_info=True)
+
+        documents_missing = not conn.execute(select(exists().select_from(SEARCH_DOCUMENTS))).scalar()
+        sources_present = any(
+            conn.execute(select(exists().select_from(model.__table__))).scalar()
+            for model, *_ in INDEXED_ENTITIES.values()
+        )
+        if documents_missing and sources_present:
+            _rebuild(conn)
+            logger.info('backfilled search documents')
+
+
+def search_terms(q: str) -> List[str]:
+    return [term for term in q.lower().split() if term]
+
+
+def _trigrams(terms: List[str]) -> List[str]:
+    grams = []
+    for term in terms:
+        for start in range(len(term) - 2):
+            gram = term[start:start + 3]
+            if gram not in grams:
+                grams.append(gram)
+    return grams
+
+
+def _fts_string(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+def apply_substring_search(query: Query, terms: List[str], dialect: str) -> Tuple[Query, object]:
+    """Every term must appear in the document as a substring; returns (query, score)."""
+    body = SearchDocument.body
+    if dialect == 'sqlite':
+        indexed = [term for term in terms if len(term) >= 3]
+        for term in terms:
+            if len(term) < 3:
+                # the trigram tokenizer cannot match fewer than three characters
+                query = query.filter(body.contains(term, autoescape=True))
+        if indexed:
+            query = query.join(SEARCH_FTS, SEARCH_FTS.c.rowid == SearchDocument.id).filter(
+                column('search_documents_fts').op('MATCH')(' AND '.join(_fts_string(term) for term in indexed))
+            )
+            return query, -SEARCH_FTS.c.rank
+        return query, None
+
+    for term in terms:
+        query = query.filter(body.contains(term, autoescape=True))
+    if dialect == 'postgresql':
+        return query, func.word_similarity(' '.join(terms), body)
+    return query, None
+
+
+def apply_fuzzy_search(query: Query, terms: List[str], dialect: str) -> Tuple[Optional[Query], object]:
+    """Match on shared trigrams for typo tolerance; None where the database can't."""
+    if dialect == 'sqlite':
+        grams = _trigrams(terms)
+        if not grams:
+            return None, None
+        query = query.join(SEARCH_FTS, SEARCH_FTS.c.rowid == SearchDocument.id).filter(
+            column('search_documents_fts').op('MATCH')(' OR '.join(_fts_string(gram) for gram in grams))
+        )
+        return query, -SEARCH_FTS.c.rank
+
+    if dialect == 'postgresql':
+        text_query = ' '.join(terms)
+        query = query.filter(literal(text_query).op('<%')(SearchDocument.body))
+        return query, func.word_similarity(text_query, SearchDocument.body)
+
+    return None, None
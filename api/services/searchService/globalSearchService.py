@@ -0,0 +1,96 @@
+import logging
+from typing import List, Optional
+
+from deps import db_dependency, auth_dependency
+from services.searchService.globalSearch import (
+    apply_fuzzy_search,
+    apply_substring_search,
+    search_terms,
+)
+from services.searchService.model.searchDocumentModel import SearchDocument
+from services.searchService.utils import GlobalSearchResponse, SearchEntityType, SearchHit
+from services.users.pagination import offset_page, resolve_total
+from services.users.utils import TotalMode
+
+from fastapi import HTTPException, status
+from sqlalchemy import literal
+
+
+logger = logging.getLogger(__name__)
+
+
+class GlobalSearchService:
+    def __init__(self, db_session: db_dependency):
+        self.db = db_session
+
+    def search(
+            self,
+            auth: auth_dependency,
+            q: str,
+            types: Optional[List[SearchEntityType]] = None,
+            skip: int = 0,
+            take: int = 20,
+            total_mode: TotalMode = 'exact'
+    ) -> GlobalSearchResponse:
+        if auth.get('role') != 'admin':
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail='user not an admin'
+            )
+
+        terms = search_terms(q)
+        if not terms:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='search query is empty'
+            )
+
+        dialect = self.db.get_bind().dialect.name
+        base = self.db.query(SearchDocument)
+        if types:
+            base = base.filter(SearchDocument.entity_type.in_([t.value for t in types]))
+
+        fuzzy = False
+        query, score = apply_substring_search(base, terms, dialect)
+        if query.limit(1).first() is None:
+            fuzzy_query, fuzzy_score = apply_fuzzy_search(base, terms, dialect)
+            if fuzzy_query is not None:
+                query, score, fuzzy = fuzzy_query, fuzzy_score, True
+
+        if score is None:
+            score = literal(None)
+        ranked = query.with_entities(
+            SearchDocument.entity_type,
+            SearchDocument.entity_id,
+            SearchDocument.title,
+            SearchDocument.subtitle,
+            score.label('score'),
+        ).order_by(score.desc(), SearchDocument.id)
+
+        total, total_is_estimate = resolve_total(
+            query,
+            SearchDocument.__tablename__,
+            (tuple(terms), tuple(sorted(t.value for t in types or ())), fuzzy),
+            total_mode
+        )
+        rows, has_more = offset_page(ranked, skip, take)
+
+        logger.info('admin search by user %s returned %d hits', auth.get('id'), len(rows))
+        return GlobalSearchResponse(
+            data=[
+                SearchHit(
+                    type=row.entity_type,
+                    id=row.entity_id,
+                    title=row.title,
+                    subtitle=row.subtitle,
+                    score=row.score,
+                )
+                for row in rows
+            ],
+            total=total,
+            total_is_estimate=total_is_estimate,
+            page=skip // take + 1,
+            per_page=take,
+            has_more=has_more,
+            fuzzy=fuzzy
+        )
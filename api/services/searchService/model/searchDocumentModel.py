@@ -0,0 +1,46 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Index,
+)
+
+from config.database import Base
+
+
+class SearchDocument(Base):
+    """One row per user, vendor and buyer, feeding the admin global search index."""
+    __tablename__ = 'search_documents'
+    id = Column(
+        Integer,
+        primary_key=True,
+        autoincrement=True
+    )
+    entity_type = Column(
+        String(10),
+        nullable=False,
+        comment="user, vendor or buyer"
+    )
+    entity_id = Column(
+        String(36),
+        nullable=False
+    )
+    title = Column(
+        String(200),
+        nullable=False,
+        comment="display name"
+    )
+    subtitle = Column(
+        String(50),
+        nullable=True,
+        comment="email shown under the name"
+    )
+    body = Column(
+        String(400),
+        nullable=False,
+        comment="lowercased names, emails and phone numbers that searches match against"
+    )
+
+    __table_args__ = (
+        Index('idx_search_documents_entity', 'entity_type', 'entity_id', unique=True),
+    )
@@ -0,0 +1,27 @@
+from typing import List, Optional
+from pydantic import BaseModel
+from enum import Enum as PyEnum
+
+
+class SearchEntityType(str, PyEnum):
+    User = 'user'
+    Vendor = 'vendor'
+    Buyer = 'buyer'
+
+
+class SearchHit(BaseModel):
+    type: SearchEntityType
+    id: str
+    title: str
+    subtitle: Optional[str] = None
+    score: Optional[float] = None
+
+
+class GlobalSearchResponse(BaseModel):
+    data: List[SearchHit]
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    page: int
+    per_page: int
+    has_more: bool
+    fuzzy: bool = False
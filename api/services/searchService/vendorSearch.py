@@ -0,0 +1,155 @@
+import logging
+import re
+from typing import List
+
+from sqlalchemy import column, func, inspect, literal_column, or_, table
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query
+
+from services.users.model.vendorModel import Vendor
+from services.users.utils import VendorScale
+
+logger = logging.getLogger(__name__)
+
+SEARCH_COLUMNS = ('vendor_title', 'vendor_location', 'vendor_email', 'vendor_merchandise', 'vendor_scale')
+# vendor_scale is an enum, matched by member name in the ILIKE fallback
+_TEXT_COLUMNS = tuple(name for name in SEARCH_COLUMNS if name != 'vendor_scale')
+
+VENDORS_FTS = table('vendors_fts', column('rowid'), column('rank'))
+
+# SQLite: external-content FTS5 table kept in sync by triggers, so Core bulk inserts
+# are indexed as well as ORM writes.
+_SQLITE_FTS_DDL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS vendors_fts USING fts5(
+    {', '.join(SEARCH_COLUMNS)},
+    content='vendors',
+    content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+_SQLITE_NEW_VALUES = ', '.join(f'new.{name}' for name in SEARCH_COLUMNS)
+_SQLITE_OLD_VALUES = ', '.join(f'old.{name}' for name in SEARCH_COLUMNS)
+_SQLITE_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vendors_fts_ai AFTER INSERT ON vendors BEGIN
+        INSERT INTO vendors_fts(rowid, {', '.join(SEARCH_COLUMNS)}) VALUES (new.rowid, {_SQLITE_NEW_VALUES});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vendors_fts_ad AFTER DELETE ON vendors BEGIN
+        INSERT INTO vendors_fts(vendors_fts, rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.rowid, {_SQLITE_OLD_VALUES});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vendors_fts_au AFTER UPDATE ON vendors BEGIN
+        INSERT INTO vendors_fts(vendors_fts, rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.rowid, {_SQLITE_OLD_VALUES});
+        INSERT INTO vendors_fts(rowid, {', '.join(SEARCH_COLUMNS)}) VALUES (new.rowid, {_SQLITE_NEW_VALUES});
+    END
+    """,
+)
+
+
+
+def _pg_column_text(name: str) -> str:
+    if name == 'vendor_email':
+        return f"translate(coalesce(vendors.{name}, ''), '@.', '  ')"
+    if name == 'vendor_scale':
+        # enum-to-text casts are only STABLE, which index expressions do not accept
+        cases = ' '.join(f"WHEN '{scale.name}' THEN '{scale.name}'" for scale in VendorScale)
+        return f"CASE vendors.{name} {cases} ELSE '' END"
+    return f"coalesce(vendors.{name}, '')"
+
+
+# Postgres: a GIN expression index; the planner only uses it when queries repeat
+# this exact expression, so searches go through VENDOR_TSVECTOR below. The 'simple'
+# parser keeps an email as one token; splitting it on '@' and '.' lets its parts
+# match the way they do on SQLite.
+_PG_DOCUMENT = " || ' ' || ".join(_pg_column_text(name) for name in SEARCH_COLUMNS)
+_PG_TSVECTOR = f"to_tsvector('simple', {_PG_DOCUMENT})"
+# renamed whenever SEARCH_COLUMNS changes, since IF NOT EXISTS keeps an index built
+# on the old expression, which the planner would then never use
+_PG_INDEX_NAME = 'idx_vendors_search'
+_PG_STALE_INDEXES = ('idx_vendors_fts',)
+_PG_INDEX_DDL = f'CREATE INDEX IF NOT EXISTS {_PG_INDEX_NAME} ON vendors USING GIN (({_PG_TSVECTOR}))'
+
+VENDOR_TSVECTOR = literal_column(_PG_TSVECTOR)
+
+_TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def ensure_vendor_search_index(engine: Engine):
+    """Create the full-text index for vendors if missing; call after ``create_all``."""
+    with engine.begin() as conn:
+        if engine.dialect.name == 'sqlite':
+            created = not inspect(conn).has_table('vendors_fts')
+            if not created and _sqlite_fts_columns(conn) != list(SEARCH_COLUMNS):
+                # built with other columns: drop it with its triggers and index afresh
+                for trigger in ('vendors_fts_ai', 'vendors_fts_ad', 'vendors_fts_au'):
+                    conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS {trigger}')
+                conn.exec_driver_sql('DROP TABLE vendors_fts')
+                created = True
+            conn.exec_driver_sql(_SQLITE_FTS_DDL)
+            for trigger in _SQLITE_TRIGGERS:
+                conn.exec_driver_sql(trigger)
+            if created:
+                # index rows that existed before the triggers did
+                conn.exec_driver_sql("INSERT INTO vendors_fts(vendors_fts) VALUES ('rebuild')")
+                logger.info('built vendors_fts search index')
+        elif engine.dialect.name == 'postgresql':
+            for stale in _PG_STALE_INDEXES:
+                conn.exec_driver_sql(f'DROP INDEX IF EXISTS {stale}')
+            conn.exec_driver_sql(_PG_INDEX_DDL)
+
+
+def _sqlite_fts_columns(conn) -> List[str]:
+    return [row[1] for row in conn.exec_driver_sql('PRAGMA table_info(vendors_fts)')]
+
+
+def search_terms(search: str) -> List[str]:
+    return [term.lower() for term in _TERM_PATTERN.findall(search)]
+
+
+def _sqlite_match_expression(terms: List[str]) -> str:
+    # every term must match, each as a prefix so partial words still hit
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _pg_tsquery_expression(terms: List[str]) -> str:
+    return ' & '.join(f"'{term}':*" for term in terms)
+
+
+def _ilike_filter(query: Query, search: str) -> Query:
+    pattern = f'%{search}%'
+    clauses = [getattr(Vendor, name).ilike(pattern) for name in _TEXT_COLUMNS]
+    scales = [scale for scale in VendorScale if search.strip().lower() in scale.name.lower()]
+    if scales:
+        clauses.append(Vendor.vendor_scale.in_(scales))
+    return query.filter(or_(*clauses))
+
+
+def apply_vendor_search(query: Query, search: str, ranked: bool = True) -> Query:
+    """Restrict a ``Vendor`` query to full-text matches for ``search``.
+
+    With ``ranked`` the query is ordered by relevance (best first). Databases without
+    a full-text engine fall back to ``ILIKE`` over the same columns.
+    """
+    terms = search_terms(search)
+    if not terms:
+        return query
+
+    dialect = query.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        query = query.join(VENDORS_FTS, VENDORS_FTS.c.rowid == literal_column('vendors.rowid')).filter(
+            literal_column('vendors_fts').op('MATCH')(_sqlite_match_expression(terms))
+        )
+        # FTS5's rank column is bm25(), lower is more relevant
+        return query.order_by(VENDORS_FTS.c.rank, Vendor.id) if ranked else query
+
+    if dialect == 'postgresql':
+        tsquery = func.to_tsquery('simple', _pg_tsquery_expression(terms))
+        query = query.filter(VENDOR_TSVECTOR.op('@@')(tsquery))
+        return query.order_by(func.ts_rank(VENDOR_TSVECTOR, tsquery).desc(), Vendor.id) if ranked else query
+
+    return _ilike_filter(query, search)
@@ -0,0 +1,63 @@
+"""Fast JSON path for responses whose content is already shaped by a mapper.
+
+Returning a dict from a route with a ``response_model`` makes FastAPI validate it
+against the model again and then serialize it through the generic encoder. Mapper
+output is already in the response shape, so routes on hot paths return
+``FastJSONResponse`` instead:
+
+* pydantic envelopes (built with ``model_construct``, skipping validation) are
+  written by the model's compiled pydantic-core serializer;
+* plain dicts and lists go through ``orjson`` when it is installed, otherwise a
+  single compact ``json.JSONEncoder`` instance.
+
+``response_model`` stays on the route for the OpenAPI schema.
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (UUID, Decimal)):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode='json')
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f'{type(obj).__name__} is not JSON serializable')
+
+
+# one encoder instance: json.dumps with non-default arguments builds a new one per call
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), check_circular=False, default=_default)
+
+
+def dumps(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return _encoder.encode(content).encode()
+
+
+class FastJSONResponse(Response):
+    media_type = 'application/json'
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -0,0 +1,134 @@
+"""Parsing and batch validation for bulk imports.
+
+Uploads are read record by record from the spooled upload file, so only one
+batch of rows is held at a time. Each batch is validated by a single
+``TypeAdapter(List[Model])`` call, with errors keyed by row.
+"""
+import codecs
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+RowError = Dict[str, Optional[str]]
+
+IMPORT_ENCODING = 'utf-8-sig'
+IMPORT_FORMATS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+IMPORT_MEDIA_TYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+
+
+class ImportRowFailure:
+    """A record that could not be parsed; carried through the batch like a row."""
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    for suffix, format in IMPORT_FORMATS.items():
+        if filename and filename.lower().endswith(suffix):
+            return format
+    return IMPORT_MEDIA_TYPES.get((content_type or '').split(';')[0].strip().lower())
+
+
+def find_decode_error(file, chunk_size: int = 1024 * 1024) -> Optional[str]:
+    """Describe the first byte of a binary file that is not valid UTF-8, or return
+    None. Rewinds the file, so a clean upload can then go to ``read_records``
+    knowing no batch will be cut short by a bad byte."""
+    decoder = codecs.getincrementaldecoder(IMPORT_ENCODING)()
+    offset = 0
+    try:
+        while True:
+            chunk = file.read(chunk_size)
+            pending = len(decoder.getstate()[0])
+            try:
+                decoder.decode(chunk, final=not chunk)
+            except UnicodeDecodeError as e:
+                return f'{e.reason} at byte {offset - pending + e.start}'
+            if not chunk:
+                return None
+            offset += len(chunk)
+    finally:
+        file.seek(0)
+
+
+def read_records(file, format: str) -> Iterator[Tuple[int, Any]]:
+    """(row number, dict) for each record of a binary file; row 1 is the first data
+    row. Unparseable records yield an ``ImportRowFailure`` instead of a dict."""
+    lines = codecs.iterdecode(file, IMPORT_ENCODING)
+    if format == 'csv':
+        for number, record in enumerate(csv.DictReader(lines), start=1):
+            yield number, {key.strip(): value for key, value in record.items() if key is not None}
+        return
+
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, ImportRowFailure(f'invalid JSON: {e}')
+            continue
+        yield number, record if isinstance(record, dict) else ImportRowFailure('expected a JSON object')
+
+
+def batches(records: Iterable[Tuple[int, Any]], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _row_errors(error: ValidationError) -> Dict[int, List[RowError]]:
+    errors: Dict[int, List[RowError]] = {}
+    for detail in error.errors(include_url=False):
+        index, *field = detail['loc']
+        errors.setdefault(index, []).append({
+            'field': '.'.join(str(part) for part in field) or None,
+            'message': detail['msg'],
+        })
+    return errors
+
+
+def validate_batch(
+        adapter: TypeAdapter,
+        batch: List[Tuple[int, Any]]
+) -> Tuple[List[Tuple[int, Dict[str, Any], Any]], Dict[int, List[RowError]]]:
+    """Validate a batch with ``adapter`` (a ``TypeAdapter(List[Model])``).
+
+    Returns ([(row number, raw record, validated model)], {row number: errors}).
+    When some rows fail, the rest are validated again in a second call, because a
+    failed call returns no models.
+    """
+    errors: Dict[int, List[RowError]] = {}
+    candidates = []
+    for number, record in batch:
+        if isinstance(record, ImportRowFailure):
+            errors[number] = [{'field': None, 'message': record.message}]
+        else:
+            candidates.append((number, record))
+
+    try:
+        models = adapter.validate_python([record for _, record in candidates])
+    except ValidationError as e:
+        failed = _row_errors(e)
+        for index, row_errors in failed.items():
+            errors[candidates[index][0]] = row_errors
+        candidates = [candidate for index, candidate in enumerate(candidates) if index not in failed]
+        models = adapter.validate_python([record for _, record in candidates])
+
+    return [(number, record, model) for (number, record), model in zip(candidates, models)], errors
@@ -0,0 +1,78 @@
+"""Strong ETags for single vendor and buyer resources.
+
+A resource's tag is derived from its id and row version (``updated_at``, falling
+back to ``created_at`` for rows never updated), plus the ``fields=`` selection for
+sparse representations, so it changes whenever the stored row or the shape of the
+response does.
+"""
+import hashlib
+from datetime import datetime
+from typing import Optional, Sequence, Union
+
+from fastapi import HTTPException, Response, status
+
+Timestamp = Union[datetime, str, None]
+
+# content encodings the compression middleware appends to tags of encoded responses
+ENCODED_SUFFIXES = ('gzip', 'deflate', 'zstd')
+
+
+def _iso(value: Timestamp) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value or ''
+
+
+def entity_tag(entity_id: str, updated_at: Timestamp, created_at: Timestamp,
+               fields: Optional[Sequence[str]] = None) -> str:
+    version = _iso(updated_at) or _iso(created_at)
+    material = f'{entity_id}|{version}|{",".join(fields) if fields else "*"}'
+    return f'"{hashlib.sha1(material.encode()).hexdigest()[:20]}"'
+
+
+def response_tag(body: dict) -> str:
+    """ETag of a full (non-sparse) mapped vendor or buyer response."""
+    return entity_tag(body['id'], body.get('updated_at'), body.get('created_at'))
+
+
+def encoded_tag(etag: str, encoding: str) -> str:
+    """Tag of a content-encoded variant; a strong tag must differ from the identity one."""
+    weak, opaque = ('W/', etag[2:]) if etag.startswith('W/') else ('', etag)
+    return f'{weak}"{opaque.strip(chr(34))}-{encoding}"'
+
+
+def _identity_tag(etag: str) -> str:
+    for encoding in ENCODED_SUFFIXES:
+        if etag.endswith(f'-{encoding}"'):
+            return etag[:-len(encoding) - 2] + '"'
+    return etag
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """Whether an If-None-Match (``weak=True``) or If-Match (``weak=False``) header
+    lists ``etag``. ``*`` matches any existing resource."""
+    if not header:
+        return False
+    for candidate in (part.strip() for part in header.split(',')):
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if _identity_tag(candidate) == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+
+def check_if_match(if_match: Optional[str], etag: str):
+    """Raise 412 when an If-Match precondition was sent and no longer holds."""
+    if if_match is not None and not etag_matches(if_match, etag, weak=False):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail='resource has changed; fetch it again before updating'
+        )
@@ -0,0 +1,68 @@
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Query, load_only
+
+# response key -> (model columns it is built from, value getter)
+FieldSpec = Tuple[Tuple[str, ...], Callable[[Any], Any]]
+
+
+def _column(name: str) -> FieldSpec:
+    return (name,), attrgetter(name)
+
+
+VENDOR_FIELDS: Dict[str, FieldSpec] = {
+    'id': _column('id'),
+    'vendor_title': _column('vendor_title'),
+    'vendor_location': _column('vendor_location'),
+    'vendor_address': _column('vendor_address'),
+    'vendor_contact': _column('vendor_contact'),
+    'vendor_email': _column('vendor_email'),
+    'vendor_merchandise': _column('vendor_merchandise'),
+    'vendor_scale': (('vendor_scale',), lambda vendor: vendor.vendor_scale.value),
+    'vendor_rating': _column('vendor_rating'),
+    'created_at': (('created_at',), lambda vendor: vendor.created_at.isoformat()),
+    'updated_at': (('updated_at',), lambda vendor: vendor.updated_at.isoformat() if vendor.updated_at else None),
+    'vendor_metadata': _column('vendor_metadata'),
+    'is_active': _column('is_active'),
+    'deleted': _column('deleted'),
+    'userId': (('user_id',), lambda vendor: str(vendor.user_id)),
+}
+
+BUYER_FIELDS: Dict[str, FieldSpec] = {
+    name: _column(name) for name in (
+        'id', 'buyer_name', 'buyer_email', 'buyer_location', 'buyer_address', 'buyer_contact',
+        'created_at', 'updated_at', 'is_active', 'is_deleted', 'buyer_metadata', 'user_id',
+    )
+}
+
+
+def parse_fields(fields: Optional[str], specs: Dict[str, FieldSpec]) -> Optional[Tuple[str, ...]]:
+    """Parse a comma separated ``fields=`` value; None means every field.
+
+    ``id`` is always included so rows stay addressable. Raises ValueError naming
+    unknown fields.
+    """
+    if fields is None or not fields.strip():
+        return None
+    requested = ['id']
+    for name in (part.strip() for part in fields.split(',')):
+        if name and name not in requested:
+            requested.append(name)
+    unknown = [name for name in requested if name not in specs]
+    if unknown:
+        raise ValueError(f'unknown fields: {", ".join(unknown)}')
+    return tuple(requested)
+
+
+def load_fields(query: Query, model, specs: Dict[str, FieldSpec], fields: Optional[Tuple[str, ...]],
+                extra_columns: Iterable[str] = ()) -> Query:
+    """Load only the columns behind ``fields`` (plus ``extra_columns``) from ``model``."""
+    if fields is None:
+        return query
+    columns = {column for name in fields for column in specs[name][0]} | set(extra_columns)
+    return query.options(load_only(*(getattr(model, column) for column in sorted(columns))))
+
+
+def map_fields(obj, specs: Dict[str, FieldSpec], fields: Tuple[str, ...]) -> Dict[str, Any]:
+    return {name: specs[name][1](obj) for name in fields}
@@ -89,7 +89,9 @@ class Buyer(Base):
     #Indexes
     __table_args__ = (
         Index('idx_buyer_email_active', 'buyer_email', 'is_active'),
-        Index('idx_buyer_user', 'user_id')
+        Index('idx_buyer_user', 'user_id'),
+        Index('idx_buyer_created_id', 'created_at', 'id'),
+        Index('idx_buyer_active_deleted_created', 'is_active', 'is_deleted', 'created_at'),
     )
 
     # Table Constraints
@@ -9,6 +9,7 @@ from sqlalchemy import (
     ForeignKey,
     CheckConstraint,
     Boolean,
+    Index,
 )
 from sqlalchemy.orm import relationship
 
@@ -110,4 +111,7 @@ class Vendor(Base):
             "vendor_rating BETWEEN 1 and 5",
             name="ck_vendor_rating_range"
         ),
+        Index('idx_vendor_created_id', 'created_at', 'id'),
+        Index('idx_vendor_user', 'user_id'),
+        Index('idx_vendor_active_deleted_created', 'is_active', 'deleted', 'created_at'),
     )
@@ -0,0 +1,103 @@
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Any, Hashable, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Query
+
+from config.config import settings
+from services.cacheService.countCache import count_cache
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Opaque cursor pointing just after the row with this (created_at, id) key."""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError('invalid cursor') from exc
+
+
+def apply_keyset(query: Query, created_at_column, id_column, cursor: str, take: int) -> Query:
+    """Order by the stable (created_at, id) key and seek past the cursor.
+
+    An empty cursor starts from the first row. One extra row is fetched so callers
+    can tell whether another page exists without counting.
+    """
+    query = query.order_by(created_at_column, id_column)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_at_column, id_column) > tuple_(created_at, row_id))
+    return query.limit(take + 1)
+
+
+def keyset_page(rows: List[Any], take: int) -> Tuple[List[Any], bool, Optional[str]]:
+    """Split the ``take + 1`` rows from ``apply_keyset`` into (page, has_more, next_cursor)."""
+    has_more = len(rows) > take
+    page = rows[:take]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if has_more else None
+    return page, has_more, next_cursor
+
+
+def offset_page(query: Query, skip: int, take: int) -> Tuple[List[Any], bool]:
+    """Fetch one offset page plus a lookahead row; returns (page, has_more)."""
+    rows = query.offset(skip).limit(take + 1).all()
+    return rows[:take], len(rows) > take
+
+
+def filter_key(search: Optional[str], is_active: Optional[bool], deleted: Optional[bool],
+               created_range: Optional[Tuple[datetime, datetime]]) -> Hashable:
+    """Normalize listing filters so equivalent requests share a cached count."""
+    search = search.strip().lower() if search and search.strip() else None
+    created = tuple(dt.isoformat() for dt in created_range) if created_range else None
+    return (search, is_active, deleted, created)
+
+
+def planner_estimate(query: Query) -> Optional[int]:
+    """Row estimate from the Postgres planner, or None where unavailable."""
+    bind = query.session.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return None
+    compiled = query.statement.compile(dialect=bind.dialect)
+    try:
+        plan = query.session.connection().exec_driver_sql(
+            'EXPLAIN (FORMAT JSON) ' + str(compiled), compiled.params
+        ).scalar()
+    except SQLAlchemyError:
+        logger.warning('planner estimate failed, falling back to exact count', exc_info=True)
+        return None
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def resolve_total(query: Query, table: str, key: Hashable, total_mode: str) -> Tuple[Optional[int], bool]:
+    """Total for a filtered listing according to ``total_mode``; returns (total, is_estimate).
+
+    Exact counts are cached per table version and normalized filter, so repeated pages
+    of an unchanged table are counted once. ``estimate`` only trusts the planner above
+    ``count_estimate_threshold`` rows, where estimates are close enough to be useful
+    and exact counts get expensive.
+    """
+    if total_mode == 'none':
+        return None, False
+
+    if total_mode == 'estimate':
+        estimate = planner_estimate(query)
+        if estimate is not None and estimate >= settings.count_estimate_threshold:
+            return estimate, True
+
+    cache_key, total = count_cache.lookup(table, key)
+    if total is None:
+        total = query.order_by(None).count()
+        count_cache.store(cache_key, total)
+    return total, False
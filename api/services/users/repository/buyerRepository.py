@@ -1,16 +1,20 @@
 from fastapi import HTTPException, status
-from typing import Optional
+from typing import Optional, Sequence, Tuple
 from dataclasses import astuple
-from datetime import datetime, time
+from datetime import datetime
 
 from deps import db_dependency
 from services.users.model.buyerModel import Buyer
+from services.users.fieldsets import BUYER_FIELDS, load_fields
+from services.users.etags import entity_tag, check_if_match
+from services.users.pagination import apply_keyset, keyset_page, offset_page, filter_key, resolve_total
 from services.users.utils import (
     BuyerFilter,
     PaginatedBuyerResponse,
     CreateBuyerInput,
     UpdateFilter,
     ToggleFilter,
+    parse_created_at_range,
 )
 
 from sqlalchemy import and_, or_
@@ -27,11 +31,16 @@ class BuyerRepository:
         self.db.refresh(db_buyer)
         return db_buyer
 
-    def fetch_buyer(self, buyer_id: Optional[str] = None, user_id: Optional[str] = None) -> Buyer:
+    def fetch_buyer(
+        self,
+        buyer_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Buyer:
         if not buyer_id and not user_id:
             raise ValueError('buyer_id and user_id not provided')
 
-        query = self.db.query(Buyer)
+        query = load_fields(self.db.query(Buyer), Buyer, BUYER_FIELDS, fields)
         if buyer_id and user_id:
             query = query.filter(Buyer.id == buyer_id,
                                  Buyer.user_id == user_id)
@@ -44,14 +53,77 @@ class BuyerRepository:
 
         return query.first()
 
-    def fetch_buyers(self, buyer_filter: Optional[BuyerFilter]) -> PaginatedBuyerResponse:
-        search, is_active, is_deleted, created_at, skip, take = astuple(
+    def fetch_buyer_version(
+        self,
+        buyer_id: Optional[str] = None,
+        user_id: Optional[str] = None
+    ):
+        """(id, updated_at, created_at) of the buyer fetch_buyer would return, or None."""
+        if not buyer_id and not user_id:
+            raise ValueError('buyer_id and user_id not provided')
+
+        query = self.db.query(Buyer.id, Buyer.updated_at, Buyer.created_at)
+        if buyer_id:
+            query = query.filter(Buyer.id == buyer_id)
+        if user_id:
+            query = query.filter(Buyer.user_id == user_id)
+        return query.first()
+
+    def fetch_buyers(
+        self,
+        buyer_filter: Optional[BuyerFilter],
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> PaginatedBuyerResponse:
+        search, is_active, is_deleted, created_at, skip, take, cursor, total_mode, _ = astuple(
             buyer_filter)
 
+        query, created_range = self.buyer_query(buyer_filter)
+
+        total_count, total_is_estimate = resolve_total(
+            query,
+            Buyer.__tablename__,
+            filter_key(search, is_active, is_deleted, created_range),
+            total_mode
+        )
+
+        # keyset cursors are built from created_at, so load it even when not returned
+        query = load_fields(query, Buyer, BUYER_FIELDS, fields, ('created_at',) if cursor is not None else ())
+
+        if cursor is not None:
+            buyers, has_more, next_cursor = keyset_page(
+                apply_keyset(query, Buyer.created_at, Buyer.id, cursor, take).all(),
+                take
+            )
+            # rows are ORM objects here; the service maps them to dicts
+            return PaginatedBuyerResponse.model_construct(
+                data=buyers,
+                total=total_count,
+                total_is_estimate=total_is_estimate,
+                page=None,
+                per_page=take,
+                has_more=has_more,
+                next_cursor=next_cursor
+            )
+
+        buyers, has_more = offset_page(query, skip, take)
+
+        return PaginatedBuyerResponse.model_construct(
+            data=buyers,
+            total=total_count,
+            total_is_estimate=total_is_estimate,
+            page=skip // take + 1 if take > 0 else 1,
+            per_page=take,
+            has_more=has_more,
+            next_cursor=None
+        )
+
+    def buyer_query(self, buyer_filter: BuyerFilter):
+        """Buyers matching the search/status/date part of ``buyer_filter``, with the
+        parsed created_at range (or None). Raises 400 for an unparseable date."""
         query = self.db.query(Buyer)
 
-        if search:
-            search_pattern = f'%{search}%'
+        if buyer_filter.search:
+            search_pattern = f'%{buyer_filter.search}%'
             query = query.filter(
                 or_(
                     Buyer.buyer_location.ilike(f'%{search_pattern}'),
@@ -61,67 +133,64 @@ class BuyerRepository:
                 )
             )
 
-        if is_active is not None:
-            query = query.filter(Buyer.is_active == is_active)
+        if buyer_filter.is_active is not None:
+            query = query.filter(Buyer.is_active == buyer_filter.is_active)
 
-        if is_deleted is not None:
-            query = query.filter(Buyer.is_deleted == is_deleted)
+        if buyer_filter.is_deleted is not None:
+            query = query.filter(Buyer.is_deleted == buyer_filter.is_deleted)
 
-        if created_at:
+        created_range = None
+        if buyer_filter.created_at:
             try:
-                cleaned_date = created_at.strip()
-
-                date_formats = [
-                    '%d-%m-%y',  # 26-07-25
-                    '%d-%m-%Y',  # 26-07-2025
-                    '%Y-%m-%d',  # 2025-07-26 (ISO)
-                    '%m/%d/%y',  # 07/26/25 (US format)
-                    '%d.%m.%Y'   # 26.07.2025 (EU alternative)
-                ]
-
-                parsed_date = None
-                for fmt in date_formats:
-                    try:
-                        parsed_date = datetime.strptime(
-                            cleaned_date, fmt).date()
-                        break
-                    except ValueError:
-                        continue
-
-                if not parsed_date:
-                    raise ValueError("No matching date fomrat found")
-
-                start_date = datetime.combine(parsed_date, time.min)
-                end_date = datetime.combine(parsed_date, time.max)
-
-                query = query.filter(
-                    Buyer.created_at >= start_date,
-                    Buyer.created_at <= end_date
-                )
+                created_range = parse_created_at_range(buyer_filter.created_at)
             except ValueError as exc:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="invalid date format. use DD-MM-YYY"
                 ) from exc
+            start_date, end_date = created_range
+            query = query.filter(
+                Buyer.created_at >= start_date,
+                Buyer.created_at <= end_date
+            )
+        return query, created_range
 
-        total_count = query.count()
-
-        query = query.offset(skip).limit(take)
-        buyers = query.all()
-
-        return PaginatedBuyerResponse(
-            data=buyers,
-            total=total_count,
-            page=skip // take + 1 if take > 0 else 1,
-            per_page=take,
-            has_more=(skip + take) < total_count
-        )
+    def stream_buyers(
+        self,
+        buyer_filter: BuyerFilter,
+        fields: Optional[Tuple[str, ...]] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 500
+    ):
+        """Matching buyers in (created_at, id) order, fetched ``batch_size`` rows at a
+        time through a server-side cursor."""
+        query, _ = self.buyer_query(buyer_filter)
+        query = load_fields(query, Buyer, BUYER_FIELDS, fields).order_by(Buyer.created_at, Buyer.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.yield_per(batch_size)
+
+    def stream_buyer_columns(
+        self,
+        buyer_filter: BuyerFilter,
+        columns: Sequence[str],
+        limit: Optional[int] = None,
+        batch_size: int = 500
+    ):
+        """Like ``stream_buyers`` but yields plain tuples of ``columns`` instead of ORM objects."""
+        query, _ = self.buyer_query(buyer_filter)
+        query = query.with_entities(*(getattr(Buyer, name) for name in columns)).order_by(
+            Buyer.created_at, Buyer.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.yield_per(batch_size)
 
     def update_buyer(
         self,
         update_filter: UpdateFilter,
         user_id: Optional[str] = None,
         buyer_id: Optional[str] = None,
+        if_match: Optional[str] = None,
     ):
         if not buyer_id and not user_id:
             raise ValueError("either buyer_id or user_id must be provided")
@@ -132,7 +201,12 @@ class BuyerRepository:
         if user_id:
             query_filter.append(Buyer.user_id == user_id)
         
-        buyer = self.db.query(Buyer).filter(and_(*query_filter)).first()
+        buyer = self.for_update(self.db.query(Buyer), if_match).filter(and_(*query_filter)).first()
+
+        if not buyer:
+            return None
+        check_if_match(if_match, entity_tag(buyer.id, buyer.updated_at, buyer.created_at))
+
         try:
             update_data = update_filter.model_dump(exclude_unset = True)
             for field, value in update_data.items():
@@ -153,7 +227,8 @@ class BuyerRepository:
             self,
             toggle_filter: ToggleFilter,
             buyer_id: Optional[str] = None,
-            user_id: Optional[str] = None
+            user_id: Optional[str] = None,
+            if_match: Optional[str] = None
     ):
         query_conditions = []
         if buyer_id:
@@ -165,10 +240,11 @@ class BuyerRepository:
         if not buyer_id and not user_id:
             raise ValueError('buyer_id or user_id must be provided')
         
-        buyer = self.db.query(Buyer).filter(and_(*query_conditions)).first()
+        buyer = self.for_update(self.db.query(Buyer), if_match).filter(and_(*query_conditions)).first()
 
         if not buyer:
             return None
+        check_if_match(if_match, entity_tag(buyer.id, buyer.updated_at, buyer.created_at))
         
         try:
             toggle_data = toggle_filter.model_dump(exclude_unset=True)
@@ -194,3 +270,7 @@ class BuyerRepository:
         
 
         
+
+    def for_update(self, query, if_match: Optional[str]):
+        # lock the row so the If-Match check and the write see the same version
+        return query.with_for_update() if if_match is not None else query
@@ -1,6 +1,6 @@
 import logging
-from typing import Optional
-from dataclasses import astuple
+from typing import Any, Callable, Dict, Iterable, Literal, Optional, Tuple
+from dataclasses import asdict, astuple
 
 from deps import db_dependency, auth_dependency
 from services.users.utils import (
@@ -14,8 +14,24 @@ from services.users.utils import (
 )
 from services.users.model.buyerModel import Buyer
 from services.users.repository.buyerRepository import BuyerRepository
+from services.users.fieldsets import BUYER_FIELDS, parse_fields, map_fields
+from services.users.streaming import RowSource, ndjson_response, session_rows
+from services.exportService.renderers import (
+    BUYER_EXPORT_COLUMNS,
+    BUYER_EXPORT_FORMATTERS,
+    BUYER_PDF_COLUMNS,
+    render_csv,
+    render_pdf,
+    write_csv,
+)
+from services.exportService.renderPool import render_pool
+from services.exportService.parquetExport import BUYER_PARQUET_COLUMNS, parquet_available, render_parquet
+from services.exportService.spool import spooled_file_response
+from config.config import settings
+from services.users.etags import entity_tag
 
 from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -82,9 +98,11 @@ class BuyerService:
             self,
             auth: auth_dependency,
             buyer_id: Optional[str] = None,
-            user_id: Optional[str] = None
+            user_id: Optional[str] = None,
+            fields: Optional[str] = None
     ) -> BuyerResponse:
         user_id = auth.get("id")
+        fields = self.resolve_fields(fields)
         buyer_filter = {}
         try:
             if buyer_id:
@@ -96,7 +114,7 @@ class BuyerService:
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="user_id and buyer_id not provided"
                 )
-            buyer = self.buyerRepo.fetch_buyer(**buyer_filter)
+            buyer = self.buyerRepo.fetch_buyer(**buyer_filter, fields=fields)
 
             if not buyer:
                 logger.error('buyer with userId %s not found', buyer_id)
@@ -105,8 +123,8 @@ class BuyerService:
                     detail='buyer not found'
                 )
 
-            logger.log('buyer with userid %s fetched successfully', buyer_id)
-            return self.map_to_buyer_response(buyer)
+            logger.info('buyer with userid %s fetched successfully', user_id)
+            return self.map_to_buyer_response(buyer, fields)
         except HTTPException:
             raise
         except Exception as e:
@@ -128,8 +146,9 @@ class BuyerService:
                 detail='user not authorized'
             )
 
-        search, is_active, is_deleted, created_at, skip, take = astuple(
+        search, is_active, is_deleted, created_at, skip, take, cursor, total_mode, fields = astuple(
             buyer_filter)
+        fields = self.resolve_fields(fields)
         max_take = 500
 
         if skip < 0:
@@ -153,27 +172,181 @@ class BuyerService:
             is_deleted=is_deleted,
             created_at=created_at,
             skip=skip,
-            take=take
+            take=take,
+            cursor=cursor,
+            total_mode=total_mode
         )
 
-        buyers = self.buyerRepo.fetch_buyers(filtered_filter)
+        try:
+            buyers = self.buyerRepo.fetch_buyers(filtered_filter, fields)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='invalid cursor'
+            ) from exc
         mapped_buyers = [self.map_to_buyer_response(
-            buyer) for buyer in buyers.data]
+            buyer, fields) for buyer in buyers.data]
 
-        logger.log('buyer fetched successfully buy user', auth.get('id'))
-        return PaginatedBuyerResponse(
+        logger.info('buyers fetched successfully by user %s', auth.get('id'))
+        return PaginatedBuyerResponse.model_construct(
             data=mapped_buyers,
             total=buyers.total,
+            total_is_estimate=buyers.total_is_estimate,
             page=buyers.page,
             per_page=buyers.per_page,
-            has_more=buyers.has_more
+            has_more=buyers.has_more,
+            next_cursor=buyers.next_cursor
+        )
+
+    def stream_buyers(
+            self,
+            auth: auth_dependency,
+            buyer_filter: BuyerFilter,
+            limit: Optional[int] = None
+    ) -> StreamingResponse:
+        """Every matching buyer as NDJSON in (created_at, id) order, read through a
+        server-side cursor so memory and time to first byte do not grow with the result."""
+        if auth.get('role') != "admin":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='user not authorized'
+            )
+        fields = self.resolve_fields(buyer_filter.fields)
+        # validate the filter now: once streaming starts the status code is already sent
+        self.buyerRepo.buyer_query(buyer_filter)
+
+        return ndjson_response(self.buyer_rows(buyer_filter, fields, limit))
+
+    def buyer_rows(
+            self,
+            buyer_filter: BuyerFilter,
+            fields: Optional[Tuple[str, ...]] = None,
+            limit: Optional[int] = None
+    ) -> RowSource:
+        def rows(session):
+            service = BuyerService(session)
+            for buyer in service.buyerRepo.stream_buyers(buyer_filter, fields, limit, settings.stream_batch_size):
+                yield service.map_to_buyer_response(buyer, fields)
+        return rows
+
+    def buyer_column_rows(self, buyer_filter: BuyerFilter, limit: Optional[int] = None) -> RowSource:
+        columns = [name for name, _, _ in BUYER_PARQUET_COLUMNS]
+
+        def rows(session):
+            yield from BuyerRepository(session).stream_buyer_columns(
+                buyer_filter, columns, limit, settings.stream_batch_size)
+        return rows
+
+    def export_buyers(
+            self,
+            format: Literal['csv', 'pdf', 'parquet'],
+            auth: auth_dependency,
+            buyer_filter: BuyerFilter,
+            limit: Optional[int] = None
+    ):
+        """Every matching buyer as a CSV stream, or a file rendered to a temp file (in
+        the render pool when it is enabled, CSV included)."""
+        if auth.get('role') != "admin":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='user not authorized'
+            )
+        # validate the filter now: once streaming starts the status code is already sent
+        self.buyerRepo.buyer_query(buyer_filter)
+
+        if format == 'csv' and not render_pool.enabled:
+            return StreamingResponse(
+                render_csv(
+                    session_rows(self.buyer_rows(buyer_filter, limit=limit)),
+                    BUYER_EXPORT_COLUMNS,
+                    BUYER_EXPORT_FORMATTERS,
+                    settings.export_chunk_bytes
+                ),
+                media_type="text/csv",
+                headers={"Content-Disposition": "attachment; filename=buyers_export.csv"}
+            )
+        render, media_type, filename = self.export_target(format, buyer_filter, limit)
+        return spooled_file_response(render, format, media_type, filename)
+
+    def export_target(
+            self,
+            format: str,
+            buyer_filter: BuyerFilter,
+            limit: Optional[int] = None
+    ) -> Tuple[Callable[[str], int], str, str]:
+        """(render(path) -> rows, media type, filename) for a file export, rendered in
+        the render pool when it is enabled; a full pool answers 429."""
+        render, media_type, filename = self.local_export_target(format, buyer_filter, limit)
+        if render_pool.enabled:
+            params = asdict(buyer_filter)
+
+            def render(path: str) -> int:
+                return render_pool.run(f'buyers.{format}', render_export_task, format, params, limit, path)
+        return render, media_type, filename
+
+    def local_export_target(
+            self,
+            format: str,
+            buyer_filter: BuyerFilter,
+            limit: Optional[int] = None,
+            track: Callable[[Iterable], Iterable] = iter
+    ) -> Tuple[Callable[[str], int], str, str]:
+        """``export_target`` rendered in this process."""
+        if format == 'csv':
+            rows = self.buyer_rows(buyer_filter, limit=limit)
+            return (
+                lambda path: write_csv(
+                    track(session_rows(rows)),
+                    BUYER_EXPORT_COLUMNS,
+                    path,
+                    BUYER_EXPORT_FORMATTERS,
+                    settings.export_chunk_bytes
+                ),
+                'text/csv',
+                'buyers_export.csv'
+            )
+        elif format == 'pdf':
+            rows = self.buyer_rows(buyer_filter, limit=limit)
+            return (
+                lambda path: render_pdf(
+                    track(session_rows(rows)),
+                    BUYER_PDF_COLUMNS,
+                    path,
+                    BUYER_EXPORT_FORMATTERS,
+                    settings.pdf_rows_per_page
+                ),
+                'application/pdf',
+                'buyers_export.pdf'
+            )
+        elif format == 'parquet':
+            if not parquet_available():
+                raise HTTPException(
+                    status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                    detail='parquet export is not available on this server'
+                )
+            rows = self.buyer_column_rows(buyer_filter, limit)
+            return (
+                lambda path: render_parquet(
+                    track(session_rows(rows)),
+                    BUYER_PARQUET_COLUMNS,
+                    path,
+                    settings.parquet_row_group_rows,
+                    settings.parquet_compression
+                ),
+                'application/vnd.apache.parquet',
+                'buyers_export.parquet'
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid format. Choose csv, pdf or parquet"
         )
 
     def update_buyer_by_admin(
             self,
             auth: auth_dependency,
             update_filter: UpdateFilter,
-            buyer_id: str
+            buyer_id: str,
+            if_match: Optional[str] = None
     ):
         if auth.get("role") != "admin":
             raise HTTPException(
@@ -184,7 +357,8 @@ class BuyerService:
         try:
             updated_buyer = self.buyerRepo.update_buyer(
                 update_filter=update_filter, 
-                buyer_id=buyer_id
+                buyer_id=buyer_id,
+                if_match=if_match
                 )
 
             if not updated_buyer:
@@ -210,12 +384,14 @@ class BuyerService:
             self,
             auth: auth_dependency,
             update_filter: UpdateFilter,
+            if_match: Optional[str] = None
     ):
         user_id = auth.get("id")
         try:
             updated_buyer = self.buyerRepo.update_buyer(
                 update_filter=update_filter,
-                user_id=user_id
+                user_id=user_id,
+                if_match=if_match
             )
 
             if not updated_buyer:
@@ -283,7 +459,8 @@ class BuyerService:
             self,
             auth: auth_dependency,
             toggle_filter: ToggleFilter,
-            buyer_id: str
+            buyer_id: str,
+            if_match: Optional[str] = None
     ):
         if auth.get("role") != "admin":
             raise HTTPException(
@@ -295,7 +472,8 @@ class BuyerService:
         try:
             toggled_buyer = self.buyerRepo.toggle_buyer(
                 toggle_filter=toggle_filter,
-                buyer_id=buyer_id
+                buyer_id=buyer_id,
+                if_match=if_match
             )
 
             if not toggled_buyer:
@@ -320,14 +498,16 @@ class BuyerService:
     def toggle_buyer(
             self,
             auth: auth_dependency,
-            toggle_filter: ToggleFilter
+            toggle_filter: ToggleFilter,
+            if_match: Optional[str] = None
     ):
         user_id = auth.get("id")
 
         try:
             toggled_buyer = self.buyerRepo.toggle_buyer(
                 toggle_filter=toggle_filter,
-                user_id=user_id
+                user_id=user_id,
+                if_match=if_match
             )
 
             if not toggled_buyer:
@@ -394,7 +574,37 @@ class BuyerService:
                 detail="Failed to toggle buyer status"
             ) from e
 
-    def map_to_buyer_response(self, buyer: Buyer) -> BuyerResponse:
+    def buyer_etag(
+            self,
+            auth: auth_dependency,
+            buyer_id: Optional[str] = None,
+            user_id: Optional[str] = None,
+            fields: Optional[str] = None
+    ) -> str:
+        """ETag of what fetch_buyer would return, from the buyer's timestamps alone."""
+        fields = self.resolve_fields(fields)
+        user_id = auth.get("id")
+        row = self.buyerRepo.fetch_buyer_version(buyer_id=buyer_id, user_id=user_id)
+
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='buyer not found'
+            )
+        return entity_tag(row.id, row.updated_at, row.created_at, fields)
+
+    def resolve_fields(self, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+        try:
+            return parse_fields(fields, BUYER_FIELDS)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            ) from exc
+
+    def map_to_buyer_response(self, buyer: Buyer, fields: Optional[Tuple[str, ...]] = None) -> BuyerResponse:
+        if fields is not None:
+            return map_fields(buyer, BUYER_FIELDS, fields)
         return {
             "id": buyer.id,
             "buyer_name": buyer.buyer_name,
@@ -409,3 +619,15 @@ class BuyerService:
             "buyer_metadata": buyer.buyer_metadata,
             "user_id": buyer.user_id
         }
+
+
+def render_export_task(
+        format: str,
+        filter_params: Dict[str, Any],
+        limit: Optional[int],
+        path: str,
+        track: Callable[[Iterable], Iterable] = iter
+) -> int:
+    """Render-pool entry point: one buyer export rendered into ``path`` in a worker process."""
+    render, _, _ = BuyerService(None).local_export_target(format, BuyerFilter(**filter_params), limit, track)
+    return render(path)
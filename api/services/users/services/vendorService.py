@@ -1,9 +1,9 @@
-from datetime import datetime, timezone, time
+from datetime import datetime, timezone
 import logging
-from dataclasses import astuple
-from typing import Literal, Optional, Dict, Any
-import pandas as pd
-from io import StringIO, BytesIO
+import time
+import uuid
+from dataclasses import asdict, astuple
+from typing import Literal, Optional, Dict, Any, Callable, Iterable, List, Sequence, Tuple
 
 from deps import db_dependency, auth_dependency
 from services.users.utils import (
@@ -14,20 +14,50 @@ from services.users.utils import (
     FetchVendorResponse,
     VendorScale,
     VendorResponse,
+    ImportRowError,
+    ImportVendorsResponse,
+    parse_created_at_range,
 )
 from services.users.model.vendorModel import Vendor
+from services.authService.model.authModel import User
+from services.users.bulkImport import batches, detect_format, find_decode_error, read_records, validate_batch
+from services.searchService.globalSearch import SEARCH_DOCUMENTS, index_inserted_rows
+from services.geoService.locationIndex import locate_inserted_rows
+from services.geoService.model.locationModel import VendorLocation
+from services.cacheService.tableVersions import record_table_writes
+from services.users.pagination import apply_keyset, keyset_page, offset_page, filter_key, resolve_total
+from services.searchService.vendorSearch import apply_vendor_search
+from services.users.fieldsets import VENDOR_FIELDS, parse_fields, load_fields, map_fields
+from services.users.streaming import RowSource, ndjson_response, session_rows
+from services.exportService.renderers import (
+    VENDOR_EXPORT_COLUMNS,
+    VENDOR_EXPORT_FORMATTERS,
+    VENDOR_PDF_COLUMNS,
+    RowCounter,
+    render_csv,
+    render_pdf,
+    write_csv,
+)
+from services.exportService.artifactCache import export_cache
+from services.cacheService.responseCache import listing_params
+from services.exportService.spool import spooled_file_response
+from services.exportService.jobs import ExportJob, export_jobs
+from services.exportService.renderPool import render_pool
+from services.exportService.parquetExport import VENDOR_PARQUET_COLUMNS, parquet_available, render_parquet
+from config.config import settings
+from services.users.etags import entity_tag, check_if_match
 
 from pydantic import TypeAdapter
-from sqlalchemy import or_, func
-from fastapi import HTTPException, status, Depends
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from fastapi import HTTPException, status, Depends, UploadFile
 from fastapi.responses import StreamingResponse
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-from reportlab.lib import colors
 
 
 logger = logging.getLogger(__name__)
 
+VENDOR_IMPORT_ADAPTER = TypeAdapter(List[CreateVendorRequest])
+
 
 class VendorService:
     def __init__(self, db_session: db_dependency):
@@ -78,6 +108,7 @@ class VendorService:
                 updated_at=vendor.updated_at.isoformat() if vendor.updated_at else None,
                 vendor_metadata=vendor.vendor_metadata,
                 is_active=vendor.is_active,
+                deleted=vendor.deleted,
                 userId=str(vendor.user_id)  # Explicitly map to userId field
             )
         except HTTPException:
@@ -90,76 +121,126 @@ class VendorService:
                 detail=f'Error creating vendor: {str(e)}'
             ) from e
 
+    def import_vendors(self, auth: auth_dependency, upload: UploadFile, format: Optional[str] = None) -> ImportVendorsResponse:
+        """Create vendors from an uploaded CSV or NDJSON file, ``import_batch_size`` rows
+        at a time.
+
+        Rows get the same rules as ``create_vendor``: ``CreateVendorRequest``
+        validation, and one vendor per user (``user_id`` must name an existing user
+        without a vendor, once per file). Each batch is checked with two queries and
+        saved with one multi-row insert in its own transaction, together with the
+        search documents and geocoded locations that ORM writes get from their flush
+        hooks. Invalid rows are skipped and reported by row number.
+        """
+        if auth.get('role') != 'admin':
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail='user not admin'
+            )
+        format = format or detect_format(upload.filename, upload.content_type)
+        if format is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Unknown file format. Upload a .csv or .ndjson file, or pass format'
+            )
+        # checked up front: a bad byte found mid-import would fail after earlier batches committed
+        decode_error = find_decode_error(upload.file)
+        if decode_error is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'File is not valid UTF-8: {decode_error}'
+            )
+
+        started = time.perf_counter()
+        total = imported = failed = 0
+        reported: List[ImportRowError] = []
+        seen_users = set()
+
+        def report(number: int, errors: List[Dict[str, Optional[str]]]):
+            nonlocal failed
+            failed += 1
+            if len(reported) < settings.import_max_reported_errors:
+                reported.append(ImportRowError(row=number, errors=errors))
+
+        for batch in batches(read_records(upload.file, format), settings.import_batch_size):
+            total += len(batch)
+            valid, errors = validate_batch(VENDOR_IMPORT_ADAPTER, batch)
+            for number, record in batch:
+                if isinstance(record, dict) and not str(record.get('user_id') or '').strip():
+                    errors.setdefault(number, []).append({'field': 'user_id', 'message': 'Field required'})
+            valid = [row for row in valid if row[0] not in errors]
+
+            user_ids = {str(record['user_id']).strip() for _, record, _ in valid}
+            known_users = {user_id for user_id, in self.db.query(User.id).filter(User.id.in_(user_ids))}
+            vendor_owners = {user_id for user_id, in self.db.query(Vendor.user_id).filter(Vendor.user_id.in_(user_ids))}
+
+            now = datetime.now()
+            rows, numbers = [], []
+            for number, record, vendor in valid:
+                user_id = str(record['user_id']).strip()
+                if user_id not in known_users:
+                    errors[number] = [{'field': 'user_id', 'message': 'user not found'}]
+                elif user_id in vendor_owners or user_id in seen_users:
+                    errors[number] = [{'field': 'user_id', 'message': 'user already has a vendor profile'}]
+                else:
+                    seen_users.add(user_id)
+                    numbers.append(number)
+                    rows.append({
+                        **vendor.model_dump(),
+                        'id': str(uuid.uuid4()),
+                        'vendor_metadata': {'total_purchases': 0},
+                        'vendor_rating': 1,
+                        'created_at': now,
+                        'updated_at': None,
+                        'user_id': user_id,
+                        'is_active': True,
+                        'deleted': False,
+                    })
+
+            if rows:
+                try:
+                    conn = self.db.connection()
+                    conn.execute(Vendor.__table__.insert(), rows)
+                    index_inserted_rows(conn, Vendor, rows)
+                    locate_inserted_rows(conn, Vendor, rows)
+                    record_table_writes(self.db, {Vendor.__tablename__, SEARCH_DOCUMENTS.name, VendorLocation.__tablename__})
+                    self.db.commit()
+                    imported += len(rows)
+                except SQLAlchemyError as e:
+                    self.db.rollback()
+                    logger.error('vendor import batch failed: %s', str(e), exc_info=True)
+                    for number in numbers:
+                        errors[number] = [{'field': None, 'message': 'row could not be saved'}]
+                    seen_users.difference_update(row['user_id'] for row in rows)
+
+            for number in sorted(errors):
+                report(number, errors[number])
+
+        elapsed = time.perf_counter() - started
+        logger.info('vendor import: %d rows, %d imported, %d failed in %.2fs', total, imported, failed, elapsed)
+        return ImportVendorsResponse(
+            total_rows=total,
+            imported=imported,
+            failed=failed,
+            errors=reported,
+            errors_truncated=failed > len(reported)
+        )
+
     def fetch_vendors(self, auth: auth_dependency, filter: Optional[VendorFilter] = None) -> FetchVendorResponse:
         if auth.get('role') != 'admin':
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail='user not an admin'
             )
-        search, is_active, deleted, created_at, skip, take = astuple(filter)
+        search, is_active, deleted, created_at, skip, take, cursor, total_mode, fields = astuple(filter)
+        fields = self.resolve_fields(fields)
 
         default_skip = 0
         default_take = 50
         max_take = 500
 
-        query = self.db.query(Vendor)
-
-        if search:
-            search_pattern = f'%{search}%'
-            query = query.filter(
-                or_(
-                    Vendor.vendor_location.ilike(f'%{search_pattern}'),
-                    Vendor.vendor_title.ilike(f'%{search_pattern}'),
-                    Vendor.vendor_email.ilike(f'%{search_pattern}'),
-                    Vendor.vendor_merchandise.ilike(f'%{search_pattern}'),
-                    Vendor.vendor_scale.ilike(f'%{search_pattern}')
-                )
-            )
-        
-        if is_active is not None:
-            query = query.filter(Vendor.is_active == is_active)
-
-        if deleted is not None:
-            query = query.filter(Vendor.deleted == deleted)
-
-        if created_at:
-            try:
-                # 2. Clean the input
-                cleaned_date = created_at.strip()  # Remove whitespace
-                
-                # 3. Try multiple common date formats
-                date_formats = [
-                    '%d-%m-%y',  # 26-07-25
-                    '%d-%m-%Y',  # 26-07-2025
-                    '%Y-%m-%d',  # 2025-07-26 (ISO)
-                    '%m/%d/%y',  # 07/26/25 (US format)
-                    '%d.%m.%Y'   # 26.07.2025 (EU alternative)
-                ]
-                
-                parsed_date = None
-                for fmt in date_formats:
-                    try:
-                        parsed_date = datetime.strptime(cleaned_date, fmt).date()
-                        break
-                    except ValueError:
-                        continue
-                        
-                if not parsed_date:
-                    raise ValueError("No matching date format found")
-                
-                # 4. Filter using date range (most reliable method)
-                start_dt = datetime.combine(parsed_date, time.min)
-                end_dt = datetime.combine(parsed_date, time.max)
-                
-                query = query.filter(
-                    Vendor.created_at >= start_dt,
-                    Vendor.created_at <= end_dt
-                )
-            except ValueError as exc:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail='Invalid date format. Use DD-MM-YYYY'
-                ) from exc
+        # relevance order only applies to offset pages; cursors keep (created_at, id) order
+        query, created_range = self.vendor_query(filter, ranked=cursor is None)
 
         skip = filter.skip if filter.skip is not None else default_skip
         take = filter.take if filter.take is not None else default_take
@@ -176,94 +257,279 @@ class VendorService:
                 detail=f"Take must be between 1 and {max_take}"
             )
 
-        total_count = query.count()
+        total_count, total_is_estimate = resolve_total(
+            query,
+            Vendor.__tablename__,
+            filter_key(search, is_active, deleted, created_range),
+            total_mode
+        )
 
-        query = query.offset(skip).limit(take)
-        vendors = query.all()
-        mapped_vendors = [self.map_vendor_response(v) for v in vendors]
+        # keyset cursors are built from created_at, so load it even when not returned
+        query = load_fields(query, Vendor, VENDOR_FIELDS, fields, ('created_at',) if cursor is not None else ())
 
-        return FetchVendorResponse(
+        if cursor is not None:
+            try:
+                keyset_query = apply_keyset(query, Vendor.created_at, Vendor.id, cursor, take)
+            except ValueError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail='invalid cursor'
+                ) from exc
+            vendors, has_more, next_cursor = keyset_page(keyset_query.all(), take)
+
+            return FetchVendorResponse.model_construct(
+                data=[self.map_vendor_response(v, fields) for v in vendors],
+                total=total_count,
+                total_is_estimate=total_is_estimate,
+                per_page=take,
+                has_more=has_more,
+                next_cursor=next_cursor
+            )
+
+        vendors, has_more = offset_page(query, skip, take)
+        mapped_vendors = [self.map_vendor_response(v, fields) for v in vendors]
+
+        return FetchVendorResponse.model_construct(
             data=mapped_vendors,
             total=total_count,
+            total_is_estimate=total_is_estimate,
             page=skip // take + 1 if take > 0 else 1,
             per_page=take,
-            has_more=(skip + take) < total_count
+            has_more=has_more
         )
 
-    def export_vendors(self, format: Literal['csv', 'pdf'], auth: auth_dependency, filter: VendorFilter = Depends()):
+    def vendor_query(self, filter: VendorFilter, ranked: bool = True):
+        """Vendors matching the search/status/date part of ``filter``, with the parsed
+        created_at range (or None). Raises 400 for an unparseable date."""
+        query = self.db.query(Vendor)
+
+        if filter.search:
+            query = apply_vendor_search(query, filter.search, ranked=ranked)
+
+        if filter.is_active is not None:
+            query = query.filter(Vendor.is_active == filter.is_active)
+
+        if filter.is_deleted is not None:
+            query = query.filter(Vendor.deleted == filter.is_deleted)
+
+        created_range = None
+        if filter.created_at:
+            try:
+                created_range = parse_created_at_range(filter.created_at)
+            except ValueError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail='Invalid date format. Use DD-MM-YYYY'
+                ) from exc
+            start_dt, end_dt = created_range
+            query = query.filter(
+                Vendor.created_at >= start_dt,
+                Vendor.created_at <= end_dt
+            )
+        return query, created_range
+
+    def stream_vendors(self, auth: auth_dependency, filter: VendorFilter, limit: Optional[int] = None) -> StreamingResponse:
+        """Every matching vendor as NDJSON in (created_at, id) order, read through a
+        server-side cursor so memory and time to first byte do not grow with the result."""
+        if auth.get('role') != 'admin':
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail='user not an admin'
+            )
+        fields = self.resolve_fields(filter.fields)
+        # validate the filter now: once streaming starts the status code is already sent
+        self.vendor_query(filter)
+        return ndjson_response(self.vendor_rows(filter, fields, limit))
+
+    def vendor_rows(self, filter: VendorFilter, fields: Optional[Tuple[str, ...]] = None, limit: Optional[int] = None):
+        """Row source for streams: mapped vendors in (created_at, id) order, read
+        ``stream_batch_size`` rows at a time through a server-side cursor."""
+        def rows(session):
+            service = VendorService(session)
+            query, _ = service.vendor_query(filter, ranked=False)
+            query = load_fields(query, Vendor, VENDOR_FIELDS, fields).order_by(Vendor.created_at, Vendor.id)
+            if limit is not None:
+                query = query.limit(limit)
+            for vendor in query.yield_per(settings.stream_batch_size):
+                yield service.map_vendor_response(vendor, fields)
+        return rows
+
+    def vendor_column_rows(self, filter: VendorFilter, columns: Sequence[str], limit: Optional[int] = None):
+        """Row source of plain column tuples (no ORM objects) in (created_at, id) order."""
+        def rows(session):
+            query, _ = VendorService(session).vendor_query(filter, ranked=False)
+            query = query.with_entities(*(getattr(Vendor, name) for name in columns)).order_by(
+                Vendor.created_at, Vendor.id)
+            if limit is not None:
+                query = query.limit(limit)
+            yield from query.yield_per(settings.stream_batch_size)
+        return rows
+
+    def export_vendors(
+            self,
+            format: Literal['csv', 'pdf', 'parquet'],
+            auth: auth_dependency,
+            filter: VendorFilter = Depends(),
+            limit: Optional[int] = None
+    ):
         if auth.get('role') != 'admin':
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail='user not admin'
             )
-        vendor_response = self.fetch_vendors(auth, filter)
-        mapped_vendors = vendor_response.data
-
+        # validate the filter now: once streaming starts the status code is already sent
+        self.vendor_query(filter)
+
+        key = self.export_cache_key(format, filter, limit)
+        # stream CSV straight from the cursor unless it is cached or must render in the pool
+        if format == 'csv' and not render_pool.enabled and export_cache.lookup(key) is None:
+            return self.generate_csv(self.vendor_rows(filter, limit=limit), key)
+        render, media_type, filename = self.export_target(format, filter, limit)
+        return spooled_file_response(export_cache.cached(key, format, render), format, media_type, filename)
+
+    def enqueue_export(
+            self,
+            format: Literal['csv', 'pdf', 'parquet'],
+            auth: auth_dependency,
+            filter: VendorFilter,
+            limit: Optional[int] = None
+    ) -> ExportJob:
+        """Render the export on the background job pool instead of this request."""
+        if auth.get('role') != 'admin':
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail='user not admin'
+            )
+        query, created_range = self.vendor_query(filter, ranked=False)
+        total, _ = resolve_total(
+            query,
+            Vendor.__tablename__,
+            filter_key(filter.search, filter.is_active, filter.is_deleted, created_range),
+            'estimate'
+        )
+        job = ExportJob(format, auth.get('id'), min(total, limit) if limit else total)
+        render, media_type, filename = self.export_target(format, filter, limit, job.track, job.report)
+        render = export_cache.cached(self.export_cache_key(format, filter, limit), format, render)
+        return export_jobs.submit(job, render, media_type, filename)
+
+    def export_cache_key(self, format: str, filter: VendorFilter, limit: Optional[int]) -> str:
+        """Identical exports of unchanged vendors share one cached artifact."""
+        params = listing_params(filter)
+        if limit is not None:
+            params['limit'] = limit
+        return export_cache.key('vendors', format, params, (Vendor.__tablename__,))
+
+    def fetch_export_job(self, auth: auth_dependency, job_id: str, finished: bool = False) -> ExportJob:
+        if auth.get('role') != 'admin':
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail='user not admin'
+            )
+        return export_jobs.artifact(job_id) if finished else export_jobs.get(job_id)
+
+    def export_target(
+            self,
+            format: str,
+            filter: VendorFilter,
+            limit: Optional[int] = None,
+            track: Callable[[Iterable], Iterable] = iter,
+            progress: Optional[Callable[[int], None]] = None
+    ) -> Tuple[Callable[[str], int], str, str]:
+        """(render(path) -> rows, media type, filename) for a file export, rendered in
+        the render pool when it is enabled. ``track`` sees every row of an in-process
+        render. ``progress`` is for background jobs: it gets the row count of a pooled
+        render while it runs, and the job waits for a free worker instead of a 429."""
+        render, media_type, filename = self.local_export_target(format, filter, limit, track)
+        if render_pool.enabled:
+            params = asdict(filter)
+
+            def render(path: str) -> int:
+                return render_pool.run(
+                    f'vendors.{format}', render_export_task, format, params, limit, path,
+                    progress=progress, wait=progress is not None
+                )
+        return render, media_type, filename
+
+    def local_export_target(
+            self,
+            format: str,
+            filter: VendorFilter,
+            limit: Optional[int] = None,
+            track: Callable[[Iterable], Iterable] = iter
+    ) -> Tuple[Callable[[str], int], str, str]:
+        """``export_target`` rendered in this process."""
         if format == 'csv':
-            return self.generate_csv(mapped_vendors)
+            rows = self.vendor_rows(filter, limit=limit)
+            return (
+                lambda path: write_csv(
+                    track(session_rows(rows)),
+                    VENDOR_EXPORT_COLUMNS,
+                    path,
+                    VENDOR_EXPORT_FORMATTERS,
+                    settings.export_chunk_bytes
+                ),
+                'text/csv',
+                'vendors_export.csv'
+            )
         elif format == 'pdf':
-            return self.generate_pdf(mapped_vendors)
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid format. Choose 'csv' of pdf"
+            rows = self.vendor_rows(filter, limit=limit)
+            return (
+                lambda path: render_pdf(
+                    track(session_rows(rows)),
+                    VENDOR_PDF_COLUMNS,
+                    path,
+                    VENDOR_EXPORT_FORMATTERS,
+                    settings.pdf_rows_per_page
+                ),
+                'application/pdf',
+                'vendors_export.pdf'
             )
+        elif format == 'parquet':
+            if not parquet_available():
+                raise HTTPException(
+                    status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                    detail='parquet export is not available on this server'
+                )
+            rows = self.vendor_column_rows(filter, [name for name, _, _ in VENDOR_PARQUET_COLUMNS], limit)
+            return (
+                lambda path: render_parquet(
+                    track(session_rows(rows)),
+                    VENDOR_PARQUET_COLUMNS,
+                    path,
+                    settings.parquet_row_group_rows,
+                    settings.parquet_compression
+                ),
+                'application/vnd.apache.parquet',
+                'vendors_export.parquet'
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid format. Choose csv, pdf or parquet"
+        )
 
-    def generate_csv(self, mapped_vendors: list[dict]) -> StreamingResponse:
-        df = pd.DataFrame(mapped_vendors)
-
-        if 'created_at' in df.columns:
-            df['created_at'] = pd.to_datetime(
-                df['created_at']).dt.strftime('%d-%m-%y %H:%M:%S')
-
-        stream = StringIO()
-        df.to_csv(stream, index=False)
-
+    def generate_csv(self, rows: RowSource, cache_key: Optional[str] = None) -> StreamingResponse:
+        counter = RowCounter()
+        chunks = render_csv(
+            counter(session_rows(rows)),
+            VENDOR_EXPORT_COLUMNS,
+            VENDOR_EXPORT_FORMATTERS,
+            settings.export_chunk_bytes
+        )
+        if cache_key is not None:
+            chunks = export_cache.tee(cache_key, 'csv', chunks, lambda: counter.rows)
         return StreamingResponse(
-            iter([stream.getvalue()]),
+            chunks,
             media_type="text/csv",
             headers={"Content-Disposition": "attachment; filename=vendors_export.csv"}
         )
-
-    def generate_pdf(self, mapped_vendors: list[dict]) -> StreamingResponse:
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-
-        pdf_fields = [
-            'id', 'vendor_title', 'vendor_email',
-            'vendor_location', 'created_at', 'vendor_scale',
-            'is_active'
-        ]
-
-        data = [pdf_fields]
-        for vendor in mapped_vendors:
-            data.append([str(vendor.get(field, '')) for field in pdf_fields])
-
-        table = Table(data)
-        style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ])
-        table.setStyle(style)
-        elements.append(table)
-
-        #buld PDF
-        doc.build(elements)
-        buffer.seek(0)
-
-        return StreamingResponse(
-            buffer,
-            media_type='application/pdf',
-            headers={"Content-Disposition": "attachment; filename=vendors_export.pdf"}
-        )
     
-    def update_vendor(self, auth: auth_dependency, vendor_id: str, update_vendor_input: UpdateVendorInput) -> VendorResponse:
+    def update_vendor(
+            self,
+            auth: auth_dependency,
+            vendor_id: str,
+            update_vendor_input: UpdateVendorInput,
+            if_match: Optional[str] = None
+    ) -> VendorResponse:
         (
         vendor_title, 
         vendor_location, 
@@ -276,7 +542,7 @@ class VendorService:
         vendor_metadata
         ) = astuple(update_vendor_input)
         try:
-            vendor = self.db.query(Vendor).filter(Vendor.id == vendor_id).first()
+            vendor = self.for_update(self.db.query(Vendor), if_match).filter(Vendor.id == vendor_id).first()
             
             if not vendor:
                 raise HTTPException(
@@ -289,6 +555,7 @@ class VendorService:
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="user not authorized to change detail"
                 )
+            check_if_match(if_match, self.vendor_tag(vendor))
             # update_fields = update_vendor_input.model_dump(exclude_unset=True)
             vendor.vendor_title = vendor_title if vendor_title is not None else vendor.vendor_title
             vendor.vendor_location = vendor_location if vendor_location is not None else vendor.vendor_location
@@ -310,7 +577,7 @@ class VendorService:
             self.db.commit()
             self.db.refresh(vendor)
 
-            logger.log('vendor updated successfully')
+            logger.info('vendor %s updated successfully', vendor_id)
             return self.map_vendor_response(vendor)
         
         except HTTPException:
@@ -335,9 +602,10 @@ class VendorService:
             ) from e
             
 
-    def fetch_vendor(self, auth: auth_dependency, vendor_id: str) -> VendorResponse:
+    def fetch_vendor(self, auth: auth_dependency, vendor_id: str, fields: Optional[str] = None) -> VendorResponse:
+        fields = self.resolve_fields(fields)
         try:
-            vendor = self.db.query(Vendor).filter(
+            vendor = load_fields(self.db.query(Vendor), Vendor, VENDOR_FIELDS, fields).filter(
                 Vendor.id == vendor_id,
                 Vendor.user_id == auth.get('id')
                 ).first()
@@ -348,7 +616,7 @@ class VendorService:
                     detail='vendor not found'
                 )
             
-            return self.map_vendor_response(vendor)
+            return self.map_vendor_response(vendor, fields)
         except HTTPException:
             raise
         except Exception as e:
@@ -363,9 +631,16 @@ class VendorService:
                 detail='failed to fetch vendor'
             ) from e
         
-    def set_vendor_deletion_status(self, auth: auth_dependency, vendor_id: str, delete_status: bool, reason: str) -> VendorResponse:
+    def set_vendor_deletion_status(
+            self,
+            auth: auth_dependency,
+            vendor_id: str,
+            delete_status: bool,
+            reason: str,
+            if_match: Optional[str] = None
+    ) -> VendorResponse:
         try:
-            vendor = self.db.query(Vendor).filter(
+            vendor = self.for_update(self.db.query(Vendor), if_match).filter(
                 Vendor.id == vendor_id,
                 Vendor.user_id == auth.get('id')
                 ).first()
@@ -375,6 +650,7 @@ class VendorService:
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail='vendor not found'
                 )
+            check_if_match(if_match, self.vendor_tag(vendor))
             
             vendor.deleted = delete_status
             vendor.updated_at = datetime.now(timezone.utc)
@@ -402,7 +678,14 @@ class VendorService:
                 detail='failed to delete vendor'
             ) from e
         
-    def toggle_vendor_active_status(self, auth: auth_dependency, active_status: bool, vendor_id: str, reason: str) -> VendorResponse:
+    def toggle_vendor_active_status(
+            self,
+            auth: auth_dependency,
+            active_status: bool,
+            vendor_id: str,
+            reason: str,
+            if_match: Optional[str] = None
+    ) -> VendorResponse:
         if auth.get('role') != 'admin':
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -410,13 +693,14 @@ class VendorService:
             )
         
         try:
-            vendor = self.db.query(Vendor).filter(Vendor.id == vendor_id,).first()
+            vendor = self.for_update(self.db.query(Vendor), if_match).filter(Vendor.id == vendor_id,).first()
 
             if not vendor:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail='vendor not found'
                 )
+            check_if_match(if_match, self.vendor_tag(vendor))
             
             # vendor.is_active = active_status
             prev = vendor.is_active
@@ -448,7 +732,40 @@ class VendorService:
             ) from e
 
 
-    def map_vendor_response(self, vendor: Vendor) -> VendorResponse:
+    def vendor_etag(self, auth: auth_dependency, vendor_id: str, fields: Optional[str] = None) -> str:
+        """ETag of what fetch_vendor would return, from the vendor's timestamps alone."""
+        fields = self.resolve_fields(fields)
+        row = self.db.query(Vendor.updated_at, Vendor.created_at).filter(
+            Vendor.id == vendor_id,
+            Vendor.user_id == auth.get('id')
+            ).first()
+
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='vendor not found'
+            )
+        return entity_tag(vendor_id, row.updated_at, row.created_at, fields)
+
+    def vendor_tag(self, vendor: Vendor) -> str:
+        return entity_tag(vendor.id, vendor.updated_at, vendor.created_at)
+
+    def for_update(self, query, if_match: Optional[str]):
+        # lock the row so the If-Match check and the write see the same version
+        return query.with_for_update() if if_match is not None else query
+
+    def resolve_fields(self, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+        try:
+            return parse_fields(fields, VENDOR_FIELDS)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc)
+            ) from exc
+
+    def map_vendor_response(self, vendor: Vendor, fields: Optional[Tuple[str, ...]] = None) -> VendorResponse:
+        if fields is not None:
+            return map_fields(vendor, VENDOR_FIELDS, fields)
         return {
             "id": vendor.id,
             "vendor_title": vendor.vendor_title,
@@ -466,3 +783,15 @@ class VendorService:
             'deleted': vendor.deleted,
             "userId": str(vendor.user_id),
         }
+
+
+def render_export_task(
+        format: str,
+        filter_params: Dict[str, Any],
+        limit: Optional[int],
+        path: str,
+        track: Callable[[Iterable], Iterable] = iter
+) -> int:
+    """Render-pool entry point: one vendor export rendered into ``path`` in a worker process."""
+    render, _, _ = VendorService(None).local_export_target(format, VendorFilter(**filter_params), limit, track)
+    return render(path)
@@ -0,0 +1,54 @@
+import logging
+from typing import Callable, Dict, Iterable, Iterator
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from config.config import settings
+from config.database import SessionLocal
+from services.serializationService.fastJson import dumps
+
+logger = logging.getLogger(__name__)
+
+RowSource = Callable[[Session], Iterable[Dict]]
+
+
+def session_rows(rows: RowSource) -> Iterator[Dict]:
+    """Yield ``rows(session)`` from a session of its own.
+
+    The request's session is closed before a streaming body is sent, so streams
+    open their own and close it when they end or the client goes away. A single
+    SELECT read through one cursor sees one consistent snapshot of the data.
+    """
+    session = SessionLocal()
+    try:
+        yield from rows(session)
+    finally:
+        session.close()
+
+
+def ndjson_lines(rows: RowSource, batch_size: int) -> Iterator[bytes]:
+    """Encode ``rows(session)`` as newline-delimited JSON, ``batch_size`` rows per chunk.
+
+    A failure after the first chunk can no longer change the status code; it ends
+    the stream with an ``{"error": ...}`` line instead.
+    """
+    batch = []
+    try:
+        for row in session_rows(rows):
+            batch.append(dumps(row))
+            if len(batch) >= batch_size:
+                yield b'\n'.join(batch) + b'\n'
+                batch.clear()
+        if batch:
+            yield b'\n'.join(batch) + b'\n'
+    except Exception as e:
+        logger.error('ndjson stream failed: %s', str(e), exc_info=True)
+        yield dumps({'error': 'stream aborted'}) + b'\n'
+
+
+def ndjson_response(rows: RowSource) -> StreamingResponse:
+    return StreamingResponse(
+        ndjson_lines(rows, settings.stream_batch_size),
+        media_type='application/x-ndjson'
+    )
@@ -1,4 +1,4 @@
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Literal, Tuple
 from pydantic import (
     BaseModel, 
     Field, 
@@ -8,7 +8,37 @@ from pydantic import (
     )
 from enum import Enum as PyEnum
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, time
+
+
+CREATED_AT_FORMATS = [
+    '%d-%m-%y',  # 26-07-25
+    '%d-%m-%Y',  # 26-07-2025
+    '%Y-%m-%d',  # 2025-07-26 (ISO)
+    '%m/%d/%y',  # 07/26/25 (US format)
+    '%d.%m.%Y'   # 26.07.2025 (EU alternative)
+]
+
+# exact: cached COUNT(*); estimate: planner row estimate for large results; none: omit total
+TotalMode = Literal['exact', 'estimate', 'none']
+
+
+def parse_created_at_range(created_at: str) -> Tuple[datetime, datetime]:
+    """Parse a created_at filter in any accepted format into a whole-day range."""
+    cleaned_date = created_at.strip()
+
+    parsed_date = None
+    for fmt in CREATED_AT_FORMATS:
+        try:
+            parsed_date = datetime.strptime(cleaned_date, fmt).date()
+            break
+        except ValueError:
+            continue
+
+    if not parsed_date:
+        raise ValueError("No matching date format found")
+
+    return datetime.combine(parsed_date, time.min), datetime.combine(parsed_date, time.max)
 
 
 class VendorScale(PyEnum):
@@ -83,6 +113,18 @@ class CreateVendorResponse(BaseModel):
     deleted: bool
     userId: str
 
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[Dict[str, Optional[str]]]
+
+
+class ImportVendorsResponse(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool = False
+
 @dataclass
 class VendorFilter:
     search: Optional[str] = None
@@ -91,6 +133,9 @@ class VendorFilter:
     created_at: Optional[str] = None
     skip: Optional[int] = None
     take: Optional[int] = None
+    cursor: Optional[str] = None
+    total_mode: TotalMode = 'exact'
+    fields: Optional[str] = None
 
     @field_validator('created_at', mode='before')
     @classmethod
@@ -113,10 +158,12 @@ class VendorFilter:
 
 class FetchVendorResponse(BaseModel):
     data: List[Dict[str, Any]]
-    total: int
-    page: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    page: Optional[int] = None
     per_page: int
     has_more: bool
+    next_cursor: Optional[str] = None
 
 @dataclass
 class UpdateVendorInput:
@@ -209,10 +256,12 @@ class BuyerResponse(BaseModel):
 
 class PaginatedBuyerResponse(BaseModel):
     data: List[Dict[str, Any]]
-    total: int
-    page: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    page: Optional[int] = None
     per_page: int
     has_more: bool
+    next_cursor: Optional[str] = None
 
 @dataclass
 class BuyerFilter:
@@ -222,6 +271,9 @@ class BuyerFilter:
     created_at: Optional[str] = None
     skip: Optional[int] = None
     take: Optional[int] = None
+    cursor: Optional[str] = None
+    total_mode: TotalMode = 'exact'
+    fields: Optional[str] = None
 
     @field_validator("created_at", mode="before")
     @classmethod